@@ -10,7 +10,12 @@ urlpatterns = [
     path('users/', views.users, name='users'),
     path('groups/', views.groups, name='groups'),
     path('students/', views.students, name='students'),
+    path('tables/<slug:name>/', views.datatable, name='datatable'),
     path('subjects/', views.subjects, name='subjects'),
     path('excel-import/', views.excel_import, name='excel_import'),
+    path('jobs/', views.jobs, name='jobs'),
+    path('jobs/<int:pk>/', views.job_status, name='job_status'),
+    path('jobs/<int:pk>/download/', views.job_download, name='job_download'),
+    path('perf/', views.perf_stats, name='perf'),
     path('logout/', LogoutView.as_view(), name='logout'),  # ← added here
 ]
\ No newline at end of file
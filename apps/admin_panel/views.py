@@ -1,21 +1,32 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib import messages
+from django.conf import settings
+from django.http import FileResponse, Http404, JsonResponse
 from apps.common.models import *
 from apps.common.permissions import admin_required
-from apps.common.utils import import_journal_from_excel
+from apps.common.dashboard import get_dashboard_summary
+from apps.common.datatables import datatable_response
+from apps.common.jobs import enqueue, user_job
+from apps.common.profiling import request_stats
+from apps.common.tasks import job_file_path, new_job_file
+
+
+# Пересчеты, которые админ запускает со страницы задач
+RECOMPUTE_JOBS = ('recompute_gpa', 'recompute_attendance_points', 'backfill_daily_attendance', 'rebuild_search_index')
+JOBS_SHOWN = 30
+# Таблицы, доступные админу через DataTables (serverSide)
+DATATABLES = ('all_students', 'teachers', 'journals')
 
 
 @admin_required
 def dashboard(request):
     """Админ панель"""
-    total_users = User.objects.count()
-    total_students = Student.objects.count()
-    total_groups = Group.objects.count()
+    summary = get_dashboard_summary()
     
     return render(request, 'admin_panel/dashboard.html', {
-        'total_users': total_users,
-        'total_students': total_students,
-        'total_groups': total_groups
+        'total_users': summary['total_users'],
+        'total_students': summary['all_students'],
+        'total_groups': summary['total_groups']
     })
 
 
@@ -82,14 +93,19 @@ def students(request):
         messages.success(request, 'Донишҷӯ эҷод шуд!')
         return redirect('admin_panel:students')
     
-    all_students = Student.objects.all().select_related('group', 'course')
+    # Строки подгружает DataTables с datatable (serverSide)
     groups = Group.objects.all()
     return render(request, 'admin_panel/students.html', {
-        'students': all_students,
         'groups': groups
     })
 
 
+@admin_required
+def datatable(request, name):
+    """Данные таблицы для DataTables: страница, сортировка, фильтры"""
+    return datatable_response(request, name, DATATABLES)
+
+
 @admin_required
 def subjects(request):
     """Управление предметами"""
@@ -118,28 +134,73 @@ def subjects(request):
 
 @admin_required
 def excel_import(request):
-    """Импорт журнала из Excel"""
+    """Импорт журнала из Excel: файл сохраняется, импорт выполняет воркер (run_jobs)"""
     if request.method == 'POST' and request.FILES.get('excel_file'):
         file = request.FILES['excel_file']
-        assignment_id = request.POST.get('assignment_id')
+        assignment = get_object_or_404(TeacherAssignment, id=request.POST.get('assignment_id'))
         
-        # Сохранить временно файл
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
+        # Файл удаляется после завершения задачи (успех или последняя попытка)
+        path = new_job_file('.xlsx')
+        with open(path, 'wb') as tmp:
             for chunk in file.chunks():
                 tmp.write(chunk)
-            tmp_path = tmp.name
-        
-        # Импорт
-        assignment = TeacherAssignment.objects.get(id=assignment_id)
-        result = import_journal_from_excel(tmp_path, assignment)
         
-        messages.success(request, f'Импорт: {result["success"]} қатор')
-        if result['errors']:
-            for error in result['errors']:
-                messages.error(request, error)
-        
-        return redirect('admin_panel:excel_import')
+        enqueue('excel_import', {'path': path, 'assignment_id': assignment.id},
+                user=request.user, temp_files=[path])
+        messages.success(request, 'Импорт ба навбат гузошта шуд')
+        return redirect('admin_panel:jobs')
     
     assignments = TeacherAssignment.objects.all().select_related('teacher', 'group', 'subject')
     return render(request, 'admin_panel/excel_import.html', {'assignments': assignments})
+
+
+@admin_required
+def jobs(request):
+    """Фоновые задачи: последние задачи и запуск пересчетов/экспорта"""
+    if request.method == 'POST':
+        kind = request.POST.get('kind')
+        if kind not in RECOMPUTE_JOBS + ('export_students',):
+            raise Http404
+        enqueue(kind, user=request.user, unique=kind in RECOMPUTE_JOBS)
+        return redirect('admin_panel:jobs')
+    
+    return render(request, 'admin_panel/jobs.html', {
+        'jobs': Job.objects.select_related('created_by')[:JOBS_SHOWN],
+        'recompute_jobs': [(kind, label) for kind, label in Job.KIND_CHOICES if kind in RECOMPUTE_JOBS],
+        'status_view': 'admin_panel:job_status',
+        'download_view': 'admin_panel:job_download',
+    })
+
+
+@admin_required
+def job_status(request, pk):
+    """Состояние задачи (htmx-опрос)"""
+    return render(request, 'partials/job_status.html', {
+        'job': user_job(request, pk),
+        'status_view': 'admin_panel:job_status',
+        'download_view': 'admin_panel:job_download',
+    })
+
+
+@admin_required
+def job_download(request, pk):
+    """Файл результата задачи (экспорт)"""
+    job = user_job(request, pk)
+    if job.status != 'done' or not (job.result or {}).get('file'):
+        raise Http404
+    try:
+        output = open(job_file_path(job.result['file']), 'rb')
+    except FileNotFoundError:
+        raise Http404
+    return FileResponse(output, as_attachment=True, filename=job.result.get('filename') or job.result['file'])
+
+
+@admin_required
+def perf_stats(request):
+    """
+    Сводка замеров запросов (REQUEST_PROFILING) текущего процесса в JSON.
+    POST обнуляет статистику.
+    """
+    if request.method == 'POST':
+        request_stats.reset()
+    return JsonResponse({'enabled': settings.REQUEST_PROFILING, **request_stats.snapshot()})
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from .models import (User, Course, Group, Subject, Student, Semester, 
-                    TeacherAssignment, Schedule, JournalEntry, Comment, CurrentLesson)
+                    TeacherAssignment, Schedule, JournalEntry, DailyAttendance, SemesterGPA, Comment,
+                    CurrentLesson)
 
 
 @admin.register(User)
@@ -20,6 +21,7 @@ class CourseAdmin(admin.ModelAdmin):
 class GroupAdmin(admin.ModelAdmin):
     list_display = ['name', 'course', 'created_at']
     list_filter = ['course']
+    list_select_related = ['course']
     search_fields = ['name']
 
 
@@ -27,6 +29,7 @@ class GroupAdmin(admin.ModelAdmin):
 class SubjectAdmin(admin.ModelAdmin):
     list_display = ['name', 'code', 'course', 'hours_per_week']
     list_filter = ['course']
+    list_select_related = ['course']
     search_fields = ['name', 'code']
 
 
@@ -34,6 +37,7 @@ class SubjectAdmin(admin.ModelAdmin):
 class StudentAdmin(admin.ModelAdmin):
     list_display = ['student_id', 'last_name', 'first_name', 'group', 'course', 'gpa', 'contract_status', 'is_active']
     list_filter = ['group', 'course', 'contract_status', 'is_active']
+    list_select_related = ['group', 'course']
     search_fields = ['student_id', 'last_name', 'first_name']
 
 
@@ -47,6 +51,7 @@ class SemesterAdmin(admin.ModelAdmin):
 class TeacherAssignmentAdmin(admin.ModelAdmin):
     list_display = ['teacher', 'group', 'subject', 'semester', 'can_grade']
     list_filter = ['semester', 'can_grade']
+    list_select_related = ['teacher', 'group', 'subject', 'semester']
     search_fields = ['teacher__full_name', 'group__name', 'subject__name']
 
 
@@ -54,19 +59,44 @@ class TeacherAssignmentAdmin(admin.ModelAdmin):
 class ScheduleAdmin(admin.ModelAdmin):
     list_display = ['teacher_assignment', 'weekday', 'start_time', 'end_time', 'room']
     list_filter = ['weekday']
+    list_select_related = ['teacher_assignment__teacher', 'teacher_assignment__group', 'teacher_assignment__subject']
 
 
 @admin.register(JournalEntry)
 class JournalEntryAdmin(admin.ModelAdmin):
     list_display = ['student', 'teacher_assignment', 'date', 'grade', 'attendance', 'attendance_points']
     list_filter = ['date', 'attendance']
+    # __str__ записи и назначения читают студента, преподавателя, группу и предмет
+    list_select_related = [
+        'student', 'teacher_assignment__teacher', 'teacher_assignment__group', 'teacher_assignment__subject',
+    ]
     search_fields = ['student__last_name', 'student__first_name']
 
 
+@admin.register(DailyAttendance)
+class DailyAttendanceAdmin(admin.ModelAdmin):
+    list_display = ['date', 'group', 'subject', 'present_count', 'total_count']
+    list_filter = ['date', 'group']
+    list_select_related = [
+        'group', 'subject', 'teacher_assignment__teacher', 'teacher_assignment__group', 'teacher_assignment__subject',
+    ]
+    readonly_fields = ['present_count', 'total_count', 'grade_sum', 'grade_count']
+
+
+@admin.register(SemesterGPA)
+class SemesterGPAAdmin(admin.ModelAdmin):
+    list_display = ['student', 'semester', 'gpa', 'grade_count']
+    list_filter = ['semester']
+    search_fields = ['student__last_name', 'student__student_id']
+    list_select_related = ['student', 'semester']
+    readonly_fields = ['grade_sum', 'grade_count', 'gpa']
+
+
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ['student', 'author', 'comment_type', 'created_at']
     list_filter = ['comment_type', 'created_at']
+    list_select_related = ['student', 'author']
     search_fields = ['student__last_name', 'author__full_name']
 
 
@@ -74,3 +104,7 @@ class CommentAdmin(admin.ModelAdmin):
 class CurrentLessonAdmin(admin.ModelAdmin):
     list_display = ['schedule', 'date', 'present_count', 'total_students', 'attendance_percentage']
     list_filter = ['date']
+    list_select_related = [
+        'schedule__teacher_assignment__teacher', 'schedule__teacher_assignment__group',
+        'schedule__teacher_assignment__subject',
+    ]
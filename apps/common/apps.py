@@ -5,3 +5,7 @@ class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.common'
     verbose_name = 'Умумӣ'
+
+    def ready(self):
+        from . import receivers  # noqa: F401
+        from . import tasks  # noqa: F401
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+
+# Сторонние файлы, скачанные командой vendor_assets
+VENDOR_DIR = 'vendor/'
+
+
+@dataclass(frozen=True)
+class Asset:
+    """
+    Сторонний CSS/JS: локальный путь внутри static и CDN на случай,
+    если файл еще не скачан (vendor_assets) или не собран (npm run build:css).
+    """
+    path: str
+    cdn: str
+    # Тип CDN-варианта, если он отличается от локального (Tailwind: JS-рантайм вместо CSS)
+    cdn_kind: str = ''
+    # Сопутствующие файлы (путь, адрес), на которые ссылается CSS: шрифты
+    files: tuple = ()
+
+    @property
+    def vendored(self):
+        return self.path.startswith(VENDOR_DIR)
+
+    @property
+    def local(self):
+        return _exists(self.path)
+
+    @property
+    def url(self):
+        return static(self.path) if self.local else self.cdn
+
+    @property
+    def kind(self):
+        if not self.local and self.cdn_kind:
+            return self.cdn_kind
+        return self.path.rsplit('.', 1)[-1]
+
+
+FONTAWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1'
+DATATABLES_CDN = 'https://cdn.datatables.net/1.13.7'
+
+ASSETS = {
+    'bootstrap': Asset(
+        'vendor/bootstrap/bootstrap.min.css',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css',
+    ),
+    'fontawesome': Asset(
+        'vendor/fontawesome/css/all.min.css',
+        f'{FONTAWESOME_CDN}/css/all.min.css',
+        files=tuple(
+            (f'vendor/fontawesome/webfonts/{name}.{ext}', f'{FONTAWESOME_CDN}/webfonts/{name}.{ext}')
+            for name in ('fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility')
+            for ext in ('woff2', 'ttf')
+        ),
+    ),
+    # Собирается из templates командой npm run build:css (tailwind.config.js)
+    'tailwind': Asset('css/tailwind.css', 'https://cdn.tailwindcss.com', cdn_kind='js'),
+    'chartjs': Asset(
+        'vendor/chart.js/chart.umd.min.js',
+        'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js',
+    ),
+    # Поставляется вместе с django.contrib.admin
+    'jquery': Asset('admin/js/vendor/jquery/jquery.min.js', 'https://code.jquery.com/jquery-3.7.1.min.js'),
+    'datatables-css': Asset(
+        'vendor/datatables/dataTables.bootstrap5.min.css',
+        f'{DATATABLES_CDN}/css/dataTables.bootstrap5.min.css',
+    ),
+    'datatables': Asset(
+        'vendor/datatables/jquery.dataTables.min.js',
+        f'{DATATABLES_CDN}/js/jquery.dataTables.min.js',
+    ),
+    'datatables-bs5': Asset(
+        'vendor/datatables/dataTables.bootstrap5.min.js',
+        f'{DATATABLES_CDN}/js/dataTables.bootstrap5.min.js',
+    ),
+    'datatables-ru': Asset(
+        'vendor/datatables/ru.json',
+        'https://cdn.datatables.net/plug-ins/1.13.7/i18n/ru.json',
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def _exists(path):
+    """Есть ли файл среди static (результат кэшируется на процесс)"""
+    return finders.find(path) is not None
+
@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count
+
+from .models import JournalEntry, TeacherAssignment
+
+
+# +1.6 балл за каждый день, 3 дня в неделю = 6 баллов
+DAILY_POINTS = Decimal('1.6')
+WEEKLY_POINTS = Decimal('6.0')
+FULL_WEEK_DAYS = 3
+NO_POINTS = Decimal('0.00')
+
+# Ограничение на количество параметров в IN (...) для SQLite
+STUDENT_BATCH_SIZE = 500
+
+
+def get_week_start(date):
+    """Понедельник недели, в которую входит дата"""
+    return date - timedelta(days=date.weekday())
+
+
+def points_per_day(days_attended):
+    """Баллы за один день при days_attended посещениях за неделю"""
+    if days_attended >= FULL_WEEK_DAYS:
+        return (WEEKLY_POINTS / days_attended).quantize(Decimal('0.01'))
+    return DAILY_POINTS
+
+
+def week_total_points(days_attended):
+    """Сумма баллов за неделю"""
+    if days_attended >= FULL_WEEK_DAYS:
+        return WEEKLY_POINTS
+    return DAILY_POINTS * days_attended
+
+
+def calculate_weekly_attendance_points(student, teacher_assignment, week_start_date):
+    """Расчет баллов посещаемости за неделю (те же записи и правила, что и при пересчете)"""
+    entries = _entries(
+        student=student,
+        teacher_assignment=teacher_assignment,
+        date__gte=week_start_date,
+        date__lt=week_start_date + timedelta(days=7),
+    )
+    return float(week_total_points(_days_attended(entries)))
+
+
+def _days_attended(week_entries):
+    return sum(1 for e in week_entries if e.attendance)
+
+
+def _apply_points(entries, weeks=None, instances=None):
+    """
+    Пересчитать баллы для записей одного назначения.
+
+    weeks — {student_id: {week_start}}: если задано, учитываются только эти недели.
+    instances — {pk: JournalEntry}: объекты в памяти, которым нужно проставить новое значение.
+    Возвращает список измененных записей.
+    """
+    groups = defaultdict(list)
+    for entry in entries:
+        week_start = get_week_start(entry.date)
+        if weeks is None or week_start in weeks.get(entry.student_id, ()):
+            groups[(entry.student_id, week_start)].append(entry)
+
+    changed = []
+    for week_entries in groups.values():
+        days_attended = _days_attended(week_entries)
+        for entry in week_entries:
+            points = points_per_day(days_attended) if entry.attendance else NO_POINTS
+            if instances and entry.pk in instances:
+                instances[entry.pk].attendance_points = points
+            if entry.attendance_points is None or Decimal(entry.attendance_points) != points:
+                entry.attendance_points = points
+                changed.append(entry)
+    return changed
+
+
+def _entries(**filters):
+    return JournalEntry.objects.filter(**filters).only(
+        'id', 'student_id', 'date', 'attendance', 'attendance_points'
+    )
+
+
+def recompute_attendance_points(keys, instances=()):
+    """
+    Пересчет баллов посещаемости для набора ключей
+    (student_id, teacher_assignment_id, week_start).
+
+    Все записи затронутых недель читаются одним запросом на пачку студентов,
+    измененные баллы сохраняются через bulk_update. Пересчитываются и
+    «соседние» записи той же недели.
+    """
+    by_assignment = defaultdict(lambda: defaultdict(set))
+    for student_id, assignment_id, week_start in keys:
+        by_assignment[assignment_id][student_id].add(week_start)
+    instances = {obj.pk: obj for obj in instances}
+
+    updated = 0
+    for assignment_id, student_weeks in by_assignment.items():
+        student_ids = list(student_weeks)
+        for i in range(0, len(student_ids), STUDENT_BATCH_SIZE):
+            batch = student_ids[i:i + STUDENT_BATCH_SIZE]
+            weeks = set().union(*(student_weeks[s] for s in batch))
+            entries = _entries(
+                teacher_assignment_id=assignment_id,
+                student_id__in=batch,
+                date__gte=min(weeks),
+                date__lt=max(weeks) + timedelta(days=7),
+            )
+            changed = _apply_points(entries, weeks=student_weeks, instances=instances)
+            if changed:
+                JournalEntry.objects.bulk_update(changed, ['attendance_points'], batch_size=STUDENT_BATCH_SIZE)
+                updated += len(changed)
+
+    return updated
+
+
+def recompute_semester_points(semester, chunk_size=STUDENT_BATCH_SIZE):
+    """
+    Полный пересчет баллов за семестр.
+
+    Назначения обрабатываются по одному, студенты — пачками по chunk_size,
+    поэтому в памяти одновременно держится только одна пачка записей.
+    Возвращает (количество назначений, количество обновленных записей).
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be at least 1, got {chunk_size}')
+    assignment_ids = list(
+        TeacherAssignment.objects.filter(semester=semester).values_list('id', flat=True)
+    )
+    # Только назначения, по которым есть записи, и их студенты — одним запросом
+    students_by_assignment = defaultdict(list)
+    rows = (
+        JournalEntry.objects.filter(teacher_assignment_id__in=assignment_ids)
+        .values_list('teacher_assignment_id', 'student_id')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for assignment_id, student_id, _ in rows:
+        students_by_assignment[assignment_id].append(student_id)
+
+    updated = 0
+    for assignment_id, student_ids in students_by_assignment.items():
+        for i in range(0, len(student_ids), chunk_size):
+            entries = _entries(
+                teacher_assignment_id=assignment_id,
+                student_id__in=student_ids[i:i + chunk_size],
+            )
+            changed = _apply_points(entries)
+            if changed:
+                JournalEntry.objects.bulk_update(changed, ['attendance_points'], batch_size=chunk_size)
+                updated += len(changed)
+
+    return len(students_by_assignment), updated
@@ -0,0 +1,66 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models.fields.files import FieldFile
+
+
+def user_cache_key(user_id):
+    return f'auth:user-fields:{user_id}'
+
+
+def _cached_fields(user):
+    """Значения полей пользователя для кэша — все, кроме хэша пароля"""
+    fields = {}
+    for field in user._meta.concrete_fields:
+        if field.attname == 'password':
+            continue
+        value = getattr(user, field.attname)
+        # FieldFile тянет за собой экземпляр модели вместе с паролем
+        fields[field.attname] = value.name if isinstance(value, FieldFile) else value
+    return {'fields': fields, 'session_auth_hash': user.get_session_auth_hash()}
+
+
+def _user_from_cache(data):
+    """
+    Собирает пользователя из кэша с отложенным полем password.
+
+    Проверке сессии хватает готового HMAC от пароля (то же значение хранится
+    в самой сессии); обращение к user.password догрузит поле из базы, а save()
+    с отложенным полем не затрет пароль.
+    """
+    fields = data['fields']
+    user = get_user_model().from_db('default', list(fields), list(fields.values()))
+    session_auth_hash = data['session_auth_hash']
+    user.get_session_auth_hash = lambda: session_auth_hash
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который держит пользователя сессии в кэше.
+
+    AuthenticationMiddleware и role_required получают пользователя без
+    SELECT на каждый запрос; запись User сбрасывает ключ (receivers).
+    Хэш пароля в кэш не попадает.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        data = cache.get(key)
+        if data is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, _cached_fields(user), settings.AUTH_USER_CACHE_TIMEOUT)
+        else:
+            user = _user_from_cache(data)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        return await sync_to_async(self.get_user)(user_id)
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
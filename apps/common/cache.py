@@ -0,0 +1,129 @@
+import hashlib
+import os
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+
+from .routers import primary_reads
+
+
+# Сколько ждать чужого пересчета, прежде чем считать самому (секунды)
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+# Устаревшая копия живет дольше основной и отдается, пока идет пересчет
+STALE_FACTOR = 10
+
+
+def get_version(name):
+    """Текущая версия набора данных (для ключей кэша)"""
+    version = cache.get(f'version:{name}')
+    if version is None:
+        cache.add(f'version:{name}', 1, None)
+        version = cache.get(f'version:{name}', 1)
+    return version
+
+
+def bump_version(name):
+    """
+    Инвалидировать все ключи, построенные на версии name.
+
+    Версия меняется после коммита текущей транзакции: иначе читатель успел
+    бы закэшировать еще не закоммиченные (старые) данные под новой версией.
+    Вне транзакции — сразу.
+    """
+    transaction.on_commit(lambda: _incr_version(name))
+
+
+def _incr_version(name):
+    # incr файлового кэша не атомарен: два одновременных сброса могут дать
+    # одну и ту же версию — это безопасно, старая версия все равно сменилась
+    try:
+        return cache.incr(f'version:{name}')
+    except ValueError:
+        cache.set(f'version:{name}', 2, None)
+        return 2
+
+
+def _lock_file(lock_key):
+    """Файл блокировки рядом с файловым кэшем или None для других бэкендов"""
+    backend = caches['default']
+    if not isinstance(backend, FileBasedCache):
+        return None
+    directory = os.path.join(backend._dir, 'locks')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, hashlib.md5(lock_key.encode()).hexdigest())
+
+
+def _acquire_lock(lock_key):
+    """
+    Взять блокировку пересчета.
+
+    cache.add файлового кэша не атомарен (проверка и запись — два шага),
+    поэтому для него блокировка — файл, созданный с O_EXCL. Остальные
+    бэкенды (memcached, redis, locmem) выполняют add атомарно.
+    Блокировка старше LOCK_TIMEOUT (процесс упал) снимается; это
+    best-effort: два процесса, одновременно снявшие ее, посчитают оба.
+    """
+    path = _lock_file(lock_key)
+    if path is None:
+        return cache.add(lock_key, 1, LOCK_TIMEOUT)
+    try:
+        if time.time() - os.path.getmtime(path) > LOCK_TIMEOUT:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+def _release_lock(lock_key):
+    path = _lock_file(lock_key)
+    if path is None:
+        cache.delete(lock_key)
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def get_or_compute(key, compute, timeout, stale_key=None):
+    """
+    cache.get_or_set с защитой от «stampede».
+
+    Пересчет выполняет только тот процесс, который взял блокировку;
+    остальные отдают устаревшую копию (stale_key) или ждут готового значения.
+    Значение для кэша считается по default, а не по реплике.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    stale_key = stale_key or f'{key}:stale'
+    lock_key = f'{key}:lock'
+    if _acquire_lock(lock_key):
+        try:
+            with primary_reads():
+                value = compute()
+            cache.set(key, value, timeout)
+            cache.set(stale_key, value, timeout * STALE_FACTOR)
+        finally:
+            _release_lock(lock_key)
+        return value
+
+    stale = cache.get(stale_key)
+    if stale is not None:
+        return stale
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return compute()
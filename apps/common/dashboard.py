@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from .cache import bump_version, get_or_compute, get_version
+from .models import Group, Semester, Student, User
+from .rollup import attendance_totals
+
+
+DASHBOARD_VERSION = 'dashboard'
+TOP_LIMIT = 10
+
+
+def _student_list(queryset):
+    """Короткие записи студентов для списков панели (без моделей в кэше)"""
+    rows = queryset.values_list('id', 'last_name', 'first_name', 'middle_name', 'gpa', 'group__name')
+    return [
+        {
+            'id': pk,
+            'full_name': f"{last_name} {first_name} {middle_name}".strip(),
+            'gpa': gpa,
+            'group': group,
+        }
+        for pk, last_name, first_name, middle_name, gpa, group in rows
+    ]
+
+
+def compute_dashboard_summary():
+    """
+    Все показатели панелей: по одному агрегатному запросу на таблицу
+    (посещаемость — из сводки DailyAttendance) и два коротких списка
+    (топ по GPA и должники).
+    """
+    today = timezone.localdate()
+    students = Student.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        avg_gpa=Avg('gpa', filter=Q(is_active=True)),
+    )
+    users = User.objects.aggregate(
+        total=Count('id'),
+        teachers=Count('id', filter=Q(role='teacher')),
+    )
+    attendance = attendance_totals(date=today)
+    semester = Semester.objects.filter(is_active=True, start_date__lte=today, end_date__gte=today).first()
+    semester_attendance = attendance_totals(date__range=(semester.start_date, today)) if semester else None
+
+    active = Student.objects.filter(is_active=True)
+    return {
+        'date': today,
+        'total_students': students['active'],
+        'all_students': students['total'],
+        'avg_gpa': round(students['avg_gpa'] or 0, 2),
+        'total_groups': Group.objects.count(),
+        'total_users': users['total'],
+        'total_teachers': users['teachers'],
+        'today_total': attendance['total'],
+        'today_present': attendance['present'],
+        'today_percentage': attendance['percentage'],
+        'semester_percentage': semester_attendance['percentage'] if semester_attendance else None,
+        'top_students': _student_list(active.order_by('-gpa')[:TOP_LIMIT]),
+        'debt_students': _student_list(active.filter(contract_status='debt').order_by('last_name')[:TOP_LIMIT]),
+    }
+
+
+def get_dashboard_summary():
+    """
+    Снимок показателей для панелей декана, замдекана и админа.
+
+    Хранится в кэше DASHBOARD_CACHE_TIMEOUT секунд и сбрасывается при
+    изменении студентов, групп, пользователей и сегодняшнего журнала.
+    """
+    today = timezone.localdate()
+    return get_or_compute(
+        f'dashboard:v{get_version(DASHBOARD_VERSION)}:{today.isoformat()}',
+        compute_dashboard_summary,
+        settings.DASHBOARD_CACHE_TIMEOUT,
+        stale_key=f'dashboard:stale:{today.isoformat()}',
+    )
+
+
+def invalidate_dashboard():
+    bump_version(DASHBOARD_VERSION)
@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+
+from .models import Student, TeacherAssignment, User
+from .pagination import _value
+from .search import search_students
+
+
+# Больше строк за запрос не отдаем (в том числе при length=-1)
+MAX_LENGTH = 100
+DEFAULT_LENGTH = 25
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    Колонка таблицы: name — ключ в JSON (columns[i][data] на клиенте),
+    field — путь ORM для сортировки, фильтра и only().
+    """
+    name: str
+    field: str
+    searchable: bool = True
+    orderable: bool = True
+    # Вычисляемое значение (например, ФИО) и поля, которые ему нужны
+    render: object = None
+    needs: tuple = ()
+
+
+@dataclass(frozen=True)
+class Table:
+    """Таблица из белого списка: базовый queryset, колонки и select_related"""
+    queryset: object
+    columns: tuple
+    select_related: tuple = ()
+    # Глобальный поиск, если icontains по колонкам не подходит: search(queryset, value)
+    search: object = None
+
+    def column(self, name):
+        for column in self.columns:
+            if column.name == name:
+                return column
+        raise ValueError(f'Unknown column: {name}')
+
+    def only_fields(self):
+        fields = []
+        for column in self.columns:
+            fields.extend(column.needs or (column.field,))
+        return fields
+
+
+STUDENT_COLUMNS = (
+    Column('student_id', 'student_id'),
+    Column('full_name', 'last_name', render=Student.get_full_name,
+           needs=('last_name', 'first_name', 'middle_name')),
+    Column('group', 'group__name'),
+    Column('course', 'course__number'),
+    Column('phone', 'phone'),
+    Column('email', 'email'),
+    Column('gpa', 'gpa', searchable=False),
+    Column('contract_status', 'contract_status'),
+)
+
+TABLES = {
+    'students': Table(
+        Student.objects.filter(is_active=True), STUDENT_COLUMNS,
+        select_related=('group', 'course'), search=search_students,
+    ),
+    'all_students': Table(
+        Student.objects.all(), STUDENT_COLUMNS + (Column('is_active', 'is_active', searchable=False),),
+        select_related=('group', 'course'), search=search_students,
+    ),
+    'teachers': Table(
+        User.objects.filter(role='teacher'),
+        (
+            Column('username', 'username'),
+            Column('full_name', 'full_name'),
+            Column('phone', 'phone'),
+            Column('email', 'email'),
+        ),
+    ),
+    'journals': Table(
+        TeacherAssignment.objects.all(),
+        (
+            Column('id', 'pk', searchable=False),
+            Column('teacher', 'teacher__full_name'),
+            Column('group', 'group__name'),
+            Column('subject', 'subject__name'),
+            Column('semester', 'semester__name'),
+            Column('can_grade', 'can_grade', searchable=False),
+        ),
+        select_related=('teacher', 'group', 'subject', 'semester'),
+    ),
+}
+
+
+def _request_columns(params):
+    """columns[i][...] из запроса DataTables: [(name, search_value), ...]"""
+    columns = []
+    while f'columns[{len(columns)}][data]' in params:
+        i = len(columns)
+        columns.append((params[f'columns[{i}][data]'], params.get(f'columns[{i}][search][value]', '').strip()))
+    return columns
+
+
+def _global_filter(table, queryset, value):
+    if table.search:
+        return table.search(queryset, value)
+    condition = Q()
+    for token in value.split():
+        token_condition = Q()
+        for column in table.columns:
+            if column.searchable:
+                token_condition |= Q(**{f'{column.field}__icontains': token})
+        condition &= token_condition
+    return queryset.filter(condition)
+
+
+def _ordering(table, params, columns):
+    """order[i][column]/order[i][dir] -> order_by; pk в конце для стабильных страниц"""
+    ordering = []
+    i = 0
+    while f'order[{i}][column]' in params:
+        index = int(params[f'order[{i}][column]'])
+        column = table.column(columns[index][0])
+        if column.orderable:
+            prefix = '-' if params.get(f'order[{i}][dir]') == 'desc' else ''
+            ordering.append(prefix + column.field)
+        i += 1
+    return ordering + ['pk']
+
+
+def table_data(table, params):
+    """
+    Ответ по протоколу DataTables (serverSide): страница строк, общее
+    количество и количество после фильтров. Один запрос за строками (only()
+    + select_related) и один-два COUNT.
+    """
+    start = max(int(params.get('start', 0)), 0)
+    length = int(params.get('length', DEFAULT_LENGTH))
+    if length < 0 or length > MAX_LENGTH:
+        length = MAX_LENGTH
+
+    columns = _request_columns(params)
+    queryset = table.queryset.all()
+    filtered = False
+
+    value = params.get('search[value]', '').strip()
+    if value:
+        queryset = _global_filter(table, queryset, value)
+        filtered = True
+    for name, value in columns:
+        column = table.column(name)
+        if value and column.searchable:
+            queryset = queryset.filter(**{f'{column.field}__icontains': value})
+            filtered = True
+
+    rows = (
+        queryset.select_related(*table.select_related)
+        .only(*table.only_fields())
+        .order_by(*_ordering(table, params, columns))[start:start + length]
+    )
+    total = table.queryset.count()
+    return {
+        'recordsTotal': total,
+        'recordsFiltered': queryset.count() if filtered else total,
+        'data': [
+            {
+                column.name: column.render(obj) if column.render else _value(obj, column.field)
+                for column in table.columns
+            }
+            for obj in rows
+        ],
+    }
+
+
+def datatable_response(request, name, allowed):
+    """JSON для таблицы name, если она разрешена этой роли (allowed)"""
+    if name not in allowed:
+        raise Http404
+    try:
+        draw = int(request.GET.get('draw', 0))
+    except ValueError:
+        draw = 0
+    try:
+        data = table_data(TABLES[name], request.GET)
+    except (ValueError, IndexError, ValidationError) as e:
+        # По протоколу ошибка возвращается в поле error, DataTables показывает ее сам
+        return JsonResponse({'draw': draw, 'error': str(e)})
+    return JsonResponse({'draw': draw, **data}, encoder=DjangoJSONEncoder)
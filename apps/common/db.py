@@ -0,0 +1,39 @@
+import functools
+import random
+import time
+
+from django.db import OperationalError, connection
+
+
+LOCK_ERRORS = ('database is locked', 'database table is locked')
+RETRY_ATTEMPTS = 5
+# Пауза перед n-м повтором: RETRY_BASE_DELAY * 2**n плюс случайная добавка
+RETRY_BASE_DELAY = 0.05
+
+
+def is_lock_error(exc):
+    message = str(exc).lower()
+    return any(error in message for error in LOCK_ERRORS)
+
+
+def retry_on_lock(func=None, *, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY):
+    """
+    Повторить транзакцию записи, если SQLite ответил "database is locked".
+
+    Оборачиваемая функция должна сама открывать transaction.atomic(), чтобы
+    неудачная попытка откатывалась целиком. Внутри внешней транзакции повтора
+    нет — ошибка уходит вызывающему, который откатит свою транзакцию.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if not is_lock_error(exc) or connection.in_atomic_block or attempt == attempts - 1:
+                        raise
+                time.sleep(base_delay * 2 ** attempt * (1 + random.random()))
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
@@ -0,0 +1,112 @@
+import csv
+import tempfile
+
+import openpyxl
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from openpyxl.cell import WriteOnlyCell
+
+from .models import JournalEntry
+
+
+# Тот же формат, что читает import_journal_from_excel
+JOURNAL_HEADER = ['student_id', 'date', 'grade', 'attendance']
+ROSTER_HEADER = ['student_id', 'last_name', 'first_name', 'middle_name', 'group', 'phone', 'email', 'gpa', 'contract_status']
+ROSTER_FIELDS = ['student_id', 'last_name', 'first_name', 'middle_name', 'group__name', 'phone', 'email', 'gpa', 'contract_status']
+
+ITERATOR_CHUNK_SIZE = 2000
+
+# Строки с таким началом Excel/LibreOffice считают формулой: имя, телефон
+# или email вида "=HYPERLINK(...)" выполнился бы при открытии файла
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def journal_rows(assignment):
+    """Строки журнала назначения в формате импорта"""
+    entries = (
+        JournalEntry.objects.filter(teacher_assignment=assignment)
+        .order_by('date', 'student__last_name', 'student__first_name')
+        .values_list('student__student_id', 'date', 'grade', 'attendance')
+    )
+    for student_id, date, grade, attendance in entries.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield [student_id, date, grade, 1 if attendance else 0]
+
+
+def student_rows(queryset):
+    """Строки списка студентов (ростер группы или отфильтрованный список)"""
+    students = queryset.order_by('group__name', 'last_name', 'first_name').values_list(*ROSTER_FIELDS)
+    for row in students.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield list(row)
+
+
+def _formula_like(value):
+    return isinstance(value, str) and value.startswith(FORMULA_PREFIXES)
+
+
+def csv_value(value):
+    """Значение ячейки CSV; строка-«формула» экранируется апострофом"""
+    if value is None:
+        return ''
+    return f"'{value}" if _formula_like(value) else value
+
+
+def xlsx_row(ws, row):
+    """
+    Строка для ws.append() листа write-only: строки-«формулы» пишутся
+    ячейкой строкового типа (openpyxl сохраняет "=..." как формулу)
+    """
+    cells = []
+    for value in row:
+        if _formula_like(value):
+            value = WriteOnlyCell(ws, value=value)
+            value.data_type = 's'
+        cells.append(value)
+    return cells
+
+
+class _Echo:
+    """Псевдо-файл для csv.writer: возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(filename, header, rows):
+    """CSV отдается потоком — загрузка начинается сразу, память постоянна"""
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield '\ufeff'  # BOM, чтобы Excel открыл UTF-8
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([csv_value(value) for value in row])
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = content_disposition_header(True, f'{filename}.csv')
+    return response
+
+
+def xlsx_response(filename, header, rows):
+    """
+    XLSX в режиме write-only: строки сразу уходят во временный файл на диске,
+    в памяти книга не строится.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header)
+    for row in rows:
+        ws.append(xlsx_row(ws, row))
+
+    output = tempfile.TemporaryFile()
+    wb.save(output)
+    output.seek(0)
+    return FileResponse(
+        output, as_attachment=True, filename=f'{filename}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+def export_response(export_format, filename, header, rows):
+    if export_format == 'csv':
+        return csv_response(filename, header, rows)
+    return xlsx_response(filename, header, rows)
@@ -0,0 +1,118 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .attendance import STUDENT_BATCH_SIZE
+from .models import JournalEntry, SemesterGPA, Student, TeacherAssignment
+
+
+NO_GPA = Decimal('0.00')
+
+
+def calculate_gpa(grade_sum, grade_count):
+    """Средний балл (0–3) с округлением до сотых"""
+    if not grade_count:
+        return NO_GPA
+    return (Decimal(grade_sum) / grade_count).quantize(Decimal('0.01'))
+
+
+def _grade_totals(**filters):
+    """{(student_id, semester_id): (сумма, количество)} — один групповой запрос"""
+    rows = (
+        JournalEntry.objects.filter(grade__isnull=False, **filters)
+        .values_list('student_id', 'teacher_assignment__semester_id')
+        .annotate(total=Sum('grade'), n=Count('grade'))
+        .order_by()
+    )
+    return {(student_id, semester_id): (total, n) for student_id, semester_id, total, n in rows}
+
+
+def _save_semester_gpas(pairs, totals):
+    """Записать суммы для пар (student_id, semester_id); пары без оценок обнуляются"""
+    rows = []
+    for student_id, semester_id in pairs:
+        grade_sum, grade_count = totals.get((student_id, semester_id), (0, 0))
+        rows.append(SemesterGPA(
+            student_id=student_id,
+            semester_id=semester_id,
+            grade_sum=grade_sum,
+            grade_count=grade_count,
+            gpa=calculate_gpa(grade_sum, grade_count),
+        ))
+    SemesterGPA.objects.bulk_create(
+        rows,
+        batch_size=STUDENT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['student', 'semester'],
+        update_fields=['grade_sum', 'grade_count', 'gpa', 'updated_at'],
+    )
+
+
+def _refresh_student_gpa(student_ids):
+    """
+    Student.gpa — общий GPA по всем семестрам из SemesterGPA.
+    Сохраняются только изменившиеся значения; возвращает их количество.
+    """
+    updated = 0
+    for i in range(0, len(student_ids), STUDENT_BATCH_SIZE):
+        batch = student_ids[i:i + STUDENT_BATCH_SIZE]
+        totals = dict(
+            (student_id, (grade_sum or 0, grade_count or 0))
+            for student_id, grade_sum, grade_count in SemesterGPA.objects.filter(student_id__in=batch)
+            .values_list('student_id')
+            .annotate(Sum('grade_sum'), Sum('grade_count'))
+            .order_by()
+        )
+        changed = []
+        for student in Student.objects.filter(id__in=batch).only('id', 'gpa'):
+            gpa = calculate_gpa(*totals.get(student.id, (0, 0)))
+            if Decimal(student.gpa) != gpa:
+                student.gpa = gpa
+                changed.append(student)
+        if changed:
+            Student.objects.bulk_update(changed, ['gpa'], batch_size=STUDENT_BATCH_SIZE)
+            updated += len(changed)
+    return updated
+
+
+def update_gpa(keys):
+    """
+    Пересчет GPA после записи в журнал.
+
+    keys — {(student_id, teacher_assignment_id, date)}. Суммы пересобираются
+    одним групповым запросом только для затронутых студентов и семестров,
+    поэтому пропущенное событие не накапливает ошибку.
+    """
+    assignment_ids = {assignment_id for _, assignment_id, _ in keys}
+    semesters = dict(
+        TeacherAssignment.objects.filter(id__in=assignment_ids).values_list('id', 'semester_id')
+    )
+    students_by_semester = defaultdict(set)
+    for student_id, assignment_id, _ in keys:
+        if assignment_id in semesters:
+            students_by_semester[semesters[assignment_id]].add(student_id)
+
+    with transaction.atomic():
+        for semester_id, student_ids in students_by_semester.items():
+            student_ids = sorted(student_ids)
+            for i in range(0, len(student_ids), STUDENT_BATCH_SIZE):
+                batch = student_ids[i:i + STUDENT_BATCH_SIZE]
+                totals = _grade_totals(student_id__in=batch, teacher_assignment__semester_id=semester_id)
+                _save_semester_gpas([(s, semester_id) for s in batch], totals)
+        return _refresh_student_gpa(sorted(set().union(*students_by_semester.values())))
+
+
+def recompute_semester_gpa(semester):
+    """
+    Полный пересчет GPA за семестр одним проходом по журналу.
+    Возвращает (количество студентов семестра, количество измененных Student.gpa).
+    """
+    with transaction.atomic():
+        totals = _grade_totals(teacher_assignment__semester=semester)
+        # Студенты, у которых оценки были раньше, но все удалены
+        stale = SemesterGPA.objects.filter(semester=semester).values_list('student_id', flat=True)
+        student_ids = sorted({s for s, _ in totals} | set(stale))
+        _save_semester_gpas([(s, semester.id) for s in student_ids], totals)
+        return len(student_ids), _refresh_student_gpa(student_ids)
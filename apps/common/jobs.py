@@ -0,0 +1,316 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Count, F
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from .db import retry_on_lock
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+# Задача без heartbeat дольше этого считается брошенной (воркер упал)
+STALE_AFTER = timedelta(minutes=10)
+# Как часто run_job отмечает heartbeat, пока работает обработчик (секунды)
+HEARTBEAT_INTERVAL = 30
+# Пауза перед n-м повтором: RETRY_BASE_DELAY * 2**(n-1) секунд
+RETRY_BASE_DELAY = 30
+# Прогресс пишется в БД не чаще раза в PROGRESS_INTERVAL секунд
+PROGRESS_INTERVAL = 1
+# Сколько задач claim_next перебирает, если первые уже забрали другие воркеры
+CLAIM_CANDIDATES = 20
+
+_handlers = {}
+# pk задач, которые сейчас выполняются в этом процессе
+_running = set()
+
+
+class JobError(Exception):
+    """Ошибка в данных задачи: повтор не поможет, задача сразу завершается с ошибкой"""
+
+
+def register(kind, concurrency=None):
+    """
+    Зарегистрировать обработчик handler(payload, progress) -> dict (результат).
+    concurrency — сколько задач этого вида выполняется одновременно
+    (None — без ограничения); JOB_CONCURRENCY в settings переопределяет.
+    """
+    def decorator(func):
+        _handlers[kind] = (func, concurrency)
+        return func
+    return decorator
+
+
+def concurrency_limit(kind):
+    return settings.JOB_CONCURRENCY.get(kind, _handlers[kind][1])
+
+
+def worker_name(suffix):
+    """Имя воркера host:pid:suffix — по нему requeue_stale проверяет, жив ли процесс"""
+    return f'{socket.gethostname()}:{os.getpid()}:{suffix}'
+
+
+class JobProgress:
+    """Передается обработчику: progress(done, total, message) пишет процент"""
+
+    def __init__(self, job):
+        self.job = job
+        self._written_at = 0
+
+    def __call__(self, done, total, message=''):
+        now = time.monotonic()
+        if now - self._written_at < PROGRESS_INTERVAL:
+            return
+        self._written_at = now
+        percent = min(99, done * 100 // total) if total else 0
+        _update_owned(self.job, progress=percent, progress_message=message[:200], heartbeat_at=timezone.now())
+
+
+class _Heartbeat(threading.Thread):
+    """Отмечает heartbeat задачи каждые HEARTBEAT_INTERVAL, пока выполняется обработчик"""
+
+    def __init__(self, job):
+        super().__init__(name=f'job-{job.pk}-heartbeat', daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(HEARTBEAT_INTERVAL):
+                try:
+                    _update_owned(self.job, heartbeat_at=timezone.now())
+                except DatabaseError:
+                    # БД занята длинной транзакцией обработчика — отметимся в следующий раз
+                    logger.warning('Job %s heartbeat failed', self.job.pk, exc_info=True)
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+@retry_on_lock
+def _update(pk, **fields):
+    with transaction.atomic():
+        return Job.objects.filter(pk=pk).update(**fields)
+
+
+@retry_on_lock
+def _update_owned(job, **fields):
+    """
+    Обновить задачу, только если она все еще выполняется этой попыткой этого
+    воркера: задачу, отданную другому воркеру, старая попытка не перезапишет.
+    """
+    with transaction.atomic():
+        return Job.objects.filter(
+            pk=job.pk, status='running', worker=job.worker, attempts=job.attempts,
+        ).update(**fields)
+
+
+def latest_job(kind, payload, user):
+    """Последняя задача пользователя с тем же видом и payload (или None)"""
+    return Job.objects.filter(kind=kind, payload=payload, created_by=user).order_by('-pk').first()
+
+
+@retry_on_lock
+def _create(kind, payload, user, max_attempts, unique):
+    # Проверка и создание в одной транзакции записи (default, не реплика):
+    # два одновременных запроса не создадут две одинаковые задачи
+    with transaction.atomic():
+        if unique:
+            existing = latest_job(kind, payload, user)
+            if existing and not existing.is_finished:
+                return existing
+        return Job.objects.create(kind=kind, payload=payload, created_by=user, max_attempts=max_attempts)
+
+
+def enqueue(kind, payload=None, user=None, temp_files=(), max_attempts=3, unique=False):
+    """
+    Поставить задачу в очередь. temp_files удаляются после того, как задача
+    завершится окончательно (успех или последняя неудачная попытка).
+    unique — не ставить вторую такую же задачу того же пользователя, пока
+    первая не выполнена (повторный клик, обновление страницы).
+    """
+    if kind not in _handlers:
+        raise ValueError(f'Unknown job kind: {kind}')
+    payload = dict(payload or {})
+    if temp_files:
+        payload['temp_files'] = [str(path) for path in temp_files]
+
+    job = _create(kind, payload, user, max_attempts, unique)
+    if settings.JOBS_RUN_INLINE and job.status == 'queued':
+        # Без воркера (разработка): задача выполняется сразу, в запросе
+        claimed = claim_next(worker=worker_name('inline'), pk=job.pk)
+        if claimed:
+            run_job(claimed)
+        job.refresh_from_db()
+    return job
+
+
+@retry_on_lock
+def claim_next(worker, pk=None):
+    """
+    Взять следующую задачу из очереди с учетом лимитов по видам.
+
+    Выбор и захват — в одной транзакции записи: на SQLite воркеры
+    выстраиваются на блокировке БД, на PostgreSQL строка берется с
+    SKIP LOCKED. Захват — условный UPDATE по status='queued': если задачу
+    уже забрал другой воркер, берется следующая из CLAIM_CANDIDATES.
+    Возвращает задачу в статусе running или None.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        running = dict(
+            Job.objects.filter(status='running').values_list('kind').annotate(n=Count('id')).order_by()
+        )
+        full = [
+            kind for kind, n in running.items()
+            if kind in _handlers and concurrency_limit(kind) is not None and n >= concurrency_limit(kind)
+        ]
+        queued = Job.objects.filter(status='queued', run_after__lte=now, kind__in=list(_handlers))
+        if pk is not None:
+            queued = queued.filter(pk=pk)
+        candidates = (
+            queued.exclude(kind__in=full)
+            .order_by('run_after', 'pk')
+            .select_for_update(skip_locked=True)[:CLAIM_CANDIDATES]
+        )
+        for job in candidates:
+            claimed = Job.objects.filter(pk=job.pk, status='queued').update(
+                status='running', worker=worker, attempts=F('attempts') + 1,
+                started_at=now, heartbeat_at=now, progress=0, progress_message='',
+            )
+            if claimed:
+                break
+        else:
+            return None
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job):
+    """
+    Выполнить захваченную задачу; ошибка — повтор с паузой или статус failed.
+    Пока работает обработчик, heartbeat обновляет отдельный поток, поэтому
+    обработчикам без progress() не грозит requeue_stale.
+    """
+    handler, _ = _handlers[job.kind]
+    heartbeat = _Heartbeat(job)
+    _running.add(job.pk)
+    heartbeat.start()
+    error = None
+    try:
+        result = handler(job.payload, JobProgress(job))
+    except Exception as exc:
+        error = exc
+    finally:
+        heartbeat.stop()
+        _running.discard(job.pk)
+
+    if error is None:
+        final = True
+        updated = _update_owned(job, status='done', result=result or {}, error='', progress=100,
+                                progress_message='', worker='', finished_at=timezone.now())
+    else:
+        final = isinstance(error, JobError) or job.attempts >= job.max_attempts
+        logger.warning('Job %s (%s) failed, attempt %s/%s', job.pk, job.kind, job.attempts, job.max_attempts,
+                       exc_info=(type(error), error, error.__traceback__) if not isinstance(error, JobError) else False)
+        message = str(error) or type(error).__name__
+        if final:
+            updated = _update_owned(job, status='failed', error=message, worker='', finished_at=timezone.now())
+        else:
+            delay = RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            updated = _update_owned(job, status='queued', error=message, worker='',
+                                    run_after=timezone.now() + timedelta(seconds=delay))
+
+    if not updated:
+        # Задачу уже забрал другой воркер (requeue_stale): ее состояние не трогаем
+        logger.warning('Job %s (%s) was taken over by another worker, outcome discarded', job.pk, job.kind)
+        return False
+    if final:
+        _remove_temp_files(job)
+    return error is None
+
+
+def user_job(request, pk):
+    """Задача, поставленная текущим пользователем (админ видит все), или 404"""
+    jobs = Job.objects.all()
+    if request.user.role != 'admin':
+        jobs = jobs.filter(created_by=request.user)
+    return get_object_or_404(jobs, pk=pk)
+
+
+def _other_process_alive(worker):
+    """
+    Жив ли другой процесс-воркер этой машины (на POSIX — проверка pid).
+    О воркерах других машин судим только по heartbeat.
+    """
+    host, _, rest = worker.partition(':')
+    pid = rest.partition(':')[0]
+    if host != socket.gethostname() or not pid.isdigit() or int(pid) == os.getpid():
+        return False
+    if os.name != 'posix':
+        # os.kill(pid, 0) на Windows завершает процесс
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def requeue_stale():
+    """
+    Задачи упавших воркеров (нет heartbeat STALE_AFTER) — снова в очередь
+    или failed. Задачи, которые выполняются в этом процессе, и задачи живых
+    процессов этой машины не трогаются: heartbeat могла задержать долгая
+    транзакция обработчика, но задача при этом не брошена.
+    """
+    stale = [
+        job for job in Job.objects.filter(status='running', heartbeat_at__lt=timezone.now() - STALE_AFTER)
+        if job.pk not in _running and not _other_process_alive(job.worker)
+    ]
+    requeued = 0
+    for job in stale:
+        if job.attempts >= job.max_attempts:
+            if _update_owned(job, status='failed', error='Коргар ҷавоб намедиҳад', worker='',
+                             finished_at=timezone.now()):
+                _remove_temp_files(job)
+                requeued += 1
+        else:
+            requeued += _update_owned(job, status='queued', worker='')
+    return requeued
+
+
+def purge_finished(older_than):
+    """Удалить завершенные задачи старше older_than вместе с файлами результатов"""
+    jobs = Job.objects.filter(status__in=('done', 'failed'), finished_at__lt=timezone.now() - older_than)
+    for job in jobs.only('result'):
+        if job.result and job.result.get('file'):
+            _remove(os.path.join(settings.JOB_FILES_DIR, job.result['file']))
+    return jobs.delete()[0]
+
+
+def _remove_temp_files(job):
+    for path in job.payload.get('temp_files', ()):
+        _remove(path)
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.warning('Could not remove job file %s', path, exc_info=True)
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+
+from django.db import transaction
+
+from .attendance import get_week_start, recompute_attendance_points
+from .db import retry_on_lock
+from .models import JournalEntry, Student
+from .signals import journal_entries_changed
+from .timetable import get_assignment_timetable
+
+
+UPSERT_BATCH_SIZE = 500
+
+
+def upsert_journal_entries(entries, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Массовое создание/обновление записей журнала в одной транзакции.
+
+    entries — несохраненные JournalEntry с заполненными student_id,
+    teacher_assignment_id, date, grade и attendance. После записи баллы
+    посещаемости пересчитываются для всех затронутых недель. Если БД занята
+    другим процессом, транзакция повторяется (retry_on_lock).
+    """
+    entries = list(entries)
+    if not entries:
+        return 0
+    _write_journal_entries(entries, batch_size)
+    return len(entries)
+
+
+@retry_on_lock
+def _write_journal_entries(entries, batch_size):
+    # id, выданные откатенной попыткой, недействительны
+    for entry in entries:
+        entry.pk = None
+
+    with transaction.atomic():
+        JournalEntry.objects.bulk_create(
+            entries,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['student', 'teacher_assignment', 'date'],
+            update_fields=['grade', 'attendance', 'updated_at'],
+        )
+        recompute_attendance_points({
+            (e.student_id, e.teacher_assignment_id, get_week_start(e.date))
+            for e in entries
+        })
+        journal_entries_changed.send(
+            sender=JournalEntry,
+            keys={(e.student_id, e.teacher_assignment_id, e.date) for e in entries},
+        )
+
+
+def get_lesson_dates(weekdays, start_date, end_date):
+    """Даты занятий по расписанию (дни недели) в диапазоне [start_date, end_date]"""
+    weekdays = set(weekdays)
+    dates = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays:
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+
+def build_journal_matrix(assignment, start_date, end_date):
+    """
+    Плотная матрица журнала студенты × даты для назначения.
+
+    Все записи диапазона читаются одним запросом. Колонки — даты занятий
+    по расписанию плюс даты, на которые уже есть записи. Ячейка — кортеж
+    (grade, attendance) или None, если записи нет.
+    """
+    students = list(
+        Student.objects.filter(group_id=assignment.group_id, is_active=True)
+        .order_by('last_name', 'first_name')
+        .values_list('id', 'student_id', 'last_name', 'first_name', 'middle_name')
+    )
+    entries = list(
+        JournalEntry.objects.filter(
+            teacher_assignment=assignment,
+            date__gte=start_date,
+            date__lte=end_date,
+        ).order_by().values_list('student_id', 'date', 'grade', 'attendance')
+    )
+    weekdays = get_assignment_timetable(assignment.id).weekdays(assignment.id)
+
+    dates = sorted(set(get_lesson_dates(weekdays, start_date, end_date)) | {e[1] for e in entries})
+    column = {d: i for i, d in enumerate(dates)}
+    row = {student[0]: i for i, student in enumerate(students)}
+
+    cells = [[None] * len(dates) for _ in students]
+    for student_id, date, grade, attendance in entries:
+        if student_id in row:
+            cells[row[student_id]][column[date]] = (grade, attendance)
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'dates': dates,
+        'rows': [
+            {
+                'id': pk,
+                'student_id': student_id,
+                'name': f"{last_name} {first_name} {middle_name}".strip(),
+                'cells': cells[i],
+            }
+            for i, (pk, student_id, last_name, first_name, middle_name) in enumerate(students)
+        ],
+    }
+
+
+def _parse_cell_student(value, student_ids):
+    try:
+        student_id = int(value)
+    except (TypeError, ValueError):
+        student_id = None
+    if student_id not in student_ids:
+        raise ValueError('Донишҷӯ дар ин гурӯҳ нест')
+    return student_id
+
+
+def _parse_cell_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('Санаи нодуруст')
+
+
+def _parse_cell_grade(value):
+    if value is None or value == '':
+        return None
+    try:
+        grade = int(value)
+    except (TypeError, ValueError):
+        grade = None
+    if grade not in (0, 1, 2, 3):
+        raise ValueError('Баҳои нодуруст')
+    return grade
+
+
+def _parse_cell_attendance(value):
+    if isinstance(value, str):
+        return value.lower() == 'true'
+    return bool(value)
+
+
+def validate_journal_cells(assignment, cells):
+    """
+    Проверка ячеек журнала для назначения.
+
+    cells — список словарей {student_id, date, grade, attendance}. Студенты
+    группы читаются один раз на весь набор, блокировка — по индексу расписания.
+    Возвращает (список несохраненных JournalEntry, список результатов по ячейкам).
+    """
+    student_ids = set(
+        Student.objects.filter(group_id=assignment.group_id, is_active=True).values_list('id', flat=True)
+    )
+    timetable = get_assignment_timetable(assignment.id)
+
+    entries = {}
+    results = []
+    for index, cell in enumerate(cells):
+        try:
+            if not isinstance(cell, dict):
+                raise ValueError('Маълумоти нодуруст')
+            student_id = _parse_cell_student(cell.get('student_id'), student_ids)
+            date = _parse_cell_date(cell.get('date'))
+            grade = _parse_cell_grade(cell.get('grade'))
+
+            # Проверить блокировку (по дате самой ячейки)
+            if timetable.is_locked(assignment.id, date):
+                raise ValueError('Ячейка қулф шудааст (1 соат гузашт)!')
+        except ValueError as e:
+            results.append({'index': index, 'status': 'error', 'message': str(e)})
+            continue
+
+        # Повтор (студент, дата) в одном запросе — побеждает последняя ячейка
+        entries[(student_id, date)] = JournalEntry(
+            student_id=student_id,
+            teacher_assignment_id=assignment.id,
+            date=date,
+            grade=grade,
+            attendance=_parse_cell_attendance(cell.get('attendance')),
+        )
+        results.append({'index': index, 'status': 'ok'})
+
+    return list(entries.values()), results
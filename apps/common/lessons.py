@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models import Count
+
+from .attendance import STUDENT_BATCH_SIZE
+from .live import invalidate_live_data
+from .models import CurrentLesson, DailyAttendance, Student
+from .timetable import get_timetable
+
+
+def materialize_current_lessons(date):
+    """
+    Создать/обновить CurrentLesson для всех уроков расписания на дату date.
+
+    Уроки берутся из индекса расписания, total_students — одним групповым
+    запросом по спискам групп, present_count — из сводки DailyAttendance.
+    Количество запросов не зависит от числа уроков (кроме пачек bulk_create).
+    Возвращает количество уроков дня.
+    """
+    lessons = get_timetable().day_lessons(date)
+
+    group_ids = {lesson.group_id for lesson in lessons}
+    roster = dict(
+        Student.objects.filter(is_active=True, group_id__in=group_ids)
+        .values_list('group_id')
+        .annotate(n=Count('id'))
+        .order_by()
+    ) if group_ids else {}
+    present = dict(
+        DailyAttendance.objects.filter(date=date).values_list('teacher_assignment_id', 'present_count')
+    )
+
+    rows = [
+        CurrentLesson(
+            schedule_id=lesson.id,
+            date=date,
+            total_students=roster.get(lesson.group_id, 0),
+            present_count=present.get(lesson.assignment_id, 0),
+        )
+        for lesson in lessons
+    ]
+    with transaction.atomic():
+        # Уроки, которых в расписании на этот день больше нет
+        CurrentLesson.objects.filter(date=date).exclude(
+            schedule_id__in=[lesson.id for lesson in lessons]
+        ).delete()
+        CurrentLesson.objects.bulk_create(
+            rows,
+            batch_size=STUDENT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['schedule', 'date'],
+            update_fields=['total_students', 'present_count'],
+        )
+    invalidate_live_data()
+    return len(rows)
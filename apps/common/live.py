@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .cache import bump_version, get_or_compute, get_version
+from .models import CurrentLesson, JournalEntry
+from .utils import get_live_attendance_data
+
+
+logger = logging.getLogger(__name__)
+
+LIVE_VERSION = 'live'
+
+# Server-Sent Events: как часто производитель проверяет снимок,
+# как часто слать keepalive и сколько событий держать для медленного клиента
+LIVE_PUSH_INTERVAL = 1
+LIVE_KEEPALIVE_INTERVAL = 15
+LIVE_QUEUE_SIZE = 20
+
+
+def get_live_snapshot():
+    """
+    Общий снимок Live Dashboard: {'data': ..., 'etag': ...}.
+
+    Считается один раз на интервал LIVE_CACHE_TIMEOUT для всех клиентов;
+    запись в журнал или изменение CurrentLesson меняет версию ключа.
+    """
+    def compute():
+        data = get_live_attendance_data()
+        body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+        return {'data': data, 'etag': hashlib.md5(body.encode()).hexdigest()}
+
+    version = get_version(LIVE_VERSION)
+    return get_or_compute(
+        f'live:v{version}', compute, settings.LIVE_CACHE_TIMEOUT, stale_key='live:stale'
+    )
+
+
+def live_data_etag(request):
+    """etag_func для @condition: ETag текущего снимка"""
+    return get_live_snapshot()['etag']
+
+
+def invalidate_live_data():
+    bump_version(LIVE_VERSION)
+
+
+def update_present_counts(keys):
+    """
+    Обновить CurrentLesson.present_count для уроков, затронутых записью в журнал.
+
+    keys — {(student_id, teacher_assignment_id, date)}. Пересчитываются только
+    уроки этих (назначение, дата), одним сгруппированным запросом.
+    """
+    pairs = {(assignment_id, date) for _, assignment_id, date in keys}
+    if not pairs:
+        return 0
+    assignment_ids = {a for a, _ in pairs}
+    dates = {d for _, d in pairs}
+
+    lessons = [
+        (lesson_id, (assignment_id, date))
+        for lesson_id, assignment_id, date in CurrentLesson.objects.filter(
+            date__in=dates,
+            schedule__teacher_assignment_id__in=assignment_ids,
+        ).values_list('id', 'schedule__teacher_assignment_id', 'date')
+        if (assignment_id, date) in pairs
+    ]
+    if not lessons:
+        return 0
+
+    present = dict(
+        ((assignment_id, date), n)
+        for assignment_id, date, n in JournalEntry.objects.filter(
+            teacher_assignment_id__in=assignment_ids,
+            date__in=dates,
+            attendance=True,
+        ).values_list('teacher_assignment_id', 'date').annotate(n=Count('id')).order_by()
+    )
+
+    # Один UPDATE на каждое различное значение
+    by_count = defaultdict(list)
+    for lesson_id, pair in lessons:
+        by_count[present.get(pair, 0)].append(lesson_id)
+    updated = 0
+    for count, lesson_ids in by_count.items():
+        updated += CurrentLesson.objects.filter(id__in=lesson_ids).exclude(present_count=count).update(present_count=count)
+
+    if updated:
+        invalidate_live_data()
+    return updated
+
+
+def diff_live_data(old, new):
+    """Только изменившиеся строки уроков + итоги"""
+    old_rows = {row['id']: row for row in old['current_lessons']} if old else {}
+    new_rows = {row['id']: row for row in new['current_lessons']}
+    return {
+        'changed': [row for lesson_id, row in new_rows.items() if old_rows.get(lesson_id) != row],
+        'removed': [lesson_id for lesson_id in old_rows if lesson_id not in new_rows],
+        'total_present': new['total_present'],
+        'total_students': new['total_students'],
+        'overall_percentage': new['overall_percentage'],
+    }
+
+
+class LiveBroadcaster:
+    """
+    Один производитель на процесс для Server-Sent Events.
+
+    Производитель раз в LIVE_PUSH_INTERVAL читает общий снимок (обычно это
+    попадание в кэш) и рассылает подписчикам только изменения. Запросов к
+    базе на каждого подключенного клиента нет.
+    """
+
+    def __init__(self, interval=LIVE_PUSH_INTERVAL):
+        self.interval = interval
+        self.subscribers = set()
+        self.snapshot = None
+        self.loading = None
+        self.task = None
+
+    async def subscribe(self):
+        """Подписаться: (очередь событий, текущие данные целиком)"""
+        queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        if self.snapshot is None:
+            await self._load_snapshot()
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return queue, self.snapshot['data']
+
+    async def _load_snapshot(self):
+        """
+        Первый снимок считает один подписчик, остальные ждут его результата.
+        Ошибка передается всем ждущим; следующий подписчик попробует снова.
+        """
+        if self.loading is None:
+            self.loading = asyncio.ensure_future(sync_to_async(get_live_snapshot)())
+        loading = self.loading
+        try:
+            self.snapshot = await asyncio.shield(loading)
+        finally:
+            if loading.done() and self.loading is loading:
+                self.loading = None
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def _publish(self, event, payload):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait((event, payload))
+            except asyncio.QueueFull:
+                # Медленный клиент: выбросить накопленное и отдать снимок целиком
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(('snapshot', self.snapshot['data']))
+
+    async def _run(self):
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                snapshot = await sync_to_async(get_live_snapshot)()
+            except Exception:
+                logger.exception('Live snapshot failed')
+                continue
+            if self.snapshot is None or snapshot['etag'] == self.snapshot['etag']:
+                continue
+            delta = diff_live_data(self.snapshot['data'], snapshot['data'])
+            self.snapshot = snapshot
+            self._publish('lessons', delta)
+        # Без подписчиков снимок устаревает: следующий подписчик прочитает заново
+        self.snapshot = None
+        self.task = None
+
+
+broadcaster = LiveBroadcaster()
+
+
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def _live_event_stream():
+    queue, data = await broadcaster.subscribe()
+    try:
+        yield _sse('snapshot', data)
+        while True:
+            try:
+                event, payload = await asyncio.wait_for(queue.get(), LIVE_KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield _sse(event, payload)
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+def live_stream_response(request):
+    """
+    Поток Server-Sent Events для Live Dashboard.
+
+    Работает только под ASGI-сервером. Под WSGI бесконечный поток занял бы
+    рабочий процесс, поэтому отвечаем 204 — EventSource прекращает
+    переподключение, и страница переходит на опрос live_data_api.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(_live_event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,39 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from apps.common.models import JournalEntry
+from apps.common.rollup import BACKFILL_CHUNK_DAYS, backfill_daily_attendance
+
+
+def _date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Санаи нодуруст: {value} (YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Аз нав сохтани ҷамъбасти ҳозиршавии рӯзона аз журнал'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Санаи оғоз, YYYY-MM-DD (пешфарз: аввалин ёддошт)')
+        parser.add_argument('--end', help='Санаи анҷом, YYYY-MM-DD (пешфарз: охирин ёддошт)')
+        parser.add_argument('--chunk-days', type=int, default=BACKFILL_CHUNK_DAYS)
+
+    def handle(self, *args, **options):
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days бояд аз 0 калон бошад')
+        bounds = JournalEntry.objects.aggregate(first=Min('date'), last=Max('date'))
+        start = _date(options['start']) if options['start'] else bounds['first']
+        end = _date(options['end']) if options['end'] else bounds['last']
+        if start is None or end is None:
+            raise CommandError('Журнал холӣ аст')
+
+        started = time.monotonic()
+        written = backfill_daily_attendance(start, end, chunk_days=options['chunk_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{start} – {end}: {written} сатр ({time.monotonic() - started:.2f} с)"
+        ))
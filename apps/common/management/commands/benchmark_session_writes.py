@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.common.models import User
+
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Режим до изменения: сессия в БД, запись на каждый запрос, пользователь из БД
+LEGACY_SETTINGS = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'SESSION_SAVE_EVERY_REQUEST': True,
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    'MIDDLEWARE': [m for m in settings.MIDDLEWARE if m != 'apps.common.middleware.SessionRefreshMiddleware'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Шумораи дархостҳо ва навиштҳо ба БД дар як саҳифа: сессияи кӯҳна ва нав'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Номи корбар (пешфарз: аввалин декан)')
+        parser.add_argument('--url', action='append', help='Саҳифа (бо такрор); пешфарз: панел ва live API')
+        parser.add_argument('--requests', type=int, default=50, help='Чанд маротиба ҳар саҳифа')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(role='dean', is_active=True).first()
+        if user is None:
+            raise CommandError('Корбар ёфт нашуд')
+        urls = options['url'] or [reverse('dean:dashboard'), reverse('dean:live_data_api')]
+
+        self.stdout.write(f"{'ҳолат':10} {'дархост/саҳ.':>14} {'навишт/саҳ.':>12}")
+        for name, overrides in (('legacy', LEGACY_SETTINGS), ('current', {})):
+            with override_settings(**overrides):
+                queries, writes, requests = self._run(user, urls, options['requests'])
+            self.stdout.write(f"{name:10} {queries / requests:14.2f} {writes / requests:12.2f}")
+
+    def _run(self, user, urls, repeat):
+        client = Client()
+        client.force_login(user)
+        # Первый проход прогревает кэши и не учитывается
+        for url in urls:
+            client.get(url)
+
+        queries = writes = requests = 0
+        for _ in range(repeat):
+            for url in urls:
+                with CaptureQueriesContext(connection) as captured:
+                    client.get(url)
+                queries += len(captured)
+                writes += sum(
+                    1 for q in captured.captured_queries
+                    if q['sql'].lstrip().upper().startswith(WRITE_STATEMENTS)
+                )
+                requests += 1
+        client.logout()
+        return queries, writes, requests
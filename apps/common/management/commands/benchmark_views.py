@@ -0,0 +1,147 @@
+import json
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.common.models import JournalEntry, Student
+from apps.common.pages import NAMESPACE_ROLES, page_urls, role_user
+
+
+# Разница p95 меньше этого порога считается шумом (мс)
+NOISE_MS = 5
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Андозагирии саҳифаҳои ҳамаи нақшҳо: шумораи дархостҳо ба БД, p50/p95 ва '
+        'хотираи ҳадди аксар; муқоиса бо baseline (JSON)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--namespace', action='append', help='Фақат ин namespace (масалан teacher)')
+        parser.add_argument('--repeat', type=int, default=10, help='Чанд маротиба ҳар саҳифа')
+        parser.add_argument('--cold', action='store_true', help='Пеш аз ҳар дархост кэшро тоза кардан')
+        parser.add_argument('--baseline', help='Файли JSON барои муқоиса')
+        parser.add_argument('--save', help='Натиҷаро ба ин файли JSON навиштан')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Афзоиши иҷозатдодашудаи p95 (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat бояд аз 0 калон бошад')
+        baseline = {}
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as f:
+                    baseline = json.load(f)['views']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Baseline хонда нашуд: {e}")
+
+        results = {}
+        for namespace in options['namespace'] or list(NAMESPACE_ROLES):
+            if namespace not in NAMESPACE_ROLES:
+                raise CommandError(f'Namespace-и номаълум: {namespace}')
+            user = role_user(namespace)
+            if user is None:
+                self.stdout.write(self.style.WARNING(f'{namespace}: корбар бо нақши {NAMESPACE_ROLES[namespace]} нест'))
+                continue
+            client = Client()
+            client.force_login(user)
+            for name, url in page_urls(namespace, user):
+                results[name] = self._measure(client, url, options['repeat'], options['cold'])
+
+        regressions = self._report(results, baseline, options['tolerance'])
+
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as f:
+                json.dump({
+                    'created': timezone.now().isoformat(),
+                    'students': Student.objects.count(),
+                    'journal_entries': JournalEntry.objects.count(),
+                    'cold': options['cold'],
+                    'views': results,
+                }, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Натиҷа дар {options['save']}")
+
+        if regressions:
+            raise CommandError(f'{regressions} саҳифа аз baseline бадтар шуд')
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} саҳифа санҷида шуд'))
+
+    def _measure(self, client, url, repeat, cold):
+        """Замеры одной страницы: первый запрос прогревает кэши и не учитывается"""
+        if not cold:
+            client.get(url)
+
+        timings = []
+        queries = []
+        status = None
+        for _ in range(repeat):
+            if cold:
+                cache.clear()
+            with ExitStack() as stack:
+                captured = [stack.enter_context(CaptureQueriesContext(c)) for c in connections.all()]
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(sum(len(c) for c in captured))
+            status = response.status_code
+
+        # Память — отдельным запросом: tracemalloc замедляет выполнение
+        if cold:
+            cache.clear()
+        tracemalloc.start()
+        try:
+            client.get(url)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'status': status,
+            'queries': _percentile(queries, 50),
+            'p50_ms': round(_percentile(timings, 50), 1),
+            'p95_ms': round(_percentile(timings, 95), 1),
+            'peak_kb': round(peak / 1024),
+        }
+
+    def _report(self, results, baseline, tolerance):
+        """Таблица результатов; возвращает количество страниц хуже baseline"""
+        self.stdout.write(
+            f"{'саҳифа':32} {'код':>4} {'дархост':>9} {'p50 мс':>8} {'p95 мс':>14} {'хотира KB':>10}"
+        )
+        regressions = 0
+        for name, r in results.items():
+            queries = f"{r['queries']}"
+            p95 = f"{r['p95_ms']:.1f}"
+            worse = False
+            base = baseline.get(name)
+            if base:
+                if r['queries'] != base['queries']:
+                    queries += f" ({r['queries'] - base['queries']:+d})"
+                    worse = r['queries'] > base['queries']
+                if base['p95_ms']:
+                    p95 += f" ({(r['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%)"
+                if (r['p95_ms'] > base['p95_ms'] * (1 + tolerance)
+                        and r['p95_ms'] - base['p95_ms'] > NOISE_MS):
+                    worse = True
+            line = f"{name:32} {r['status']:>4} {queries:>9} {r['p50_ms']:8.1f} {p95:>14} {r['peak_kb']:10}"
+            if worse:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line))
+            elif r['status'] != 200:
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(line)
+        return regressions
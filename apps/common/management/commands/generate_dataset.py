@@ -0,0 +1,278 @@
+import random
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.common.attendance import NO_POINTS, get_week_start, points_per_day
+from apps.common.dashboard import invalidate_dashboard
+from apps.common.gpa import recompute_semester_gpa
+from apps.common.lessons import materialize_current_lessons
+from apps.common.models import (
+    Course, Group, JournalEntry, Schedule, Semester, Student, Subject, TeacherAssignment, User,
+)
+from apps.common.reports import invalidate_reports
+from apps.common.rollup import backfill_daily_attendance
+from apps.common.search import rebuild_search_index
+from apps.common.timetable import invalidate_timetable
+
+
+# Пары: 6 дней x 4 пары = 24 слота в неделю на группу
+LESSON_SLOTS = [
+    (dtime(8, 0), dtime(9, 20)),
+    (dtime(9, 30), dtime(10, 50)),
+    (dtime(11, 0), dtime(12, 20)),
+    (dtime(13, 0), dtime(14, 20)),
+]
+WEEKDAYS = 6
+LESSONS_PER_WEEK = 3
+# Сколько строк журнала держать в памяти до записи
+JOURNAL_CHUNK = 20000
+JOURNAL_COLUMNS = (
+    'student_id', 'teacher_assignment_id', 'date', 'grade', 'attendance',
+    'attendance_points', 'created_at', 'updated_at',
+)
+
+FIRST_NAMES = [
+    'Алишер', 'Фаррух', 'Дилшод', 'Бахтиёр', 'Рустам', 'Сино', 'Фирдавс', 'Шаҳром', 'Умед', 'Ҷамшед',
+    'Нигина', 'Мадина', 'Зарина', 'Шаҳноза', 'Парвина', 'Гулноза', 'Малика', 'Сабина', 'Тахмина', 'Ситора',
+]
+LAST_NAMES = [
+    'Раҳимов', 'Каримов', 'Назаров', 'Шарипов', 'Саидов', 'Ҳасанов', 'Мирзоев', 'Қодиров', 'Юсупов', 'Сафаров',
+    'Давлатов', 'Исмоилов', 'Одинаев', 'Холов', 'Зиёев', 'Бобоев', 'Азимов', 'Латипов', 'Ғафуров', 'Нуров',
+]
+MIDDLE_NAMES = ['Алиевич', 'Каримович', 'Саидович', 'Ҳасанович', 'Назарович', 'Рустамович', '']
+SUBJECT_NAMES = [
+    'Математика', 'Физика', 'Барномасозӣ', 'Забони англисӣ', 'Таърих', 'Иқтисодиёт',
+    'Пойгоҳи додаҳо', 'Шабакаҳои компютерӣ',
+]
+GRADES = [3, 2, 1, 0]
+# Веса оценок: сильный, средний и слабый студент
+GRADE_PROFILES = [[60, 30, 8, 2], [40, 35, 15, 10], [15, 35, 30, 20]]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохтани маълумоти санҷишӣ: курсҳо, гурӯҳҳо, донишҷӯён, омӯзгорон, таъинот, '
+        'ҷадвал ва журнали пурраи семестр (bulk insert)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=4)
+        parser.add_argument('--group-size', type=int, default=25)
+        parser.add_argument('--subjects', type=int, default=6, help='Фанҳо дар як курс')
+        parser.add_argument('--teachers', type=int, default=40)
+        parser.add_argument('--weeks', type=int, default=16, help='Ҳафтаҳои гузаштаи семестр бо журнал')
+        parser.add_argument('--prefix', default='DS', help='Префикси номҳо (барои ҷудо кардан аз маълумоти воқеӣ)')
+        parser.add_argument('--password', default='demo1234', help='Пароли ҳамаи корбарони сохташуда')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options['subjects'] * LESSONS_PER_WEEK > WEEKDAYS * len(LESSON_SLOTS):
+            raise CommandError(f"Ҳадди аксар {WEEKDAYS * len(LESSON_SLOTS) // LESSONS_PER_WEEK} фан дар курс")
+        if min(options['students'], options['courses'], options['group_size'],
+               options['subjects'], options['teachers'], options['weeks']) < 1:
+            raise CommandError('Ҳамаи андозаҳо бояд аз 0 калон бошанд')
+        prefix = options['prefix']
+        if Group.objects.filter(name__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Маълумот бо префикси {prefix} аллакай ҳаст')
+
+        self.rng = random.Random(options['seed'])
+        self.prefix = prefix
+        started = time.monotonic()
+
+        today = timezone.localdate()
+        start = get_week_start(today) - timedelta(weeks=options['weeks'])
+        with transaction.atomic():
+            semester = Semester.objects.create(
+                name=f'{prefix} {start.year}',
+                start_date=start,
+                end_date=start + timedelta(weeks=options['weeks'] + 2) - timedelta(days=1),
+            )
+            courses = self._courses(options['courses'])
+            subjects = self._subjects(courses, options['subjects'])
+            groups = self._groups(courses, options['students'], options['group_size'])
+            students = self._students(groups, options['students'])
+            teachers = self._users(options['teachers'], options['password'])
+            assignments = self._assignments(groups, subjects, teachers, semester)
+            schedules = self._schedules(assignments)
+            entries = self._journal(assignments, schedules, students, start, today)
+        self.stdout.write(f"Сабт: {time.monotonic() - started:.1f} с")
+
+        # Производные данные: bulk_create не вызывает сигналы
+        derived = time.monotonic()
+        recompute_semester_gpa(semester)
+        backfill_daily_attendance(start, today)
+        rebuild_search_index()
+        invalidate_timetable()
+        materialize_current_lessons(today)
+        invalidate_dashboard()
+        invalidate_reports()
+        self.stdout.write(f"GPA, ҷамъбаст, ҷустуҷӯ, дарсҳои ҷорӣ: {time.monotonic() - derived:.1f} с")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(groups)} гурӯҳ, {sum(len(s) for s in students.values())} донишҷӯ, "
+            f"{len(teachers)} омӯзгор, {len(assignments)} таъинот, {len(schedules)} дарс дар ҳафта, "
+            f"{entries} ёддошти журнал ({time.monotonic() - started:.1f} с). "
+            f"Корбарон: {prefix.lower()}_dean, {prefix.lower()}_zamdekan, {prefix.lower()}_admin, "
+            f"{prefix.lower()}_teacher1…"
+        ))
+
+    def _courses(self, count):
+        courses = []
+        for number in range(1, count + 1):
+            course, _ = Course.objects.get_or_create(number=number, defaults={'name': f'Курси {number}'})
+            courses.append(course)
+        return courses
+
+    def _subjects(self, courses, per_course):
+        subjects = Subject.objects.bulk_create([
+            Subject(
+                name=SUBJECT_NAMES[i % len(SUBJECT_NAMES)],
+                code=f'{self.prefix}-{course.number}-{i + 1}',
+                course=course,
+                hours_per_week=LESSONS_PER_WEEK,
+            )
+            for course in courses
+            for i in range(per_course)
+        ])
+        by_course = {}
+        for subject in subjects:
+            by_course.setdefault(subject.course_id, []).append(subject)
+        return by_course
+
+    def _groups(self, courses, students, group_size):
+        count = max(1, -(-students // group_size))
+        return Group.objects.bulk_create([
+            Group(name=f'{self.prefix}-{courses[i % len(courses)].number}{i // len(courses) + 1:02d}',
+                  course=courses[i % len(courses)])
+            for i in range(count)
+        ])
+
+    def _students(self, groups, count):
+        rng = self.rng
+        rows = []
+        for i in range(count):
+            group = groups[i % len(groups)]
+            student_id = f'{self.prefix}{i + 1:06d}'
+            rows.append(Student(
+                student_id=student_id,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                middle_name=rng.choice(MIDDLE_NAMES),
+                group=group,
+                course_id=group.course_id,
+                phone=f'+99290{rng.randrange(10 ** 7):07d}',
+                email=f'{student_id.lower()}@example.com',
+                enrollment_date=date(timezone.localdate().year, 9, 1),
+                contract_status='debt' if rng.random() < 0.15 else 'paid',
+            ))
+        by_group = {}
+        for student in Student.objects.bulk_create(rows, batch_size=2000):
+            by_group.setdefault(student.group_id, []).append(student.pk)
+        return by_group
+
+    def _users(self, teachers, password):
+        # Хеш пароля считается один раз: make_password медленный намеренно
+        password = make_password(password)
+        name = self.prefix.lower()
+        rows = [
+            User(username=f'{name}_{role}', role=role, full_name=f'{self.prefix} {role}', password=password)
+            for role in ('dean', 'zamdekan', 'admin')
+        ]
+        rows += [
+            User(
+                username=f'{name}_teacher{i + 1}',
+                role='teacher',
+                full_name=f'{self.rng.choice(LAST_NAMES)} {self.rng.choice(FIRST_NAMES)}',
+                password=password,
+            )
+            for i in range(teachers)
+        ]
+        return [user for user in User.objects.bulk_create(rows) if user.role == 'teacher']
+
+    def _assignments(self, groups, subjects, teachers, semester):
+        rows = []
+        for group in groups:
+            for subject in subjects[group.course_id]:
+                rows.append(TeacherAssignment(
+                    teacher=teachers[len(rows) % len(teachers)],
+                    group=group,
+                    subject=subject,
+                    semester=semester,
+                ))
+        return TeacherAssignment.objects.bulk_create(rows, batch_size=2000)
+
+    def _schedules(self, assignments):
+        """По LESSONS_PER_WEEK пар на назначение, без пересечений внутри группы"""
+        slots = WEEKDAYS * len(LESSON_SLOTS)
+        by_group = {}
+        for assignment in assignments:
+            by_group.setdefault(assignment.group_id, []).append(assignment)
+        rows = []
+        for g, (group_id, group_assignments) in enumerate(by_group.items()):
+            for i, assignment in enumerate(group_assignments):
+                for j in range(LESSONS_PER_WEEK):
+                    # 5 и 24 взаимно просты: слоты группы не повторяются
+                    slot = ((i * LESSONS_PER_WEEK + j) * 5 + g) % slots
+                    start_time, end_time = LESSON_SLOTS[slot // WEEKDAYS]
+                    rows.append(Schedule(
+                        teacher_assignment=assignment,
+                        weekday=slot % WEEKDAYS,
+                        start_time=start_time,
+                        end_time=end_time,
+                        room=str(100 + g % 40),
+                    ))
+        return Schedule.objects.bulk_create(rows, batch_size=2000)
+
+    def _journal(self, assignments, schedules, students, start, today):
+        """
+        Журнал с начала семестра до вчерашнего дня; баллы посещаемости
+        считаются сразу. Строки пишутся executemany без создания моделей:
+        в bulk_create основное время уходит на подготовку полей.
+        """
+        rng = self.rng
+        weekdays = {}
+        for schedule in schedules:
+            weekdays.setdefault(schedule.teacher_assignment_id, set()).add(schedule.weekday)
+        # У каждого студента своя вероятность прийти на пару и уровень оценок
+        student_ids = [pk for group_students in students.values() for pk in group_students]
+        presence = {pk: rng.uniform(0.6, 0.98) for pk in student_ids}
+        profile = {pk: rng.choice(GRADE_PROFILES) for pk in student_ids}
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        insert = (
+            f"INSERT INTO {JournalEntry._meta.db_table} "
+            f"({', '.join(JOURNAL_COLUMNS)}) VALUES ({', '.join(['%s'] * len(JOURNAL_COLUMNS))})"
+        )
+
+        total = 0
+        chunk = []
+        with connection.cursor() as cursor:
+            for assignment in assignments:
+                days = sorted(weekdays.get(assignment.id, ()))
+                for student_id in students.get(assignment.group_id, []):
+                    week_start = start
+                    while week_start < today:
+                        dates = [week_start + timedelta(days=d) for d in days]
+                        dates = [d for d in dates if d < today]
+                        attended = [rng.random() < presence[student_id] for _ in dates]
+                        points = str(points_per_day(sum(attended)))
+                        for lesson_date, present in zip(dates, attended):
+                            grade = rng.choices(GRADES, profile[student_id])[0] if present and rng.random() < 0.6 else None
+                            chunk.append((
+                                student_id, assignment.id, lesson_date.isoformat(), grade, present,
+                                points if present else str(NO_POINTS), now, now,
+                            ))
+                        week_start += timedelta(weeks=1)
+                    if len(chunk) >= JOURNAL_CHUNK:
+                        cursor.executemany(insert, chunk)
+                        total += len(chunk)
+                        chunk = []
+            if chunk:
+                cursor.executemany(insert, chunk)
+                total += len(chunk)
+        return total
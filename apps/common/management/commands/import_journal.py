@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.models import TeacherAssignment
+from apps.common.utils import IMPORT_CHUNK_SIZE, import_journal_from_excel
+
+
+class Command(BaseCommand):
+    help = 'Импорти журнал аз Excel (student_id, сана, баҳо, ҳозиршавӣ)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Файли .xlsx')
+        parser.add_argument('--assignment', type=int, required=True, help='ID-и таъинот (TeacherAssignment)')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            assignment = TeacherAssignment.objects.get(id=options['assignment'])
+        except TeacherAssignment.DoesNotExist:
+            raise CommandError(f"Таъинот ёфт нашуд: {options['assignment']}")
+
+        result = import_journal_from_excel(options['file'], assignment, chunk_size=options['chunk_size'])
+
+        for error in result['errors']:
+            self.stderr.write(error)
+        if result['error_count'] > len(result['errors']):
+            self.stderr.write(f"... ва {result['error_count'] - len(result['errors'])} хатои дигар")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Импорт: {result['success']}/{result['rows']} қатор, "
+            f"{result['duplicates']} такрор, {result['error_count']} хато, {result['seconds']} с "
+            f"({result['rows_per_second']} қатор/с)"
+        ))
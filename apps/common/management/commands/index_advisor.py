@@ -0,0 +1,111 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.common.pages import NAMESPACE_ROLES, SKIP_WORDS, page_urls, role_user
+
+
+# Файловые ответы (экспорт) для планов запросов не нужны
+ADVISOR_SKIP_WORDS = SKIP_WORDS + ('export',)
+
+# Кэш на время анализа отключен: с теплым кэшем панели не делают запросов,
+# и их планы не попадают в отчет. Общий кэш при этом не очищается
+COLD_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+SCAN_RE = re.compile(r'^SCAN (\w+)')
+TABLE_RE = re.compile(r'^(?:SCAN|SEARCH) (\w+)')
+# Псевдонимы подзапросов Django: "common_student" U0
+ALIAS_RE = re.compile(r'"(\w+)" (U\d+|T\d+)\b')
+
+
+class Command(BaseCommand):
+    help = (
+        'Саҳифаҳоро бо Client иҷро карда, барои ҳар дархост EXPLAIN QUERY PLAN '
+        'мегирад ва SCAN / TEMP B-TREE-ро нишон медиҳад'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--namespace', action='append', help='Фақат ин namespace (масалан dean)')
+        parser.add_argument('--min-rows', type=int, default=500,
+                            help='Барои ҷадвалҳои хурдтар аз ин огоҳӣ намедиҳад')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN фақат барои SQLite')
+
+        namespaces = options['namespace'] or list(NAMESPACE_ROLES)
+        self.min_rows = options['min_rows']
+        self.table_sizes = {}
+        flagged_views = 0
+        total_warnings = 0
+
+        for namespace in namespaces:
+            if namespace not in NAMESPACE_ROLES:
+                raise CommandError(f'Namespace-и номаълум: {namespace}')
+            user = role_user(namespace)
+            if user is None:
+                self.stdout.write(self.style.WARNING(f'{namespace}: корбар бо нақши {NAMESPACE_ROLES[namespace]} нест'))
+                continue
+            client = Client()
+            client.force_login(user)
+
+            for name, url in page_urls(namespace, user, ADVISOR_SKIP_WORDS):
+                with override_settings(CACHES=COLD_CACHES), CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                warnings = self._check(queries.captured_queries)
+                status = f'{name:32} {response.status_code} {len(queries):3} дархост'
+                if warnings:
+                    flagged_views += 1
+                    total_warnings += len(warnings)
+                    self.stdout.write(self.style.WARNING(f'{status}, {len(warnings)} огоҳӣ'))
+                    for detail, sql in warnings:
+                        self.stdout.write(f'    {detail}')
+                        self.stdout.write(f'        {sql[:200]}')
+                else:
+                    self.stdout.write(f'{status}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Ҳамагӣ: {total_warnings} огоҳӣ дар {flagged_views} саҳифа'
+        ))
+
+    def _check(self, captured):
+        """Предупреждения по плану: полный просмотр больших таблиц и временные B-деревья"""
+        warnings = []
+        seen = set()
+        with connection.cursor() as cursor:
+            for query in captured:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+                    continue
+                seen.add(sql)
+                aliases = dict((alias, table) for table, alias in ALIAS_RE.findall(sql))
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = [row[-1] for row in cursor.fetchall()]
+                # Сортировка во временном B-дереве важна, только если таблицы большие
+                largest = max(
+                    (self._table_size(cursor, aliases.get(m.group(1), m.group(1)))
+                     for m in map(TABLE_RE.match, plan) if m),
+                    default=0,
+                )
+                for detail in plan:
+                    scan = SCAN_RE.match(detail)
+                    if scan and 'USING' not in detail and 'VIRTUAL TABLE' not in detail:
+                        table = aliases.get(scan.group(1), scan.group(1))
+                        if self._table_size(cursor, table) >= self.min_rows:
+                            warnings.append((detail, sql))
+                    elif 'TEMP B-TREE' in detail and largest >= self.min_rows:
+                        warnings.append((detail, sql))
+        return warnings
+
+    def _table_size(self, cursor, table):
+        if table not in self.table_sizes:
+            try:
+                cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+                self.table_sizes[table] = cursor.fetchone()[0]
+            except DatabaseError:
+                # Подзапрос или CTE, а не таблица
+                self.table_sizes[table] = 0
+        return self.table_sizes[table]
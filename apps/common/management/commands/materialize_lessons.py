@@ -0,0 +1,42 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.common.lessons import materialize_current_lessons
+
+
+class Command(BaseCommand):
+    help = 'Сохтани дарсҳои ҷорӣ (CurrentLesson) аз ҷадвал барои Live Dashboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Сана, YYYY-MM-DD (пешфарз: имрӯз)')
+        parser.add_argument('--days', type=int, default=1, help='Чанд рӯз аз сана сар карда')
+        parser.add_argument('--loop', action='store_true', help='Бо фосила такрор кардан (worker)')
+        parser.add_argument('--interval', type=int, default=300, help='Фосила дар --loop (сония)')
+
+    def handle(self, *args, **options):
+        if options['date'] and options['loop']:
+            raise CommandError('--date бо --loop истифода намешавад')
+
+        while True:
+            if options['date']:
+                try:
+                    start = datetime.strptime(options['date'], '%Y-%m-%d').date()
+                except ValueError:
+                    raise CommandError(f"Санаи нодуруст: {options['date']} (YYYY-MM-DD)")
+            else:
+                start = timezone.localdate()
+
+            for offset in range(options['days']):
+                date = start + timedelta(days=offset)
+                started = time.monotonic()
+                count = materialize_current_lessons(date)
+                self.stdout.write(self.style.SUCCESS(
+                    f"{date}: {count} дарс ({time.monotonic() - started:.2f} с)"
+                ))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
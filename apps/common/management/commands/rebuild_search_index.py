@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.search import REBUILD_BATCH_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Аз нав сохтани индекси ҷустуҷӯи донишҷӯён (SQLite FTS5)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Индекс: {count} донишҷӯ ({time.monotonic() - started:.2f} с)"
+        ))
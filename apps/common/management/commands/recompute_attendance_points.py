@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.attendance import STUDENT_BATCH_SIZE, recompute_semester_points
+from apps.common.models import Semester
+
+
+class Command(BaseCommand):
+    help = 'Ҳисоби дубораи баллҳои ҳозиршавӣ барои семестр'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, help='ID-и семестр (пешфарз: семестрҳои фаъол)')
+        parser.add_argument('--chunk-size', type=int, default=STUDENT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size бояд аз 0 калон бошад')
+        if options['semester']:
+            semesters = Semester.objects.filter(id=options['semester'])
+        else:
+            semesters = Semester.objects.filter(is_active=True)
+        if not semesters:
+            raise CommandError('Семестр ёфт нашуд')
+
+        for semester in semesters:
+            started = time.monotonic()
+            assignments, updated = recompute_semester_points(semester, chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{semester}: {assignments} таъинот, {updated} ёддошт навсозӣ шуд "
+                f"({time.monotonic() - started:.2f} с)"
+            ))
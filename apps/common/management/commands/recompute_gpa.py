@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.gpa import recompute_semester_gpa
+from apps.common.models import Semester
+from apps.common.reports import invalidate_reports
+
+
+class Command(BaseCommand):
+    help = 'Ҳисоби дубораи GPA аз баҳоҳои журнал барои семестр'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, help='ID-и семестр (пешфарз: ҳамаи семестрҳо)')
+
+    def handle(self, *args, **options):
+        if options['semester']:
+            semesters = Semester.objects.filter(id=options['semester'])
+        else:
+            semesters = Semester.objects.all()
+        if not semesters:
+            raise CommandError('Семестр ёфт нашуд')
+
+        for semester in semesters:
+            started = time.monotonic()
+            students, updated = recompute_semester_gpa(semester)
+            self.stdout.write(self.style.SUCCESS(
+                f"{semester}: {students} донишҷӯ, GPA-и {updated} нафар иваз шуд "
+                f"({time.monotonic() - started:.2f} с)"
+            ))
+        invalidate_reports()
@@ -0,0 +1,46 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.common.routers import REPLICA_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Навсозии нусхаи БД барои хондан (replica) аз БД-и асосӣ бо SQLite backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Бо фосила такрор кардан (worker)')
+        parser.add_argument('--interval', type=int, default=60, help='Фосила дар --loop (сония)')
+
+    def handle(self, *args, **options):
+        replica = settings.DATABASES.get(REPLICA_DB_ALIAS)
+        if replica is None:
+            raise CommandError('Реплика танзим нашудааст (CRM_REPLICA_PATH)')
+        for config in (settings.DATABASES[DEFAULT_DB_ALIAS], replica):
+            if config['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('refresh_replica танҳо барои SQLite аст')
+
+        while True:
+            started = time.monotonic()
+            self._copy(replica['NAME'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Реплика навсозӣ шуд ({time.monotonic() - started:.2f} с)"
+            ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def _copy(self, path):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        # Копия пишется прямо в файл реплики одной транзакцией: открытые
+        # соединения читателей видят новые данные без переподключения.
+        # В режиме WAL чтение источника не блокирует запись учителей.
+        target = sqlite3.connect(path, timeout=30)
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
@@ -0,0 +1,83 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.common.jobs import claim_next, purge_finished, requeue_stale, run_job, worker_name
+
+
+# Как часто искать брошенные задачи и чистить старые (секунды)
+MAINTENANCE_INTERVAL = 60
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        'Коргари вазифаҳои фонӣ (импорт, экспорт, ҳисоби дубора): навбатро аз БД мехонад. '
+        'Ctrl+C — вазифаҳои ҷориро анҷом дода, қатъ мекунад'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Чанд вазифа якбора (потокҳо)')
+        parser.add_argument('--poll', type=float, default=2.0, help='Фосилаи санҷиши навбат (с)')
+        parser.add_argument('--once', action='store_true', help='Навбатро холӣ карда, баромадан')
+        parser.add_argument('--purge-days', type=int, default=7,
+                            help='Вазифаҳои анҷомёфтаи аз ин кӯҳнатар нест карда мешаванд (0 — не)')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1:
+            raise CommandError('--threads бояд аз 0 калон бошад')
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self._work, args=(worker_name(i), stop, options), daemon=True)
+            for i in range(options['threads'])
+        ]
+
+        self._maintenance(options['purge_days'])
+        self.stdout.write(f"Коргар {worker_name('*')}: {options['threads']} поток")
+        for thread in threads:
+            thread.start()
+
+        maintained = purged = time.monotonic()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.5)
+                if time.monotonic() - maintained > MAINTENANCE_INTERVAL:
+                    maintained = time.monotonic()
+                    purge = time.monotonic() - purged > PURGE_INTERVAL
+                    if purge:
+                        purged = maintained
+                    self._maintenance(options['purge_days'] if purge else 0)
+        except KeyboardInterrupt:
+            self.stdout.write('Қатъ: интизори анҷоми вазифаҳои ҷорӣ...')
+            stop.set()
+            for thread in threads:
+                thread.join()
+        connections.close_all()
+        self.stdout.write(self.style.SUCCESS('Коргар қатъ шуд'))
+
+    def _maintenance(self, purge_days):
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'{requeued} вазифаи бесоҳиб ба навбат баргашт'))
+        if purge_days:
+            purge_finished(timedelta(days=purge_days))
+        connections.close_all()
+
+    def _work(self, worker, stop, options):
+        try:
+            while not stop.is_set():
+                job = claim_next(worker)
+                if job is None:
+                    if options['once']:
+                        break
+                    stop.wait(options['poll'])
+                    continue
+                started = time.monotonic()
+                ok = run_job(job)
+                line = f'{job.kind} #{job.pk}: {time.monotonic() - started:.2f} с'
+                self.stdout.write(self.style.SUCCESS(line) if ok else self.style.ERROR(f'{line}, хато'))
+        finally:
+            connections.close_all()
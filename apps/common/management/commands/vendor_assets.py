@@ -0,0 +1,56 @@
+import re
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.assets import ASSETS
+
+
+# Карты исходников не скачиваются; ссылка на отсутствующий .map
+# ломает collectstatic с ManifestStaticFilesStorage
+SOURCE_MAP = re.compile(rb'\s*(/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Боргирии файлҳои берунӣ (Bootstrap, Font Awesome, Chart.js, DataTables) ба static/vendor, '
+        'то ки саҳифаҳо бе CDN кор кунанд'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Файлҳои мавҷударо аз нав боргирӣ кардан')
+        parser.add_argument('--check', action='store_true', help='Фақат ҳолатро нишон додан (маҳаллӣ ё CDN)')
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATICFILES_DIRS[0])
+        if options['check']:
+            for name, asset in ASSETS.items():
+                source = 'маҳаллӣ' if asset.local else 'CDN'
+                self.stdout.write(f'{name:16} {source:8} {asset.path}')
+            return
+
+        downloaded = 0
+        for name, asset in ASSETS.items():
+            if not asset.vendored:
+                continue
+            for path, url in ((asset.path, asset.cdn), *asset.files):
+                target = root / path
+                if target.exists() and not options['force']:
+                    continue
+                try:
+                    with urllib.request.urlopen(url, timeout=30) as response:
+                        content = response.read()
+                except OSError as e:
+                    raise CommandError(f'{url} боргирӣ нашуд: {e}')
+                if target.suffix in ('.css', '.js'):
+                    content = SOURCE_MAP.sub(b'\n', content)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(content)
+                downloaded += 1
+                self.stdout.write(f'{path} ({len(content) // 1024} KB)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{downloaded} файл боргирӣ шуд. Баъд: npm run build:css ва python manage.py collectstatic'
+        ))
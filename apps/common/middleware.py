@@ -0,0 +1,136 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .profiling import SIMILAR_THRESHOLD, QueryRecorder, logger, request_stats
+from .routers import REPLICA_DB_ALIAS, reset_replica_reads, set_replica_reads
+
+
+SESSION_REFRESHED_KEY = '_refreshed_at'
+
+
+def mark_session_refreshed(session):
+    session[SESSION_REFRESHED_KEY] = int(time.time())
+
+
+class SessionRefreshMiddleware:
+    """
+    Продление сессии без записи на каждый запрос.
+
+    При SESSION_SAVE_EVERY_REQUEST = False сессия сохраняется, только если
+    изменилась; здесь она помечается измененной, когда до истечения
+    осталось меньше SESSION_REFRESH_THRESHOLD секунд. Активный пользователь
+    так дает одну запись сессии за (SESSION_COOKIE_AGE - порог) секунд.
+    Ставится сразу после SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = request.session
+        if session.session_key and not session.is_empty():
+            refreshed_at = session.get(SESSION_REFRESHED_KEY, 0)
+            remaining = refreshed_at + settings.SESSION_COOKIE_AGE - time.time()
+            if remaining < settings.SESSION_REFRESH_THRESHOLD:
+                mark_session_refreshed(session)
+        return self.get_response(request)
+
+
+# Роли, которые только читают, и тяжелые страницы отчетов (namespace:url_name).
+# dean:export_pdf здесь нет: он ставит задачу построения отчета в очередь
+REPLICA_ROLES = {'zamdekan'}
+REPLICA_VIEWS = {
+    'dean:live_dashboard', 'dean:live_data_api', 'dean:live_stream',
+    'dean:reports',
+    'dean:students_export', 'dean:group_export', 'dean:journal_export',
+}
+REPLICA_PIN_COOKIE = 'crm_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaReadMiddleware:
+    """
+    GET-запросы ролей из REPLICA_ROLES и страниц из REPLICA_VIEWS читают из
+    реплики. После любого изменяющего запроса браузер получает cookie на
+    REPLICA_PIN_SECONDS и до ее истечения читает из default — пользователь
+    сразу видит свои изменения. Без реплики в DATABASES не подключается.
+    Ставится после AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        if REPLICA_DB_ALIAS not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request._replica_token is not None:
+                reset_replica_reads(request._replica_token)
+
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in SAFE_METHODS or REPLICA_PIN_COOKIE in request.COOKIES:
+            return None
+        match = request.resolver_match
+        if match.view_name in REPLICA_VIEWS or getattr(request.user, 'role', None) in REPLICA_ROLES:
+            request._replica_token = set_replica_reads(True)
+        return None
+
+
+class QueryProfileMiddleware:
+    """
+    Замер каждого запроса: SQL (количество, время, дубликаты, похожие
+    запросы), общее время, view и роль. Сводка — /admin-panel/perf/,
+    медленные (SLOW_REQUEST_MS) и запросы с N+1 пишутся в лог,
+    заголовок Server-Timing виден в DevTools.
+    Включается REQUEST_PROFILING; ставится первым после SecurityMiddleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        role = getattr(getattr(request, 'user', None), 'role', None) or 'anonymous'
+        summary = recorder.summary()
+        request_stats.add(view, role, elapsed_ms, summary, settings.SLOW_REQUEST_MS)
+
+        if elapsed_ms >= settings.SLOW_REQUEST_MS:
+            logger.warning(
+                'Slow request %s %s (%s, %s): %.0f ms, %d queries, %.0f ms in DB',
+                request.method, request.path, view, role, elapsed_ms, summary['queries'], summary['db_ms'],
+            )
+        top = summary['top_similar']
+        if top and top['count'] >= SIMILAR_THRESHOLD:
+            logger.warning(
+                'Possible N+1 in %s (%s): %d similar queries: %s', view, role, top['count'], top['sql'],
+            )
+        response['Server-Timing'] = (
+            f"db;dur={summary['db_ms']:.1f};desc=\"{summary['queries']} queries\", "
+            f"total;dur={elapsed_ms:.1f}"
+        )
+        return response
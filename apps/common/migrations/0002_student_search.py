@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from apps.common.search import CREATE_TABLE_SQL, SEARCH_FIELDS, SEARCH_TABLE
+
+    schema_editor.execute(CREATE_TABLE_SQL)
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) "
+        f"SELECT id, {', '.join(SEARCH_FIELDS)} FROM common_student"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from apps.common.search import DROP_TABLE_SQL
+
+    schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_hot_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterGPA',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grade_sum', models.PositiveIntegerField(default=0, verbose_name='Ҷамъи баҳоҳо')),
+                ('grade_count', models.PositiveIntegerField(default=0, verbose_name='Шумораи баҳоҳо')),
+                ('gpa', models.DecimalField(decimal_places=2, default=0.0, max_digits=3, verbose_name='GPA')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Навсозӣ')),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.semester', verbose_name='Семестр')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_gpas', to='common.student', verbose_name='Донишҷӯ')),
+            ],
+            options={
+                'verbose_name': 'GPA-и семестр',
+                'verbose_name_plural': 'GPA-и семестрҳо',
+                'unique_together': {('student', 'semester')},
+            },
+        ),
+    ]
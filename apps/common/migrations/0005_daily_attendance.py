@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_semester_gpa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Сана')),
+                ('present_count', models.PositiveIntegerField(default=0, verbose_name='Ҳозир')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='Ҳамагӣ')),
+                ('grade_sum', models.PositiveIntegerField(default=0, verbose_name='Ҷамъи баҳоҳо')),
+                ('grade_count', models.PositiveIntegerField(default=0, verbose_name='Шумораи баҳоҳо')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.group', verbose_name='Гурӯҳ')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.subject', verbose_name='Фан')),
+                ('teacher_assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='common.teacherassignment', verbose_name='Таъинот')),
+            ],
+            options={
+                'verbose_name': 'Ҳозиршавии рӯзона',
+                'verbose_name_plural': 'Ҳозиршавии рӯзона',
+                'unique_together': {('date', 'group', 'subject', 'teacher_assignment')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0005_daily_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('excel_import', 'Импорти журнал аз Excel'), ('report_pdf', 'Ҳисоботи PDF'), ('export_students', 'Экспорти донишҷӯён (Excel)'), ('recompute_gpa', 'Ҳисоби дубораи GPA'), ('recompute_attendance_points', 'Ҳисоби дубораи баллҳои ҳозиршавӣ'), ('backfill_daily_attendance', 'Ҷамъбасти ҳозиршавии рӯзона'), ('rebuild_search_index', 'Индекси ҷустуҷӯ')], max_length=50, verbose_name='Навъ')),
+                ('status', models.CharField(choices=[('queued', 'Дар навбат'), ('running', 'Иҷро мешавад'), ('done', 'Тайёр'), ('failed', 'Хато')], default='queued', max_length=20, verbose_name='Ҳолат')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Параметрҳо')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Натиҷа')),
+                ('error', models.TextField(blank=True, verbose_name='Хато')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Пешрафт (%)')),
+                ('progress_message', models.CharField(blank=True, max_length=200, verbose_name='Ҳолати пешрафт')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Кӯшишҳо')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Ҳадди кӯшишҳо')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Иҷро пас аз')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Коргар')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Охирин аломати ҳаёт')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Сана')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Оғоз')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Анҷом')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Муаллиф')),
+            ],
+            options={
+                'verbose_name': 'Вазифаи фонӣ',
+                'verbose_name_plural': 'Вазифаҳои фонӣ',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx')],
+            },
+        ),
+    ]
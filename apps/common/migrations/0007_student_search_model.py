@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def configure_rank(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from apps.common.search import RANK_CONFIG_SQL
+
+    schema_editor.execute(RANK_CONFIG_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0006_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearch',
+            fields=[
+                ('student', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='common.student')),
+                ('document', models.TextField(db_column='common_student_search')),
+                ('rank', models.FloatField(db_column='rank')),
+            ],
+            options={
+                'db_table': 'common_student_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(configure_rank, migrations.RunPython.noop),
+    ]
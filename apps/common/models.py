@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from datetime import datetime, timedelta
 
+from .signals import journal_entries_changed
+
 
 class User(AbstractUser):
     """Корбар (Декан, Админ, Замдекан, Омӯзгор)"""
@@ -92,6 +94,15 @@ class Student(models.Model):
         verbose_name = 'Донишҷӯ'
         verbose_name_plural = 'Донишҷӯён'
         ordering = ['group', 'last_name', 'first_name']
+        # Частичные индексы: фильтр is_active=True в SQL — просто "is_active",
+        # и обычный составной индекс с этим столбцом SQLite не использует
+        indexes = [
+            models.Index(fields=['gpa'], name='student_active_gpa_idx', condition=models.Q(is_active=True)),
+            models.Index(fields=['contract_status', 'last_name'], name='student_contract_idx',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['last_name', 'first_name'], name='student_active_name_idx',
+                         condition=models.Q(is_active=True)),
+        ]
     
     def __str__(self):
         return f"{self.last_name} {self.first_name} ({self.student_id})"
@@ -102,6 +113,36 @@ class Student(models.Model):
         return f"{self.last_name} {self.first_name}"
 
 
+class Match(models.Lookup):
+    """Полнотекстовый поиск FTS5: <колонка> MATCH <выражение>"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class StudentSearch(models.Model):
+    """
+    Индекс FTS5 по студентам (виртуальная таблица SQLite, создается миграцией
+    и apps.common.search). Модель нужна только для JOIN в запросах поиска.
+    """
+    student = models.OneToOneField(Student, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+                                   db_constraint=False, related_name='search_entry')
+    # Скрытая колонка с именем таблицы: MATCH по ней ищет во всех полях
+    document = models.TextField(db_column='common_student_search')
+    # Скрытая колонка FTS5: bm25 с весами из настройки rank (search.RANK_CONFIG_SQL)
+    rank = models.FloatField(db_column='rank')
+
+    class Meta:
+        managed = False
+        db_table = 'common_student_search'
+
+
+StudentSearch._meta.get_field('document').register_lookup(Match)
+
+
 class Semester(models.Model):
     """Семестр"""
     name = models.CharField('Номи семестр', max_length=100)
@@ -158,14 +199,17 @@ class Schedule(models.Model):
         verbose_name = 'Расписание'
         verbose_name_plural = 'Расписанияҳо'
         ordering = ['weekday', 'start_time']
+        indexes = [
+            models.Index(fields=['weekday', 'start_time'], name='schedule_weekday_start_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_weekday_display()} {self.start_time}-{self.end_time} - {self.teacher_assignment}"
     
-    def is_locked(self):
-        """Блокировка через 1 час после окончания урока"""
-        now = timezone.now()
-        lesson_end = datetime.combine(now.date(), self.end_time)
+    def is_locked(self, date=None):
+        """Блокировка через 1 час после окончания урока в день date (по умолчанию — сегодня)"""
+        now = timezone.localtime()
+        lesson_end = datetime.combine(date or now.date(), self.end_time)
         lesson_end = timezone.make_aware(lesson_end)
         return now > (lesson_end + timedelta(hours=1))
 
@@ -186,32 +230,91 @@ class JournalEntry(models.Model):
         verbose_name_plural = 'Ёддоштҳои журнал'
         unique_together = ['student', 'teacher_assignment', 'date']
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'attendance'], name='journal_date_attendance_idx'),
+            models.Index(fields=['teacher_assignment', 'date'], name='journal_assignment_date_idx'),
+            models.Index(fields=['student', 'date'], name='journal_student_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student} - {self.teacher_assignment.subject.name} - {self.date}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Ключ записи при загрузке: при смене даты (студента, назначения)
+        # пересчитывается и прежняя неделя
+        loaded = dict(zip(field_names, values))
+        instance._loaded_key = tuple(loaded.get(name) for name in ('student_id', 'teacher_assignment_id', 'date'))
+        return instance
+
     def save(self, *args, **kwargs):
-        """Автоматический расчет баллов посещаемости"""
-        if self.attendance:
-            # +1.6 балла за каждый день
-            self.attendance_points = 1.6
-            
-            # Проверка: если 3 дня в неделю = автоматом +6 баллов
-            week_start = self.date - timedelta(days=self.date.weekday())
-            week_entries = JournalEntry.objects.filter(
-                student=self.student,
-                teacher_assignment=self.teacher_assignment,
-                date__gte=week_start,
-                date__lt=week_start + timedelta(days=7),
-                attendance=True
-            ).count()
-            
-            if week_entries >= 3:
-                self.attendance_points = 6.0 / week_entries
-        else:
+        """Автоматический расчет баллов посещаемости (вместе с записями той же недели)"""
+        from .attendance import get_week_start, recompute_attendance_points
+
+        if not self.attendance:
             self.attendance_points = 0.0
-        
-        super().save(*args, **kwargs)
+        key = (self.student_id, self.teacher_assignment_id, self.date)
+        keys = {key}
+        loaded = getattr(self, '_loaded_key', None)
+        if loaded and None not in loaded:
+            keys.add(loaded)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            recompute_attendance_points(
+                {(student_id, assignment_id, get_week_start(date)) for student_id, assignment_id, date in keys},
+                instances=[self],
+            )
+            journal_entries_changed.send(sender=JournalEntry, keys=keys)
+        self._loaded_key = key
+
+    def delete(self, *args, **kwargs):
+        from .attendance import get_week_start, recompute_attendance_points
+
+        key = (self.student_id, self.teacher_assignment_id, self.date)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            recompute_attendance_points({(key[0], key[1], get_week_start(key[2]))})
+            journal_entries_changed.send(sender=JournalEntry, keys={key})
+        return result
+
+
+class DailyAttendance(models.Model):
+    """Сводка посещаемости за день по назначению (Ҳозиршавии рӯзона)"""
+    date = models.DateField('Сана')
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, verbose_name='Гурӯҳ')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, verbose_name='Фан')
+    teacher_assignment = models.ForeignKey(TeacherAssignment, on_delete=models.CASCADE, verbose_name='Таъинот')
+    present_count = models.PositiveIntegerField('Ҳозир', default=0)
+    total_count = models.PositiveIntegerField('Ҳамагӣ', default=0)
+    grade_sum = models.PositiveIntegerField('Ҷамъи баҳоҳо', default=0)
+    grade_count = models.PositiveIntegerField('Шумораи баҳоҳо', default=0)
+    
+    class Meta:
+        verbose_name = 'Ҳозиршавии рӯзона'
+        verbose_name_plural = 'Ҳозиршавии рӯзона'
+        unique_together = ['date', 'group', 'subject', 'teacher_assignment']
+    
+    def __str__(self):
+        return f"{self.date} - {self.teacher_assignment}: {self.present_count}/{self.total_count}"
+
+
+class SemesterGPA(models.Model):
+    """GPA донишҷӯ дар семестр (аз баҳоҳои журнал)"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, verbose_name='Донишҷӯ', related_name='semester_gpas')
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, verbose_name='Семестр')
+    grade_sum = models.PositiveIntegerField('Ҷамъи баҳоҳо', default=0)
+    grade_count = models.PositiveIntegerField('Шумораи баҳоҳо', default=0)
+    gpa = models.DecimalField('GPA', max_digits=3, decimal_places=2, default=0.00)
+    updated_at = models.DateTimeField('Навсозӣ', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'GPA-и семестр'
+        verbose_name_plural = 'GPA-и семестрҳо'
+        unique_together = ['student', 'semester']
+    
+    def __str__(self):
+        return f"{self.student} - {self.semester}: {self.gpa}"
 
 
 class Comment(models.Model):
@@ -252,3 +355,55 @@ class CurrentLesson(models.Model):
         if self.total_students == 0:
             return 0
         return round((self.present_count / self.total_students) * 100, 1)
+
+
+class Job(models.Model):
+    """Фоновая задача (импорт, экспорт, пересчет); выполняется командой run_jobs"""
+    # Обработчики — apps/common/tasks.py
+    KIND_CHOICES = [
+        ('excel_import', 'Импорти журнал аз Excel'),
+        ('report_pdf', 'Ҳисоботи PDF'),
+        ('export_students', 'Экспорти донишҷӯён (Excel)'),
+        ('recompute_gpa', 'Ҳисоби дубораи GPA'),
+        ('recompute_attendance_points', 'Ҳисоби дубораи баллҳои ҳозиршавӣ'),
+        ('backfill_daily_attendance', 'Ҷамъбасти ҳозиршавии рӯзона'),
+        ('rebuild_search_index', 'Индекси ҷустуҷӯ'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Дар навбат'),
+        ('running', 'Иҷро мешавад'),
+        ('done', 'Тайёр'),
+        ('failed', 'Хато'),
+    ]
+    
+    kind = models.CharField('Навъ', max_length=50, choices=KIND_CHOICES)
+    status = models.CharField('Ҳолат', max_length=20, choices=STATUS_CHOICES, default='queued')
+    payload = models.JSONField('Параметрҳо', default=dict, blank=True)
+    result = models.JSONField('Натиҷа', null=True, blank=True)
+    error = models.TextField('Хато', blank=True)
+    progress = models.PositiveSmallIntegerField('Пешрафт (%)', default=0)
+    progress_message = models.CharField('Ҳолати пешрафт', max_length=200, blank=True)
+    attempts = models.PositiveSmallIntegerField('Кӯшишҳо', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Ҳадди кӯшишҳо', default=3)
+    run_after = models.DateTimeField('Иҷро пас аз', default=timezone.now)
+    worker = models.CharField('Коргар', max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField('Охирин аломати ҳаёт', null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Муаллиф')
+    created_at = models.DateTimeField('Сана', auto_now_add=True)
+    started_at = models.DateTimeField('Оғоз', null=True, blank=True)
+    finished_at = models.DateTimeField('Анҷом', null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Вазифаи фонӣ'
+        verbose_name_plural = 'Вазифаҳои фонӣ'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
@@ -0,0 +1,69 @@
+from django.urls import URLPattern, get_resolver, reverse
+
+from .models import Group, Job, Student, TeacherAssignment, User
+
+
+# Пространство имен URL -> роль пользователя, от имени которого идут запросы
+NAMESPACE_ROLES = {
+    'dean': 'dean',
+    'zamdekan': 'zamdekan',
+    'teacher': 'teacher',
+    'admin_panel': 'admin',
+}
+# Представления с побочными эффектами или бесконечным ответом не воспроизводятся
+# (задачи ставятся только POST-запросами, GET страниц задач безопасен)
+SKIP_WORDS = ('update', 'comment', 'stream', 'logout')
+# Значения аргументов URL: первый объект модели
+ARG_MODELS = {
+    'pk': Student,
+    'assignment_id': TeacherAssignment,
+}
+ARG_MODEL_OVERRIDES = {
+    ('group_export', 'pk'): Group,
+    ('job_status', 'pk'): Job,
+    ('job_download', 'pk'): Job,
+}
+# Дополнительные условия для объекта аргумента: скачать можно только готовый файл
+ARG_FILTERS = {
+    ('job_download', 'pk'): {'status': 'done', 'result__has_key': 'file'},
+}
+
+
+def role_user(namespace):
+    """Активный пользователь роли namespace (или None)"""
+    role = NAMESPACE_ROLES[namespace]
+    if role == 'teacher':
+        # Омӯзгор, ки таъинот дорад — то журнал холӣ набошад
+        assignment = TeacherAssignment.objects.select_related('teacher').filter(
+            teacher__is_active=True, semester__is_active=True
+        ).first()
+        if assignment:
+            return assignment.teacher
+    return User.objects.filter(role=role, is_active=True).first()
+
+
+def page_urls(namespace, user, skip_words=SKIP_WORDS):
+    """(имя, путь) всех GET-страниц namespace; аргументы — первые подходящие объекты"""
+    resolver = get_resolver()
+    for pattern in resolver.namespace_dict[namespace][1].url_patterns:
+        if not isinstance(pattern, URLPattern):
+            continue
+        name = pattern.name
+        if not name or any(word in name for word in skip_words):
+            continue
+
+        kwargs = {}
+        for arg in pattern.pattern.converters:
+            model = ARG_MODEL_OVERRIDES.get((name, arg)) or ARG_MODELS.get(arg)
+            queryset = model.objects.filter(**ARG_FILTERS.get((name, arg), {})) if model else None
+            if model is TeacherAssignment and user.role == 'teacher':
+                queryset = queryset.filter(teacher=user)
+            if model is Job and user.role != 'admin':
+                # Чужие задачи видит только админ (jobs.user_job)
+                queryset = queryset.filter(created_by=user)
+            obj = queryset.first() if queryset is not None else None
+            if obj is None:
+                break
+            kwargs[arg] = obj.pk
+        else:
+            yield f'{namespace}:{name}', reverse(f'{namespace}:{name}', kwargs=kwargs)
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import BadRequest, FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.shortcuts import render
+
+
+PAGE_SIZE = 50
+# Значения курсора — только скаляры JSON (список или объект в фильтре дает 500),
+# целые — в пределах 64 бит (иначе OverflowError в драйвере БД)
+CURSOR_TYPES = (str, int, float, bool)
+MAX_CURSOR_INT = 2 ** 63
+
+
+def _value(obj, field):
+    for name in field.split('__'):
+        obj = getattr(obj, name) if obj is not None else None
+    return obj
+
+
+def encode_cursor(obj, ordering):
+    """Курсор — значения полей сортировки последней строки страницы"""
+    values = [_value(obj, field.lstrip('-')) for field in ordering]
+    data = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """Значения курсора или None, если курсор поврежден"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+    if not all(_is_scalar(value) for value in values):
+        return None
+    return values
+
+
+def _is_scalar(value):
+    if isinstance(value, int):
+        return -MAX_CURSOR_INT <= value < MAX_CURSOR_INT
+    return isinstance(value, CURSOR_TYPES)
+
+
+def _model_field(model, path):
+    """Поле модели по пути сортировки ('group__name', 'pk') или None (аннотация)"""
+    field = None
+    for name in path.split('__'):
+        if model is None:
+            return None
+        try:
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model
+    return field
+
+
+def _cursor_values(queryset, ordering, values):
+    """Значения курсора, приведенные к типам полей; ValidationError, если не приводятся"""
+    converted = []
+    for field_name, value in zip(ordering, values):
+        field = _model_field(queryset.model, field_name.lstrip('-'))
+        converted.append(field.to_python(value) if field is not None else value)
+    return converted
+
+
+def _after(ordering, values):
+    """
+    Условие «строго после курсора» для составной сортировки:
+    (a > x) OR (a = x AND b > y) OR ...
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def keyset_page(request, queryset, ordering, size=PAGE_SIZE):
+    """
+    Страница списка по курсору (?after=...), без OFFSET.
+
+    ordering должен быть уникальным (последнее поле — pk) и без NULL. Общее количество
+    считается только для первой страницы: подгрузка следующих страниц
+    таблицу не пересчитывает.
+    """
+    ordering = list(ordering)
+    values = None
+    cursor = request.GET.get('after')
+    if cursor:
+        # Поврежденный или подделанный курсор — 400, а не первая страница или 500
+        values = decode_cursor(cursor, ordering)
+        if values is None:
+            raise BadRequest('Invalid cursor')
+        try:
+            values = _cursor_values(queryset, ordering, values)
+        except ValidationError:
+            raise BadRequest('Invalid cursor')
+
+    page = queryset.order_by(*ordering)
+    if values is not None:
+        page = page.filter(_after(ordering, values))
+    items = list(page[:size + 1])
+
+    next_url = None
+    if len(items) > size:
+        items = items[:size]
+        params = request.GET.copy()
+        params['after'] = encode_cursor(items[-1], ordering)
+        next_url = f'{request.path}?{params.urlencode()}'
+
+    return {
+        'items': items,
+        'next_url': next_url,
+        'is_first': values is None,
+        'total': queryset.count() if values is None else None,
+    }
+
+
+def ranked_page(queryset, size=PAGE_SIZE):
+    """Первая страница результатов, отсортированных по релевантности (без курсора)"""
+    return {
+        'items': list(queryset[:size]),
+        'next_url': None,
+        'is_first': True,
+        'total': queryset.count(),
+    }
+
+
+def render_page(request, template, context, rows_template, table_template=None):
+    """
+    Полная страница; для htmx — только таблица (первая страница, например
+    при поиске) или только строки следующей страницы.
+    """
+    if request.htmx:
+        template = table_template if table_template and context['page']['is_first'] else rows_template
+    return render(request, template, context)
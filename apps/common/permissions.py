@@ -1,9 +1,19 @@
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
 from django.shortcuts import redirect
 from django.urls import reverse
 
 def role_required(*roles):
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_async_view(request, *args, **kwargs):
+                user = await request.auser()
+                if not user.is_authenticated or getattr(user, 'role', None) not in roles:
+                    return redirect(reverse('login'))
+                return await view_func(request, *args, **kwargs)
+            return _wrapped_async_view
+
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
             if not request.user.is_authenticated:
@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncWeek
+
+from .cache import bump_version, get_version
+from .models import Comment, JournalEntry
+from .routers import primary_reads
+
+
+GRADES = (0, 1, 2, 3)
+RECENT_ENTRIES = 20
+# Комментарии на странице профиля выводятся по курсору
+COMMENT_ORDERING = ['-created_at', '-pk']
+COMMENT_PAGE_SIZE = 20
+
+
+def _version_name(student_id):
+    return f'student_profile:{student_id}'
+
+
+def compute_student_profile(student_id):
+    """
+    Сводка по предметам: посещаемость, средний балл, распределение оценок
+    и баллы посещаемости по неделям.
+
+    Журнал агрегируется одним запросом с группировкой по (предмет, неделя);
+    предметы и итоги собираются из этих строк в Python.
+    """
+    weeks = (
+        JournalEntry.objects.filter(student_id=student_id)
+        .annotate(week=TruncWeek('date'))
+        .values('teacher_assignment__subject_id', 'teacher_assignment__subject__name', 'week')
+        .annotate(
+            total=Count('id'),
+            present=Count('id', filter=Q(attendance=True)),
+            points=Sum('attendance_points'),
+            grade_sum=Sum('grade'),
+            graded=Count('grade'),
+            **{f'grade_{g}': Count('id', filter=Q(grade=g)) for g in GRADES},
+        )
+        .order_by('teacher_assignment__subject__name', 'week')
+    )
+
+    subjects = {}
+    for row in weeks:
+        subject = subjects.setdefault(row['teacher_assignment__subject_id'], {
+            'name': row['teacher_assignment__subject__name'],
+            'total': 0,
+            'present': 0,
+            'grade_sum': 0,
+            'graded': 0,
+            'distribution': dict.fromkeys(GRADES, 0),
+            'weeks': [],
+        })
+        subject['total'] += row['total']
+        subject['present'] += row['present']
+        subject['grade_sum'] += row['grade_sum'] or 0
+        subject['graded'] += row['graded']
+        for g in GRADES:
+            subject['distribution'][g] += row[f'grade_{g}']
+        subject['weeks'].append({
+            'week': row['week'],
+            'points': round(row['points'] or 0, 2),
+            'present': row['present'],
+            'total': row['total'],
+        })
+
+    for subject in subjects.values():
+        subject['attendance_rate'] = round(subject['present'] * 100 / subject['total'], 1)
+        subject['grade_average'] = round(subject['grade_sum'] / subject['graded'], 2) if subject['graded'] else None
+        peak = max(week['points'] for week in subject['weeks']) or 1
+        for week in subject['weeks']:
+            # Столбик недели: высота в процентах от лучшей недели предмета.
+            # Готовые строки — шаблон не локализует сотни чисел на каждый показ
+            week['height'] = str(round(week['points'] * 100 / peak))
+            week['title'] = f"{week['week']:%d.%m}: {week['points']} ({week['present']}/{week['total']})"
+
+    recent = list(
+        JournalEntry.objects.filter(student_id=student_id)
+        .order_by('-date', '-pk')
+        .values('date', 'grade', 'attendance', 'teacher_assignment__subject__name')[:RECENT_ENTRIES]
+    )
+    comment_counts = dict(
+        Comment.objects.filter(student_id=student_id)
+        .values_list('comment_type')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    return {
+        'subjects': list(subjects.values()),
+        'recent': recent,
+        'comment_counts': comment_counts,
+    }
+
+
+def get_student_profile(student_id):
+    """
+    Профиль студента из кэша. Ключ версионируется по студенту: запись
+    в журнал или комментарий меняют версию (invalidate_student_profiles).
+    Считается по default: кэш общий для ролей, читающих из реплики и без нее.
+    """
+    key = f'student_profile:{student_id}:v{get_version(_version_name(student_id))}'
+    profile = cache.get(key)
+    if profile is None:
+        with primary_reads():
+            profile = compute_student_profile(student_id)
+        cache.set(key, profile, settings.STUDENT_PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_student_profiles(student_ids):
+    for student_id in set(student_ids):
+        bump_version(_version_name(student_id))
@@ -0,0 +1,119 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+
+
+logger = logging.getLogger(__name__)
+
+# IN (%s, %s, ...) разной длины — один и тот же запрос
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+# Сколько медленных запросов хранить для /admin-panel/perf/
+SLOW_REQUESTS_KEPT = 50
+# Повтор запроса с этим числом раз и больше — вероятный N+1
+SIMILAR_THRESHOLD = 5
+
+
+def normalize_sql(sql):
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """Обертка connection.execute_wrapper: SQL, параметры и длительность каждого запроса"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, (time.perf_counter() - started) * 1000))
+
+    def summary(self):
+        """
+        Итоги запроса: количество, время в БД, дубликаты (тот же SQL и
+        параметры) и похожие запросы (тот же SQL с другими параметрами —
+        признак N+1).
+        """
+        exact = Counter((sql, repr(params)) for sql, params, _ in self.queries)
+        similar = Counter(normalize_sql(sql) for sql, _, _ in self.queries)
+        top_sql, top_count = similar.most_common(1)[0] if similar else ('', 0)
+        return {
+            'queries': len(self.queries),
+            'db_ms': round(sum(ms for _, _, ms in self.queries), 1),
+            'duplicates': sum(n - 1 for n in exact.values() if n > 1),
+            'similar': sum(n - 1 for n in similar.values() if n > 1),
+            'top_similar': {'count': top_count, 'sql': top_sql[:300]} if top_count > 1 else None,
+        }
+
+
+class RequestStats:
+    """
+    Сводка по (view, роль) в памяти процесса.
+
+    У каждого процесса сервера своя статистика; ответ /admin-panel/perf/
+    содержит pid, чтобы это было видно.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.views = {}
+            self.slow = deque(maxlen=SLOW_REQUESTS_KEPT)
+
+    def add(self, view, role, elapsed_ms, summary, slow_ms):
+        with self._lock:
+            s = self.views.setdefault((view, role), {
+                'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0,
+                'queries': 0, 'max_queries': 0, 'max_similar': 0, 'top_similar': None,
+            })
+            s['requests'] += 1
+            s['total_ms'] += elapsed_ms
+            s['max_ms'] = max(s['max_ms'], elapsed_ms)
+            s['db_ms'] += summary['db_ms']
+            s['queries'] += summary['queries']
+            s['max_queries'] = max(s['max_queries'], summary['queries'])
+            if summary['similar'] > s['max_similar']:
+                s['max_similar'] = summary['similar']
+                s['top_similar'] = summary['top_similar']
+            if elapsed_ms >= slow_ms:
+                self.slow.append({
+                    'time': time.time(), 'view': view, 'role': role,
+                    'ms': round(elapsed_ms, 1), **summary,
+                })
+
+    def snapshot(self):
+        with self._lock:
+            views = []
+            for (view, role), s in self.views.items():
+                n = s['requests']
+                views.append({
+                    'view': view,
+                    'role': role,
+                    'requests': n,
+                    'avg_ms': round(s['total_ms'] / n, 1),
+                    'max_ms': round(s['max_ms'], 1),
+                    'avg_db_ms': round(s['db_ms'] / n, 1),
+                    'avg_queries': round(s['queries'] / n, 1),
+                    'max_queries': s['max_queries'],
+                    'max_similar': s['max_similar'],
+                    'top_similar': s['top_similar'],
+                })
+            views.sort(key=lambda v: v['avg_ms'] * v['requests'], reverse=True)
+            return {
+                'pid': os.getpid(),
+                'since': self.started,
+                'views': views,
+                'slow_requests': list(self.slow),
+            }
+
+
+request_stats = RequestStats()
@@ -0,0 +1,104 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .backends import invalidate_cached_user
+from .dashboard import invalidate_dashboard
+from .gpa import update_gpa
+from .live import invalidate_live_data, update_present_counts
+from .middleware import mark_session_refreshed
+from .models import Comment, Course, CurrentLesson, Group, Schedule, Semester, Student, TeacherAssignment, User
+from .profiles import invalidate_student_profiles
+from .reports import invalidate_reports
+from .rollup import update_daily_attendance
+from .search import index_student, unindex_student
+from .signals import journal_entries_changed
+from .timetable import invalidate_timetable
+
+
+@receiver(journal_entries_changed)
+def update_live_counters(sender, keys, **kwargs):
+    update_present_counts(keys)
+
+
+@receiver(journal_entries_changed)
+def update_attendance_rollup(sender, keys, **kwargs):
+    update_daily_attendance(keys)
+
+
+@receiver(journal_entries_changed)
+def update_student_gpa(sender, keys, **kwargs):
+    # GPA попадает в PDF-отчеты и на панели
+    if update_gpa(keys):
+        invalidate_reports()
+        invalidate_dashboard()
+
+
+@receiver(journal_entries_changed)
+def invalidate_student_profile(sender, keys, **kwargs):
+    invalidate_student_profiles(student_id for student_id, _, _ in keys)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_commented_profile(sender, instance, **kwargs):
+    invalidate_student_profiles([instance.student_id])
+
+
+@receiver(journal_entries_changed)
+def invalidate_today_attendance(sender, keys, **kwargs):
+    today = timezone.localdate()
+    if any(date == today for _, _, date in keys):
+        invalidate_dashboard()
+
+
+@receiver([post_save, post_delete], sender=CurrentLesson)
+@receiver([post_save, post_delete], sender=Schedule)
+def invalidate_live_dashboard(sender, **kwargs):
+    invalidate_live_data()
+
+
+@receiver([post_save, post_delete], sender=Schedule)
+@receiver([post_save, post_delete], sender=TeacherAssignment)
+@receiver([post_save, post_delete], sender=Semester)
+def invalidate_timetable_index(sender, **kwargs):
+    invalidate_timetable()
+
+
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Group)
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_pdf_reports(sender, **kwargs):
+    invalidate_reports()
+
+
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Group)
+@receiver([post_save, post_delete], sender=User)
+def invalidate_dashboard_summary(sender, **kwargs):
+    # Вход в систему обновляет только last_login — показатели не меняются
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    invalidate_dashboard()
+
+
+@receiver(post_save, sender=Student)
+def update_search_index(sender, instance, **kwargs):
+    index_student(instance)
+
+
+@receiver(post_delete, sender=Student)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_student(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(user_logged_in)
+def set_session_refreshed(sender, request, user, **kwargs):
+    # Сессия и так сохраняется при входе — отметка не дает лишней записи
+    mark_session_refreshed(request.session)
@@ -0,0 +1,237 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .cache import bump_version, get_version
+from .models import Course, Group, Student
+
+
+REPORTS_VERSION = 'reports'
+# Подкаталог JOB_FILES_DIR: отчеты с персональными данными не должны лежать
+# в MEDIA (раздается без входа), их отдает только export_pdf
+REPORTS_DIR = 'reports'
+
+# Шрифты с кириллицей и таджикскими буквами (ӣ, ӯ, ҳ, ҷ, қ, ғ)
+FONT_CANDIDATES = [
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/dejavu/DejaVuSans.ttf', '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf'),
+    ('C:/Windows/Fonts/arial.ttf', 'C:/Windows/Fonts/arialbd.ttf'),
+    ('/Library/Fonts/Arial Unicode.ttf', '/Library/Fonts/Arial Unicode.ttf'),
+]
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 36
+ROW_HEIGHT = 16
+FONT_SIZE = 9
+TITLE_SIZE = 14
+
+STUDENT_FIELDS = (
+    'student_id', 'last_name', 'first_name', 'middle_name',
+    'group__name', 'course__number', 'gpa', 'contract_status',
+)
+CONTRACT_STATUS = dict(Student._meta.get_field('contract_status').choices)
+
+
+_fonts = None
+
+
+def get_report_fonts():
+    """(обычный, жирный) шрифт: REPORT_FONT_PATH, системный TTF или Helvetica"""
+    global _fonts
+    if _fonts is not None:
+        return _fonts
+
+    candidates = list(FONT_CANDIDATES)
+    custom = getattr(settings, 'REPORT_FONT_PATH', None)
+    if custom:
+        candidates.insert(0, (custom, getattr(settings, 'REPORT_FONT_BOLD_PATH', custom)))
+
+    _fonts = ('Helvetica', 'Helvetica-Bold')
+    for regular, bold in candidates:
+        if os.path.exists(regular):
+            pdfmetrics.registerFont(TTFont('ReportFont', regular))
+            pdfmetrics.registerFont(TTFont('ReportFont-Bold', bold if os.path.exists(bold) else regular))
+            _fonts = ('ReportFont', 'ReportFont-Bold')
+            break
+    return _fonts
+
+
+def _student_row(number, values):
+    student_id, last_name, first_name, middle_name, group, course, gpa, contract = values
+    return [
+        str(number),
+        student_id,
+        f"{last_name} {first_name} {middle_name}".strip(),
+        group or '—',
+        str(course or '—'),
+        f"{gpa:.2f}" if gpa is not None else '—',
+        CONTRACT_STATUS.get(contract, contract),
+    ]
+
+
+STUDENT_COLUMNS = [
+    ('№', 36), ('ID', 70), ('Ному насаб', 179), ('Гурӯҳ', 75),
+    ('Курс', 35), ('GPA', 40), ('Ҳолат', 88),
+]
+
+
+def _students_report(title, queryset):
+    return {
+        'title': title,
+        'columns': STUDENT_COLUMNS,
+        'rows': (
+            _student_row(i, values)
+            for i, values in enumerate(
+                queryset.order_by('group__name', 'last_name', 'first_name')
+                .values_list(*STUDENT_FIELDS).iterator(chunk_size=2000),
+                start=1,
+            )
+        ),
+    }
+
+
+def build_report(kind, group_id=None, course_id=None):
+    """Описание отчета: заголовок, колонки и ленивый итератор строк"""
+    students = Student.objects.filter(is_active=True)
+    if kind == 'group':
+        group = Group.objects.get(id=group_id)
+        return _students_report(f"Гурӯҳи {group.name}", students.filter(group=group))
+    if kind == 'course':
+        course = Course.objects.get(id=course_id)
+        return _students_report(str(course), students.filter(course=course))
+    if kind == 'debtors':
+        return _students_report('Қарздорон', students.filter(contract_status='debt'))
+    return _students_report('Рӯйхати донишҷӯён', students)
+
+
+def _fit(text, font, size, width):
+    """Обрезать текст под ширину колонки"""
+    # Глиф не шире кегля — короткие строки не измеряем
+    if len(text) * size <= width or pdfmetrics.stringWidth(text, font, size) <= width:
+        return text
+    while text and pdfmetrics.stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+
+def render_table_pdf(output, title, columns, rows):
+    """
+    Таблица на reportlab: заголовок, шапка на каждой странице, номера страниц.
+
+    rows — итератор; строки рисуются по мере чтения и в памяти не копятся.
+    Сам PDF памятью не ограничен: reportlab держит все готовые страницы
+    (сжатыми) до save(), поэтому память растет с числом страниц — примерно
+    на размер итогового файла (10 000 строк — ~0,6 МБ, 40 000 — ~2,4 МБ).
+    """
+    font, bold = get_report_fonts()
+    pdf = canvas.Canvas(output, pagesize=A4, pageCompression=1)
+    pdf.setTitle(title)
+    generated = timezone.localtime().strftime('%d.%m.%Y %H:%M')
+    table_width = sum(w for _, w in columns)
+    page = 0
+
+    def start_page():
+        nonlocal page
+        page += 1
+        y = PAGE_HEIGHT - MARGIN
+        if page == 1:
+            pdf.setFont(bold, TITLE_SIZE)
+            pdf.drawString(MARGIN, y - TITLE_SIZE, title)
+            y -= TITLE_SIZE + 12
+        pdf.setFont(font, FONT_SIZE - 1)
+        pdf.drawRightString(PAGE_WIDTH - MARGIN, MARGIN / 2, f"{generated} — саҳ. {page}")
+
+        # Шапка таблицы
+        pdf.setFillGray(0.9)
+        pdf.rect(MARGIN, y - ROW_HEIGHT, table_width, ROW_HEIGHT, stroke=0, fill=1)
+        pdf.setFillGray(0)
+        pdf.setFont(bold, FONT_SIZE)
+        x = MARGIN
+        for header, width in columns:
+            pdf.drawString(x + 3, y - ROW_HEIGHT + 4, _fit(header, bold, FONT_SIZE, width - 6))
+            x += width
+        pdf.setFont(font, FONT_SIZE)
+        return y - ROW_HEIGHT
+
+    # Весь текст страницы — один текстовый объект, линии — одним путем
+    def flush_page(text, lines):
+        pdf.drawText(text)
+        pdf.setLineWidth(0.3)
+        pdf.drawPath(lines, stroke=1, fill=0)
+
+    y = start_page()
+    text, lines = pdf.beginText(), pdf.beginPath()
+    text.setFont(font, FONT_SIZE)
+    for row in rows:
+        if y - ROW_HEIGHT < MARGIN:
+            flush_page(text, lines)
+            pdf.showPage()
+            y = start_page()
+            text, lines = pdf.beginText(), pdf.beginPath()
+            text.setFont(font, FONT_SIZE)
+        x = MARGIN
+        for value, (_, width) in zip(row, columns):
+            text.setTextOrigin(x + 3, y - ROW_HEIGHT + 4)
+            text.textOut(_fit(str(value), font, FONT_SIZE, width - 6))
+            x += width
+        lines.moveTo(MARGIN, y - ROW_HEIGHT)
+        lines.lineTo(MARGIN + table_width, y - ROW_HEIGHT)
+        y -= ROW_HEIGHT
+    flush_page(text, lines)
+
+    pdf.save()
+
+
+def _report_path(kind, group_id, course_id):
+    version = get_version(REPORTS_VERSION)
+    prefix = '-'.join(str(p) for p in (kind, group_id, course_id) if p)
+    directory = os.path.join(settings.JOB_FILES_DIR, REPORTS_DIR)
+    return directory, prefix, os.path.join(directory, f"{prefix}-v{version}.pdf")
+
+
+def cached_report_file(kind, group_id=None, course_id=None):
+    """Путь к PDF текущей версии, если он уже построен, иначе None"""
+    path = _report_path(kind, group_id, course_id)[2]
+    return path if os.path.exists(path) else None
+
+
+def get_report_file(kind, group_id=None, course_id=None):
+    """
+    Путь к готовому PDF отчета.
+
+    Файл кэшируется в JOB_FILES_DIR/reports и пересоздается, когда меняется
+    версия данных (студенты, группы, курсы).
+    """
+    directory, prefix, path = _report_path(kind, group_id, course_id)
+    if os.path.exists(path):
+        return path
+
+    report = build_report(kind, group_id=group_id, course_id=course_id)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            render_table_pdf(output, report['title'], report['columns'], report['rows'])
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    # Удалить устаревшие версии этого отчета
+    for name in os.listdir(directory):
+        if name.startswith(f"{prefix}-v") and name.endswith('.pdf') and name != os.path.basename(path):
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+    return path
+
+
+def invalidate_reports():
+    bump_version(REPORTS_VERSION)
@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .attendance import STUDENT_BATCH_SIZE
+from .models import DailyAttendance, JournalEntry, TeacherAssignment
+
+
+BACKFILL_CHUNK_DAYS = 30
+
+
+def _journal_totals(**filters):
+    """{(teacher_assignment_id, date): (present, total, grade_sum, grade_count)} — один групповой запрос"""
+    rows = (
+        JournalEntry.objects.filter(**filters)
+        .values_list('teacher_assignment_id', 'date')
+        .annotate(
+            present=Count('id', filter=Q(attendance=True)),
+            total=Count('id'),
+            grade_sum=Sum('grade'),
+            grade_count=Count('grade'),
+        )
+        .order_by()
+    )
+    return {
+        (assignment_id, date): (present, total, grade_sum or 0, grade_count)
+        for assignment_id, date, present, total, grade_sum, grade_count in rows
+    }
+
+
+def _save_rollup(pairs, totals):
+    """Записать сводку для пар (teacher_assignment_id, date); пустые пары удаляются"""
+    assignments = dict(
+        (pk, (group_id, subject_id))
+        for pk, group_id, subject_id in TeacherAssignment.objects.filter(
+            id__in={a for a, _ in pairs}
+        ).values_list('id', 'group_id', 'subject_id')
+    )
+    rows = []
+    empty = []
+    for assignment_id, date in pairs:
+        if assignment_id not in assignments:
+            continue
+        if (assignment_id, date) not in totals:
+            empty.append((assignment_id, date))
+            continue
+        present, total, grade_sum, grade_count = totals[(assignment_id, date)]
+        group_id, subject_id = assignments[assignment_id]
+        rows.append(DailyAttendance(
+            date=date,
+            group_id=group_id,
+            subject_id=subject_id,
+            teacher_assignment_id=assignment_id,
+            present_count=present,
+            total_count=total,
+            grade_sum=grade_sum,
+            grade_count=grade_count,
+        ))
+
+    DailyAttendance.objects.bulk_create(
+        rows,
+        batch_size=STUDENT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['date', 'group', 'subject', 'teacher_assignment'],
+        update_fields=['present_count', 'total_count', 'grade_sum', 'grade_count'],
+    )
+    if empty:
+        condition = Q()
+        for assignment_id, date in empty:
+            condition |= Q(teacher_assignment_id=assignment_id, date=date)
+        DailyAttendance.objects.filter(condition).delete()
+    return len(rows)
+
+
+def update_daily_attendance(keys):
+    """
+    Обновить сводку после записи в журнал.
+
+    keys — {(student_id, teacher_assignment_id, date)}. Пересчитываются только
+    затронутые (назначение, дата) одним сгруппированным запросом.
+    """
+    pairs = {(assignment_id, date) for _, assignment_id, date in keys}
+    if not pairs:
+        return 0
+    totals = _journal_totals(
+        teacher_assignment_id__in={a for a, _ in pairs},
+        date__in={d for _, d in pairs},
+    )
+    totals = {pair: value for pair, value in totals.items() if pair in pairs}
+    with transaction.atomic():
+        return _save_rollup(pairs, totals)
+
+
+def backfill_daily_attendance(start_date, end_date, chunk_days=BACKFILL_CHUNK_DAYS):
+    """
+    Пересобрать сводку за [start_date, end_date] кусками по chunk_days дней.
+    Каждый кусок — один групповой запрос по журналу и одна транзакция.
+    Возвращает количество записанных строк сводки.
+    """
+    if chunk_days < 1:
+        raise ValueError(f'chunk_days must be at least 1, got {chunk_days}')
+    written = 0
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+        totals = _journal_totals(date__gte=chunk_start, date__lte=chunk_end)
+        with transaction.atomic():
+            DailyAttendance.objects.filter(date__gte=chunk_start, date__lte=chunk_end).delete()
+            written += _save_rollup(set(totals), totals)
+        chunk_start = chunk_end + timedelta(days=1)
+    return written
+
+
+def attendance_totals(**filters):
+    """
+    Итоги посещаемости и оценок из сводки, например
+    attendance_totals(date=today) или attendance_totals(date__range=(start, end), group=group).
+    """
+    totals = DailyAttendance.objects.filter(**filters).aggregate(
+        present=Sum('present_count'),
+        total=Sum('total_count'),
+        grade_sum=Sum('grade_sum'),
+        grade_count=Sum('grade_count'),
+    )
+    present, total = totals['present'] or 0, totals['total'] or 0
+    grade_count = totals['grade_count'] or 0
+    return {
+        'present': present,
+        'total': total,
+        'percentage': round(present / total * 100, 1) if total > 0 else 0,
+        'avg_grade': round((totals['grade_sum'] or 0) / grade_count, 2) if grade_count else 0,
+    }
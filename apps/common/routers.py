@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_DB_ALIAS = 'replica'
+# Сессии и пользователь только что могли быть записаны (вход) — всегда из default
+PRIMARY_ONLY_APPS = {'sessions', 'admin'}
+# Очередь задач: статус и прогресс меняются постоянно, копия всегда отстает
+PRIMARY_ONLY_MODELS = {'common.Job'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def set_replica_reads(enabled):
+    """Включить чтение из реплики для текущего контекста; вернуть токен для reset_replica_reads"""
+    return _replica_reads.set(enabled)
+
+
+def reset_replica_reads(token):
+    _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Чтения внутри блока — из default, даже если запрос читает из реплики.
+
+    Для значений общего кэша: ключ версионируется по изменениям в default,
+    и посчитанное по отстающей копии значение жило бы под новой версией
+    до следующего изменения.
+    """
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Чтения после set_replica_reads(True) — из копии БД, все остальное — из default.
+
+    Внутри транзакции default чтение тоже идет в default, чтобы не смешивать
+    только что записанные данные с устаревшей копией.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS or model._meta.label == settings.AUTH_USER_MODEL:
+            return None
+        if model._meta.label in PRIMARY_ONLY_MODELS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия default, объекты из обеих БД совместимы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплики приходит вместе с копией (refresh_replica)
+        return db == DEFAULT_DB_ALIAS
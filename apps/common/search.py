@@ -0,0 +1,127 @@
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import Student, StudentSearch
+
+
+SEARCH_TABLE = StudentSearch._meta.db_table
+SEARCH_FIELDS = ['student_id', 'last_name', 'first_name', 'middle_name', 'phone', 'email']
+# Вес колонок в bm25 (в порядке SEARCH_FIELDS)
+SEARCH_WEIGHTS = [10.0, 5.0, 3.0, 1.0, 2.0, 1.0]
+# Триграммы: короче 3 символов индекс не ищет
+MIN_TOKEN_LENGTH = 3
+
+REBUILD_BATCH_SIZE = 2000
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    f"USING fts5({', '.join(SEARCH_FIELDS)}, tokenize='trigram')"
+)
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {SEARCH_TABLE}"
+# Скрытая колонка rank — bm25 с весами SEARCH_WEIGHTS (настройка хранится в самой таблице)
+RANK_CONFIG_SQL = (
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) "
+    f"VALUES ('rank', 'bm25({', '.join(str(w) for w in SEARCH_WEIGHTS)})')"
+)
+
+
+_available = set()
+
+
+def search_index_available():
+    """Индекс FTS5 есть только на SQLite (создается миграцией)"""
+    if connection.alias in _available:
+        return True
+    if connection.vendor == 'sqlite' and SEARCH_TABLE in connection.introspection.table_names():
+        # Запоминаем только положительный ответ: таблица может появиться после migrate
+        _available.add(connection.alias)
+        return True
+    return False
+
+
+def _match_expression(query):
+    """Каждое слово — подстрока (AND), кавычки экранируются"""
+    tokens = query.split()
+    return ' '.join('"{}"'.format(token.replace('"', '""')) for token in tokens)
+
+
+def _fallback_filter(query):
+    condition = Q()
+    for token in query.split():
+        token_condition = Q()
+        for field in SEARCH_FIELDS:
+            token_condition |= Q(**{f'{field}__icontains': token})
+        condition &= token_condition
+    return condition
+
+
+def search_students(queryset, query):
+    """
+    Поиск студентов с ранжированием (общий для декана и замдекана).
+
+    На SQLite используется индекс FTS5 с триграммами (подстрока в любом поле,
+    сортировка по bm25); для слов короче 3 символов и других СУБД — icontains.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    if any(len(token) < MIN_TOKEN_LENGTH for token in query.split()) or not search_index_available():
+        return queryset.filter(_fallback_filter(query))
+
+    # JOIN с индексом по rowid; rank — bm25 с весами колонок
+    return queryset.filter(
+        search_entry__document__match=_match_expression(query),
+    ).annotate(
+        search_rank=F('search_entry__rank'),
+    ).order_by('search_rank')
+
+
+def _row(student):
+    return [getattr(student, field) or '' for field in SEARCH_FIELDS]
+
+
+def index_student(student):
+    if not search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [student.pk])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [student.pk] + _row(student),
+        )
+
+
+def unindex_student(student_pk):
+    if not search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [student_pk])
+
+
+def rebuild_search_index(batch_size=REBUILD_BATCH_SIZE):
+    """Перестроить индекс целиком; возвращает количество студентов"""
+    if connection.vendor != 'sqlite':
+        return 0
+    count = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(RANK_CONFIG_SQL)
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        insert = (
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) "
+            f"VALUES (%s, %s, %s, %s, %s, %s, %s)"
+        )
+        rows = Student.objects.order_by('pk').values_list('pk', *SEARCH_FIELDS)
+        batch = []
+        for pk, *values in rows.iterator(chunk_size=batch_size):
+            batch.append([pk] + [value or '' for value in values])
+            if len(batch) >= batch_size:
+                cursor.executemany(insert, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+            count += len(batch)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return count
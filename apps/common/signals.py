@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+
+# Отправляется после записи в журнал (save/delete и массовые операции).
+# keys — множество (student_id, teacher_assignment_id, date) затронутых записей.
+journal_entries_changed = Signal()
@@ -0,0 +1,115 @@
+import os
+import uuid
+import zipfile
+
+import openpyxl
+from django.conf import settings
+from django.db.models import Max, Min
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .attendance import recompute_semester_points
+from .exports import ROSTER_HEADER, student_rows, xlsx_row
+from .gpa import recompute_semester_gpa
+from .jobs import JobError, register
+from .models import Course, Group, JournalEntry, Semester, Student, TeacherAssignment
+from .reports import get_report_file, invalidate_reports
+from .rollup import backfill_daily_attendance
+from .search import rebuild_search_index
+from .utils import import_journal_from_excel
+
+
+# Сколько ошибок импорта сохранять в результате задачи
+IMPORT_SHOWN_ERRORS = 20
+EXPORT_PROGRESS_ROWS = 500
+
+
+def job_file_path(name):
+    """Файл задачи (загрузка или результат) в JOB_FILES_DIR"""
+    os.makedirs(settings.JOB_FILES_DIR, exist_ok=True)
+    return os.path.join(settings.JOB_FILES_DIR, name)
+
+
+def new_job_file(suffix):
+    return job_file_path(f'{uuid.uuid4().hex}{suffix}')
+
+
+@register('excel_import', concurrency=1)
+def excel_import(payload, progress):
+    """Импорт журнала из загруженного файла; файл удаляется после задачи"""
+    try:
+        assignment = TeacherAssignment.objects.get(id=payload['assignment_id'])
+    except TeacherAssignment.DoesNotExist:
+        raise JobError('Таъинот ёфт нашуд')
+    try:
+        result = import_journal_from_excel(payload['path'], assignment, progress=progress)
+    except (InvalidFileException, zipfile.BadZipFile, FileNotFoundError):
+        raise JobError('Файли Excel хонда нашуд')
+    result['errors'] = result['errors'][:IMPORT_SHOWN_ERRORS]
+    return result
+
+
+@register('report_pdf', concurrency=2)
+def report_pdf(payload, progress):
+    """PDF отчета в кэше JOB_FILES_DIR/reports; скачивание — по url из payload"""
+    try:
+        get_report_file(payload['kind'], group_id=payload.get('group_id'), course_id=payload.get('course_id'))
+    except (Group.DoesNotExist, Course.DoesNotExist):
+        raise JobError('Ҳисобот сохта нашуд')
+    return {'url': payload['url']}
+
+
+@register('export_students', concurrency=2)
+def export_students(payload, progress):
+    """Список студентов в XLSX (write-only) в JOB_FILES_DIR"""
+    students = Student.objects.filter(is_active=True)
+    if payload.get('group_id'):
+        students = students.filter(group_id=payload['group_id'])
+    total = students.count()
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(ROSTER_HEADER)
+    for number, row in enumerate(student_rows(students), start=1):
+        ws.append(xlsx_row(ws, row))
+        if number % EXPORT_PROGRESS_ROWS == 0:
+            progress(number, total)
+
+    path = new_job_file('.xlsx')
+    wb.save(path)
+    return {'file': os.path.basename(path), 'filename': 'students.xlsx', 'rows': total}
+
+
+@register('recompute_gpa', concurrency=1)
+def recompute_gpa(payload, progress):
+    semesters = list(Semester.objects.all())
+    students = updated = 0
+    for number, semester in enumerate(semesters):
+        progress(number, len(semesters), str(semester))
+        counted, changed = recompute_semester_gpa(semester)
+        students += counted
+        updated += changed
+    invalidate_reports()
+    return {'semesters': len(semesters), 'students': students, 'updated': updated}
+
+
+@register('recompute_attendance_points', concurrency=1)
+def recompute_attendance_points(payload, progress):
+    semesters = list(Semester.objects.filter(is_active=True))
+    updated = 0
+    for number, semester in enumerate(semesters):
+        progress(number, len(semesters), str(semester))
+        updated += recompute_semester_points(semester)[1]
+    return {'semesters': len(semesters), 'updated': updated}
+
+
+@register('backfill_daily_attendance', concurrency=1)
+def backfill_attendance(payload, progress):
+    bounds = JournalEntry.objects.aggregate(first=Min('date'), last=Max('date'))
+    if bounds['first'] is None:
+        return {'rows': 0}
+    return {'rows': backfill_daily_attendance(bounds['first'], bounds['last'])}
+
+
+@register('rebuild_search_index', concurrency=1)
+def search_index(payload, progress):
+    return {'students': rebuild_search_index()}
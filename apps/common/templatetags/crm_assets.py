@@ -0,0 +1,24 @@
+from django import template
+from django.utils.html import format_html
+
+from apps.common.assets import ASSETS
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_asset(name, defer=False):
+    """<link>/<script> для стороннего файла: локальная копия или CDN"""
+    asset = ASSETS[name]
+    if asset.kind == 'css':
+        return format_html('<link rel="stylesheet" href="{}">', asset.url)
+    if defer:
+        return format_html('<script src="{}" defer></script>', asset.url)
+    return format_html('<script src="{}"></script>', asset.url)
+
+
+@register.simple_tag
+def vendor_url(name):
+    """Адрес стороннего файла (например, перевод DataTables для language.url)"""
+    return ASSETS[name].url
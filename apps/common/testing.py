@@ -0,0 +1,42 @@
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from .profiling import QueryRecorder
+
+
+@contextmanager
+def query_budget(limit, max_similar=None):
+    """
+    Проверка бюджета запросов для тестов:
+
+        with query_budget(5, max_similar=2):
+            client.get(url)
+
+    AssertionError, если запросов (по всем БД) больше limit или один и тот же
+    SQL с разными параметрами повторился больше max_similar раз (N+1).
+    В сообщении — все запросы блока.
+    """
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(recorder))
+        yield recorder
+
+    summary = recorder.summary()
+    problems = []
+    if summary['queries'] > limit:
+        problems.append(f"{summary['queries']} queries, budget {limit}")
+    top = summary['top_similar']
+    if max_similar is not None and top and top['count'] > max_similar:
+        problems.append(f"{top['count']} similar queries (max {max_similar}): {top['sql']}")
+    if problems:
+        listing = '\n'.join(f'{i}. {sql}' for i, (sql, _, _) in enumerate(recorder.queries, 1))
+        raise AssertionError('; '.join(problems) + '\n' + listing)
+
+
+def assert_view_budget(client, url, limit, max_similar=None, **kwargs):
+    """GET url в пределах бюджета запросов; возвращает ответ"""
+    with query_budget(limit, max_similar=max_similar):
+        response = client.get(url, **kwargs)
+    return response
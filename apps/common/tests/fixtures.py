@@ -0,0 +1,68 @@
+import tempfile
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from apps.common import timetable
+from apps.common.models import (
+    Course, Group, Schedule, Semester, Student, Subject, TeacherAssignment, User,
+)
+
+
+# Тесты не трогают общий файловый кэш и каталог файлов задач сервера;
+# статика — без манифеста (collectstatic перед тестами не нужен)
+isolated = override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'crm-tests'}},
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+    JOB_FILES_DIR=tempfile.mkdtemp(prefix='crm-test-jobs-'),
+    JOBS_RUN_INLINE=False,
+)
+
+SEMESTER_START = date(2024, 9, 2)  # понедельник
+SEMESTER_END = date(2025, 1, 31)
+PASSWORD = 'test-pass'
+
+
+def reset_caches():
+    """Общий кэш и индекс расписания процесса живут дольше одного теста"""
+    cache.clear()
+    timetable._state.update(index=None, version=None, checked=0.0)
+
+
+def create_user(username, role, **fields):
+    return User.objects.create_user(username, password=PASSWORD, role=role, full_name=username.title(), **fields)
+
+
+def create_school(groups=2, students_per_group=5, weekdays=(0, 2, 4)):
+    """
+    Небольшой факультет: курс, группы со студентами, активный семестр и по
+    одному назначению с расписанием (weekdays) на каждую группу.
+    Возвращает словарь с созданными объектами.
+    """
+    course = Course.objects.create(number=1, name='Курси 1')
+    semester = Semester.objects.create(name='Тирамоҳ', start_date=SEMESTER_START, end_date=SEMESTER_END)
+    teacher = create_user('teacher', 'teacher')
+    subject = Subject.objects.create(name='Математика', code='MATH-1', course=course)
+
+    school = {'course': course, 'semester': semester, 'teacher': teacher, 'subject': subject,
+              'groups': [], 'students': [], 'assignments': []}
+    for g in range(groups):
+        group = Group.objects.create(name=f'Гурӯҳ {g + 1}', course=course)
+        students = Student.objects.bulk_create(
+            Student(student_id=f'S{g + 1:02d}{n:03d}', first_name=f'Ном{n}', last_name=f'Насаб{g}-{n:03d}',
+                    group=group, course=course)
+            for n in range(students_per_group)
+        )
+        assignment = TeacherAssignment.objects.create(teacher=teacher, group=group, subject=subject,
+                                                      semester=semester)
+        for weekday in weekdays:
+            Schedule.objects.create(teacher_assignment=assignment, weekday=weekday,
+                                    start_time=time(8, 0), end_time=time(9, 20))
+        school['groups'].append(group)
+        school['students'].extend(students)
+        school['assignments'].append(assignment)
+    return school
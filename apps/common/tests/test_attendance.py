@@ -0,0 +1,125 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from apps.common.attendance import (
+    DAILY_POINTS, WEEKLY_POINTS, calculate_weekly_attendance_points, get_week_start, points_per_day,
+    recompute_semester_points, week_total_points,
+)
+from apps.common.journal import upsert_journal_entries
+from apps.common.models import JournalEntry
+
+from .fixtures import SEMESTER_START, create_school, isolated, reset_caches
+
+
+MONDAY = SEMESTER_START
+
+
+class PointsRulesTest(SimpleTestCase):
+    def test_week_start(self):
+        self.assertEqual(get_week_start(MONDAY), MONDAY)
+        self.assertEqual(get_week_start(MONDAY + timedelta(days=6)), MONDAY)
+        self.assertEqual(get_week_start(MONDAY + timedelta(days=7)), MONDAY + timedelta(days=7))
+
+    def test_points(self):
+        self.assertEqual(week_total_points(0), Decimal('0'))
+        self.assertEqual(week_total_points(2), DAILY_POINTS * 2)
+        self.assertEqual(week_total_points(3), WEEKLY_POINTS)
+        self.assertEqual(week_total_points(5), WEEKLY_POINTS)
+        self.assertEqual(points_per_day(1), DAILY_POINTS)
+        self.assertEqual(points_per_day(3), Decimal('2.00'))
+        self.assertEqual(points_per_day(4), Decimal('1.50'))
+
+
+@isolated
+class AttendancePointsTest(TestCase):
+    def setUp(self):
+        reset_caches()
+        school = create_school(groups=1, students_per_group=2)
+        self.assignment = school['assignments'][0]
+        self.student, self.other = school['students']
+
+    def _save(self, date, attendance=True, student=None):
+        entry = JournalEntry(student=student or self.student, teacher_assignment=self.assignment,
+                             date=date, attendance=attendance)
+        entry.save()
+        return entry
+
+    def _points(self, student=None):
+        return dict(
+            JournalEntry.objects.filter(student=student or self.student).values_list('date', 'attendance_points')
+        )
+
+    def test_save_recomputes_whole_week(self):
+        for day in (0, 2):
+            self._save(MONDAY + timedelta(days=day))
+        self.assertEqual(set(self._points().values()), {DAILY_POINTS})
+
+        # Третье посещение: 6 баллов делятся на все дни недели, включая сохраненные раньше
+        entry = self._save(MONDAY + timedelta(days=4))
+        self.assertEqual(entry.attendance_points, Decimal('2.00'))
+        self.assertEqual(set(self._points().values()), {Decimal('2.00')})
+        self.assertEqual(calculate_weekly_attendance_points(self.student, self.assignment, MONDAY), 6.0)
+
+        # Другие студенты и недели не затронуты
+        self._save(MONDAY + timedelta(days=7), student=self.other)
+        self.assertEqual(self._points(self.other), {MONDAY + timedelta(days=7): DAILY_POINTS})
+
+    def test_absence_has_no_points(self):
+        self._save(MONDAY)
+        absent = self._save(MONDAY + timedelta(days=2), attendance=False)
+        self.assertEqual(absent.attendance_points, 0)
+        self.assertEqual(self._points()[MONDAY], DAILY_POINTS)
+
+    def test_moved_entry_recomputes_previous_week(self):
+        for day in (0, 2, 4):
+            self._save(MONDAY + timedelta(days=day))
+        moved = JournalEntry.objects.get(student=self.student, date=MONDAY + timedelta(days=4))
+        moved.date = MONDAY + timedelta(days=7)
+        moved.save()
+
+        points = self._points()
+        self.assertEqual(points[MONDAY], DAILY_POINTS)
+        self.assertEqual(points[MONDAY + timedelta(days=2)], DAILY_POINTS)
+        self.assertEqual(points[MONDAY + timedelta(days=7)], DAILY_POINTS)
+
+    def test_delete_recomputes_week(self):
+        for day in (0, 2, 4):
+            self._save(MONDAY + timedelta(days=day))
+        JournalEntry.objects.get(student=self.student, date=MONDAY).delete()
+        self.assertEqual(set(self._points().values()), {DAILY_POINTS})
+
+    def test_bulk_upsert_matches_save(self):
+        upsert_journal_entries([
+            JournalEntry(student_id=self.student.pk, teacher_assignment_id=self.assignment.pk,
+                         date=MONDAY + timedelta(days=day), attendance=True)
+            for day in (0, 1, 2, 4)
+        ])
+        self.assertEqual(set(self._points().values()), {Decimal('1.50')})
+
+        # Повторная запись той же ячейки обновляет ее, а не создает новую
+        upsert_journal_entries([JournalEntry(student_id=self.student.pk, teacher_assignment_id=self.assignment.pk,
+                                             date=MONDAY + timedelta(days=1), attendance=False)])
+        points = self._points()
+        self.assertEqual(len(points), 4)
+        self.assertEqual(points[MONDAY + timedelta(days=1)], 0)
+        self.assertEqual(points[MONDAY], Decimal('2.00'))
+
+    def test_recompute_semester_points_repairs_drift(self):
+        for day in (0, 2, 4):
+            self._save(MONDAY + timedelta(days=day))
+        JournalEntry.objects.filter(student=self.student).update(attendance_points=Decimal('9.99'))
+
+        assignments, updated = recompute_semester_points(self.assignment.semester, chunk_size=1)
+        self.assertEqual((assignments, updated), (1, 3))
+        self.assertEqual(set(self._points().values()), {Decimal('2.00')})
+        self.assertEqual(recompute_semester_points(self.assignment.semester), (1, 0))
+
+    def test_chunk_size_must_be_positive(self):
+        for chunk_size in (0, -1):
+            with self.assertRaises(ValueError):
+                recompute_semester_points(self.assignment.semester, chunk_size=chunk_size)
+            with self.assertRaisesMessage(CommandError, '--chunk-size'):
+                call_command('recompute_attendance_points', chunk_size=chunk_size)
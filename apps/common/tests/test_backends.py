@@ -0,0 +1,50 @@
+import pickle
+
+from django.contrib.auth import get_user
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.common.backends import CachedModelBackend, user_cache_key
+from apps.common.models import User
+
+from .fixtures import PASSWORD, create_user, isolated, reset_caches
+
+
+@isolated
+class CachedModelBackendTest(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.user = create_user('dean', 'dean')
+        self.backend = CachedModelBackend()
+
+    def test_password_hash_is_not_cached(self):
+        self.backend.get_user(self.user.pk)
+        cached = pickle.dumps(cache.get(user_cache_key(self.user.pk)))
+        self.assertNotIn(self.user.password.encode(), cached)
+        self.assertNotIn(self.user.password.split('$')[-1].encode(), cached)
+
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+        self.assertEqual((user.pk, user.username, user.role), (self.user.pk, 'dean', 'dean'))
+        with self.assertNumQueries(0):
+            self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+
+    def test_save_keeps_password(self):
+        self.backend.get_user(self.user.pk)
+        user = self.backend.get_user(self.user.pk)
+        user.full_name = 'Декан'
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password(PASSWORD))
+        # Пароль догружается из базы при обращении
+        self.assertTrue(user.check_password(PASSWORD))
+
+    def test_session_survives_cache_and_password_change_logs_out(self):
+        self.client.login(username='dean', password=PASSWORD)
+        url = reverse('dean:groups')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.user.set_password('new-pass')
+        self.user.save()
+        self.assertFalse(get_user(self.client).is_authenticated)
@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections
+from django.test import TransactionTestCase
+
+from apps.common.attendance import points_per_day
+from apps.common.dashboard import compute_dashboard_summary
+from apps.common.journal import upsert_journal_entries
+from apps.common.models import DailyAttendance, JournalEntry, SemesterGPA
+
+from .fixtures import SEMESTER_START, create_school, isolated, reset_caches
+
+
+@isolated
+class ConcurrentJournalSavesTest(TransactionTestCase):
+    """
+    Конец урока: преподаватели одновременно сохраняют журнал, панели декана
+    в это же время читаются. Запись — через upsert_journal_entries в
+    отдельных потоках (у каждого свое соединение с тестовой БД).
+    """
+    WRITERS = 100
+    READERS = 2
+    # Три дня одной недели; у каждого потока своя пара (назначение, день)
+    DAYS = (SEMESTER_START, SEMESTER_START + timedelta(days=2), SEMESTER_START + timedelta(days=4))
+
+    def setUp(self):
+        reset_caches()
+        self.school = create_school(groups=self.WRITERS // len(self.DAYS) + 1, students_per_group=10)
+
+    def _entries(self, assignment, date):
+        students = [s for s in self.school['students'] if s.group_id == assignment.group_id]
+        return [
+            JournalEntry(student_id=s.pk, teacher_assignment_id=assignment.pk, date=date,
+                         grade=n % 4, attendance=n % 5 != 0)
+            for n, s in enumerate(students)
+        ]
+
+    def test_parallel_upserts_without_lock_errors(self):
+        assignments = self.school['assignments']
+        jobs = [
+            (assignments[i % len(assignments)], self.DAYS[i // len(assignments)])
+            for i in range(self.WRITERS)
+        ]
+        barrier = threading.Barrier(self.WRITERS + self.READERS)
+        done = threading.Event()
+        errors = []
+
+        def read():
+            try:
+                barrier.wait()
+                while not done.is_set():
+                    compute_dashboard_summary()
+            except OperationalError as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        def save(assignment, date):
+            try:
+                barrier.wait()
+                return upsert_journal_entries(self._entries(assignment, date))
+            except OperationalError as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.WRITERS + self.READERS) as pool:
+            readers = [pool.submit(read) for _ in range(self.READERS)]
+            written = list(pool.map(lambda job: save(*job), jobs))
+            done.set()
+            for future in readers:
+                future.result()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(written, [10] * self.WRITERS)
+
+        expected = {(a.pk, d) for a, d in jobs}
+        self.assertEqual(len(expected), self.WRITERS)
+        self.assertEqual(JournalEntry.objects.count(), 10 * self.WRITERS)
+        self.assertEqual(
+            set(JournalEntry.objects.values_list('teacher_assignment_id', 'date').distinct()),
+            expected,
+        )
+
+        # Баллы недели посчитаны по итоговому набору записей, а не по частичному
+        for entry in JournalEntry.objects.all():
+            days = JournalEntry.objects.filter(
+                student_id=entry.student_id, teacher_assignment_id=entry.teacher_assignment_id, attendance=True,
+            ).count()
+            points = points_per_day(days) if entry.attendance else Decimal('0.00')
+            self.assertEqual(entry.attendance_points, points)
+
+        # Сводки, обновляемые сигналом, совпадают с журналом
+        for assignment, date in expected:
+            daily = DailyAttendance.objects.get(teacher_assignment_id=assignment, date=date)
+            self.assertEqual(daily.total_count, 10)
+            self.assertEqual(daily.present_count, 8)
+        self.assertEqual(SemesterGPA.objects.count(), len(self.school['students']))
+
+
+class ProductionModeJournalSavesTest(ConcurrentJournalSavesTest):
+    """
+    Тот же сценарий с OPTIONS режима CRM_DB_MODE=production: WAL,
+    busy_timeout и BEGIN IMMEDIATE. Потоки открывают соединения по тому же
+    settings_dict, поэтому подмена OPTIONS действует и на них.
+    """
+
+    def setUp(self):
+        settings_dict = connection.settings_dict
+        self.addCleanup(self._restore_options, settings_dict, settings_dict['OPTIONS'])
+        connection.close()
+        settings_dict['OPTIONS'] = settings.PRODUCTION_DB_OPTIONS
+        super().setUp()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def _restore_options(self, settings_dict, options):
+        connection.close()
+        settings_dict['OPTIONS'] = options
+        # Режим WAL записан в файл БД — остальные тесты работают без него
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=DELETE')
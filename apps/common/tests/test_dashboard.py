@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.common.dashboard import compute_dashboard_summary, get_dashboard_summary
+from apps.common.journal import upsert_journal_entries
+from apps.common.models import JournalEntry
+
+from .fixtures import SEMESTER_START, create_school, isolated, reset_caches
+
+
+# 02:30 по Душанбе (UTC+5) во вторник — в UTC еще понедельник
+LOCAL_NIGHT = datetime(SEMESTER_START.year, SEMESTER_START.month, SEMESTER_START.day, 21, 30,
+                       tzinfo=dt_timezone.utc)
+LOCAL_TODAY = SEMESTER_START + timedelta(days=1)
+
+
+@isolated
+class DashboardTodayTest(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.school = create_school(groups=1, students_per_group=2)
+
+    def test_today_is_local_date(self):
+        assignment = self.school['assignments'][0]
+        with mock.patch('django.utils.timezone.now', return_value=LOCAL_NIGHT):
+            with self.captureOnCommitCallbacks(execute=True):
+                upsert_journal_entries([
+                    JournalEntry(student_id=s.pk, teacher_assignment_id=assignment.pk, date=LOCAL_TODAY,
+                                 attendance=n == 0)
+                    for n, s in enumerate(self.school['students'])
+                ])
+            summary = compute_dashboard_summary()
+            cached = get_dashboard_summary()
+        self.assertEqual(summary['date'], LOCAL_TODAY)
+        self.assertEqual((summary['today_present'], summary['today_total']), (1, 2))
+        self.assertEqual(cached['date'], LOCAL_TODAY)
+
+    def test_write_for_local_today_invalidates_summary(self):
+        assignment = self.school['assignments'][0]
+        student = self.school['students'][0]
+        with mock.patch('django.utils.timezone.now', return_value=LOCAL_NIGHT):
+            self.assertEqual(get_dashboard_summary()['today_total'], 0)
+            with self.captureOnCommitCallbacks(execute=True):
+                upsert_journal_entries([JournalEntry(student_id=student.pk, teacher_assignment_id=assignment.pk,
+                                                     date=LOCAL_TODAY, attendance=True)])
+            self.assertEqual(get_dashboard_summary()['today_present'], 1)
@@ -0,0 +1,85 @@
+import json
+
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from apps.common.datatables import MAX_LENGTH, TABLES, datatable_response, table_data
+
+from .fixtures import create_school, isolated, reset_caches
+
+
+def columns(*names, search=None):
+    params = {}
+    for i, name in enumerate(names):
+        params[f'columns[{i}][data]'] = name
+        if search and name in search:
+            params[f'columns[{i}][search][value]'] = search[name]
+    return params
+
+
+@isolated
+class TableDataTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = create_school(groups=2, students_per_group=4)
+        cls.first, cls.second = cls.school['groups']
+        inactive = cls.school['students'][0]
+        inactive.is_active = False
+        inactive.save()
+        debtor = cls.school['students'][-1]
+        debtor.contract_status = 'debt'
+        debtor.save()
+
+    def setUp(self):
+        reset_caches()
+
+    def test_page_and_ordering(self):
+        data = table_data(TABLES['students'], {
+            'start': '2', 'length': '3', **columns('student_id', 'group', 'gpa'),
+            'order[0][column]': '1', 'order[0][dir]': 'desc', 'order[1][column]': '0',
+        })
+        self.assertEqual(data['recordsTotal'], 7)
+        self.assertEqual(data['recordsFiltered'], 7)
+        self.assertEqual([row['student_id'] for row in data['data']], ['S02002', 'S02003', 'S01001'])
+        self.assertEqual(data['data'][0]['group'], self.second.name)
+        self.assertEqual(data['data'][0]['full_name'], 'Насаб1-002 Ном2')
+
+    def test_length_is_capped(self):
+        for length in ('-1', str(MAX_LENGTH + 1)):
+            data = table_data(TABLES['all_students'], {'length': length})
+            self.assertEqual(len(data['data']), 8)
+        self.assertEqual(len(table_data(TABLES['all_students'], {'length': '2', 'start': '-5'})['data']), 2)
+
+    def test_filters(self):
+        data = table_data(TABLES['students'], columns('student_id', 'contract_status', search={'contract_status': 'debt'}))
+        self.assertEqual(data['recordsFiltered'], 1)
+        self.assertEqual(data['data'][0]['contract_status'], 'debt')
+
+        # Колонки без поиска (gpa) фильтр не применяют
+        data = table_data(TABLES['students'], columns('gpa', search={'gpa': '9'}))
+        self.assertEqual(data['recordsFiltered'], 7)
+
+        data = table_data(TABLES['teachers'], {'search[value]': 'teach'})
+        self.assertEqual((data['recordsTotal'], data['recordsFiltered']), (1, 1))
+        self.assertEqual(data['data'][0]['username'], 'teacher')
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            table_data(TABLES['students'], columns('password'))
+        with self.assertRaises(IndexError):
+            table_data(TABLES['students'], {**columns('student_id'), 'order[0][column]': '3'})
+
+    def test_response(self):
+        request = RequestFactory().get('/tables/students/', {'draw': '7', **columns('student_id')})
+        data = json.loads(datatable_response(request, 'students', {'students'}).content)
+        self.assertEqual((data['draw'], data['recordsTotal'], len(data['data'])), (7, 7, 7))
+        self.assertEqual(data['data'][0]['gpa'], '0.00')
+
+        # Ошибка в параметрах — поле error по протоколу DataTables, а не 500
+        request = RequestFactory().get('/tables/students/', {'draw': '7', **columns('password')})
+        response = datatable_response(request, 'students', {'students'})
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response.content, {'draw': 7, 'error': 'Unknown column: password'})
+
+        with self.assertRaises(Http404):
+            datatable_response(request, 'teachers', {'students'})
@@ -0,0 +1,53 @@
+import io
+import os
+
+import openpyxl
+from django.conf import settings
+from django.test import TestCase
+
+from apps.common.exports import ROSTER_HEADER, csv_response, xlsx_response
+from apps.common.models import Student
+from apps.common.tasks import export_students
+
+from .fixtures import create_school, isolated, reset_caches
+
+
+ROW = ['=HYPERLINK("http://x","y")', '+992 900 00 00', '-1', '@SUM(A1)', 'Ном', -1, 2.5, None]
+
+
+def _sheet_cells(source):
+    ws = openpyxl.load_workbook(source).active
+    return [[(cell.value, cell.data_type) for cell in row] for row in ws.iter_rows()]
+
+
+class ExportInjectionTest(TestCase):
+    """Строки, похожие на формулы, выгружаются текстом, а не формулой"""
+
+    def test_csv(self):
+        response = csv_response('test', ['a'] * len(ROW), [ROW])
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(
+            content.splitlines()[1],
+            '"\'=HYPERLINK(""http://x"",""y"")",\'+992 900 00 00,\'-1,\'@SUM(A1),Ном,-1,2.5,',
+        )
+
+    def test_xlsx(self):
+        response = xlsx_response('test', ['a'] * len(ROW), [ROW])
+        cells = _sheet_cells(io.BytesIO(b''.join(response.streaming_content)))[1]
+        self.assertEqual(cells[:5], [(value, 's') for value in ROW[:5]])
+        self.assertEqual(cells[5:7], [(-1, 'n'), (2.5, 'n')])
+
+
+@isolated
+class ExportStudentsTaskTest(TestCase):
+    def test_roster_cells_are_text(self):
+        reset_caches()
+        create_school(groups=1, students_per_group=1)
+        Student.objects.update(first_name='=1+1', phone='+992900000000')
+
+        result = export_students({}, lambda *args: None)
+        cells = _sheet_cells(os.path.join(settings.JOB_FILES_DIR, result['file']))
+        self.assertEqual([value for value, _ in cells[0]], ROSTER_HEADER)
+        row = dict(zip(ROSTER_HEADER, cells[1]))
+        self.assertEqual(row['first_name'], ('=1+1', 's'))
+        self.assertEqual(row['phone'], ('+992900000000', 's'))
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.common.gpa import calculate_gpa, recompute_semester_gpa
+from apps.common.journal import upsert_journal_entries
+from apps.common.models import JournalEntry, Semester, SemesterGPA, Student, TeacherAssignment
+
+from .fixtures import SEMESTER_END, create_school, isolated, reset_caches
+
+
+class CalculateGpaTest(SimpleTestCase):
+    def test_rounding(self):
+        self.assertEqual(calculate_gpa(0, 0), Decimal('0.00'))
+        self.assertEqual(calculate_gpa(5, 3), Decimal('1.67'))
+        self.assertEqual(calculate_gpa(9, 3), Decimal('3.00'))
+
+
+@isolated
+class SemesterGpaTest(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.school = create_school(groups=1, students_per_group=2)
+        self.assignment = self.school['assignments'][0]
+        self.student, self.other = self.school['students']
+
+    def _grades(self, assignment, grades, student=None):
+        upsert_journal_entries([
+            JournalEntry(student_id=(student or self.student).pk, teacher_assignment_id=assignment.pk,
+                         date=assignment.semester.start_date + timedelta(days=day), grade=grade, attendance=True)
+            for day, grade in grades
+        ])
+
+    def _gpa(self, student=None):
+        return Student.objects.get(pk=(student or self.student).pk).gpa
+
+    def test_journal_writes_update_gpa(self):
+        self._grades(self.assignment, [(0, 3), (2, 2), (4, None)])
+        semester_gpa = SemesterGPA.objects.get(student=self.student, semester=self.assignment.semester)
+        self.assertEqual((semester_gpa.grade_sum, semester_gpa.grade_count, semester_gpa.gpa), (5, 2, Decimal('2.50')))
+        self.assertEqual(self._gpa(), Decimal('2.50'))
+        self.assertEqual(self._gpa(self.other), Decimal('0.00'))
+
+        # Исправление оценки пересчитывает сумму, а не добавляет к ней
+        self._grades(self.assignment, [(2, 0)])
+        self.assertEqual(self._gpa(), Decimal('1.50'))
+
+    def test_gpa_over_semesters(self):
+        spring = Semester.objects.create(name='Баҳор', start_date=SEMESTER_END + timedelta(days=10),
+                                         end_date=SEMESTER_END + timedelta(days=130))
+        spring_assignment = TeacherAssignment.objects.create(
+            teacher=self.school['teacher'], group=self.assignment.group, subject=self.school['subject'],
+            semester=spring,
+        )
+        self._grades(self.assignment, [(0, 3), (2, 3)])
+        self._grades(spring_assignment, [(0, 0)])
+        self.assertEqual(SemesterGPA.objects.get(student=self.student, semester=spring).gpa, Decimal('0.00'))
+        # Общий GPA — по всем оценкам, а не среднее семестровых
+        self.assertEqual(self._gpa(), Decimal('2.00'))
+
+    def test_recompute_semester_gpa(self):
+        self._grades(self.assignment, [(0, 3), (2, 1)])
+        self._grades(self.assignment, [(0, 2)], student=self.other)
+        # Записи, удаленные в обход сигналов, и испорченный Student.gpa
+        JournalEntry.objects.filter(student=self.other).delete()
+        Student.objects.filter(pk=self.student.pk).update(gpa=Decimal('0.10'))
+
+        self.assertEqual(recompute_semester_gpa(self.assignment.semester), (2, 2))
+        self.assertEqual(self._gpa(), Decimal('2.00'))
+        self.assertEqual(self._gpa(self.other), Decimal('0.00'))
+        self.assertEqual(
+            SemesterGPA.objects.get(student=self.other, semester=self.assignment.semester).grade_count, 0,
+        )
+        self.assertEqual(recompute_semester_gpa(self.assignment.semester), (2, 0))
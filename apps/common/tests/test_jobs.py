@@ -0,0 +1,233 @@
+import os
+import socket
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.common import jobs
+from apps.common.jobs import JobError, claim_next, enqueue, requeue_stale, run_job, worker_name
+from apps.common.models import Job
+
+from .fixtures import create_user, isolated
+
+
+def ok(payload, progress):
+    progress(1, 2, 'нимааш')
+    return {'echo': payload.get('value')}
+
+
+def broken(payload, progress):
+    raise RuntimeError('boom')
+
+
+def bad_data(payload, progress):
+    raise JobError('Файл хонда нашуд')
+
+
+HANDLERS = {
+    'test_ok': (ok, None),
+    'test_broken': (broken, None),
+    'test_bad_data': (bad_data, None),
+    'test_single': (ok, 1),
+}
+
+
+@isolated
+class JobQueueTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(jobs._handlers, HANDLERS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = create_user('admin', 'admin')
+        self.worker = worker_name('test')
+
+    def _run_next(self, **kwargs):
+        job = claim_next(self.worker, **kwargs)
+        self.assertIsNotNone(job)
+        return job, run_job(job)
+
+    def _temp_file(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(lambda: os.path.exists(path) and os.unlink(path))
+        return path
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            enqueue('no_such_job')
+
+    def test_success(self):
+        path = self._temp_file()
+        queued = enqueue('test_ok', {'value': 42}, user=self.user, temp_files=[path])
+        self.assertEqual(queued.status, 'queued')
+
+        job, success = self._run_next()
+        self.assertEqual(job.pk, queued.pk)
+        self.assertTrue(success)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.progress, job.worker, job.attempts),
+                         ('done', {'echo': 42}, 100, '', 1))
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(os.path.exists(path))
+        self.assertIsNone(claim_next(self.worker))
+
+    def test_unique(self):
+        first = enqueue('test_ok', {'value': 1}, user=self.user, unique=True)
+        self.assertEqual(enqueue('test_ok', {'value': 1}, user=self.user, unique=True), first)
+        self.assertNotEqual(enqueue('test_ok', {'value': 2}, user=self.user, unique=True), first)
+        self.assertNotEqual(enqueue('test_ok', {'value': 1}, user=self.user), first)
+
+        Job.objects.filter(pk=first.pk).update(status='done')
+        self.assertNotEqual(enqueue('test_ok', {'value': 1}, user=self.user, unique=True).pk, first.pk)
+
+    def test_retry_then_fail(self):
+        path = self._temp_file()
+        queued = enqueue('test_broken', temp_files=[path], max_attempts=2)
+        with self.assertLogs('apps.common.jobs', 'WARNING'):
+            _, success = self._run_next()
+        self.assertFalse(success)
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.error, job.attempts), ('queued', 'boom', 1))
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=jobs.RETRY_BASE_DELAY - 5))
+        self.assertTrue(os.path.exists(path))
+        # Пауза перед повтором: задача еще не доступна воркерам
+        self.assertIsNone(claim_next(self.worker))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('apps.common.jobs', 'WARNING'):
+            self._run_next()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertFalse(os.path.exists(path))
+
+    def test_job_error_is_final(self):
+        queued = enqueue('test_bad_data')
+        with self.assertLogs('apps.common.jobs', 'WARNING'):
+            self._run_next()
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.error, job.attempts), ('failed', 'Файл хонда нашуд', 1))
+
+    def test_concurrency_limit(self):
+        running = enqueue('test_single')
+        claim_next('other:1:worker', pk=running.pk)
+        waiting = enqueue('test_single')
+        other = enqueue('test_ok')
+
+        job = claim_next(self.worker)
+        self.assertEqual(job.pk, other.pk)
+        self.assertIsNone(claim_next(self.worker))
+
+        with override_settings(JOB_CONCURRENCY={'test_single': 2}):
+            self.assertEqual(claim_next(self.worker).pk, waiting.pk)
+
+    def test_claim_skips_job_taken_by_another_worker(self):
+        first = enqueue('test_ok')
+        second = enqueue('test_ok')
+        update = QuerySet.update
+        raced = []
+
+        def racing_update(queryset, **kwargs):
+            # Другой воркер забирает первую задачу между выбором и захватом
+            if not raced:
+                raced.append(True)
+                update(Job.objects.filter(pk=first.pk), status='running', worker='other-host:1:worker')
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', racing_update):
+            job = claim_next(self.worker)
+        self.assertEqual((job.pk, job.worker, job.attempts), (second.pk, self.worker, 1))
+        first.refresh_from_db()
+        self.assertEqual((first.worker, first.attempts), ('other-host:1:worker', 0))
+
+    def test_taken_over_job_keeps_new_state(self):
+        queued = enqueue('test_ok')
+        job = claim_next(self.worker)
+
+        # Пока обработчик работал, requeue_stale отдал задачу другому воркеру
+        Job.objects.filter(pk=queued.pk).update(status='queued', worker='')
+        claim_next('other-host:1:worker')
+        with self.assertLogs('apps.common.jobs', 'WARNING') as logs:
+            self.assertFalse(run_job(job))
+        self.assertIn('taken over', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts), ('running', 'other-host:1:worker', 2))
+
+    def test_inline_mode(self):
+        with override_settings(JOBS_RUN_INLINE=True):
+            job = enqueue('test_ok', {'value': 'x'})
+        self.assertEqual((job.status, job.result), ('done', {'echo': 'x'}))
+        self.assertTrue(job.worker == '' and job.attempts == 1)
+
+
+@isolated
+class RequeueStaleTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(jobs._handlers, HANDLERS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.long_ago = timezone.now() - jobs.STALE_AFTER - timedelta(minutes=1)
+
+    def _running(self, worker, heartbeat_at=None, attempts=1, max_attempts=3):
+        return Job.objects.create(
+            kind='test_ok', status='running', worker=worker, attempts=attempts, max_attempts=max_attempts,
+            heartbeat_at=heartbeat_at or self.long_ago,
+        )
+
+    def test_requeue(self):
+        dead = self._running('other-host:1:worker')
+        exhausted = self._running('other-host:2:worker', attempts=3)
+        fresh = self._running('other-host:3:worker', heartbeat_at=timezone.now())
+        # Процесс этой машины жив (родитель тестового процесса) — задачу не трогаем
+        alive = self._running(f'{socket.gethostname()}:{os.getppid()}:worker')
+        local = self._running(worker_name('main'))
+
+        jobs._running.add(local.pk)
+        self.addCleanup(jobs._running.discard, local.pk)
+        self.assertEqual(requeue_stale(), 2)
+
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[dead.pk], 'queued')
+        self.assertEqual(statuses[exhausted.pk], 'failed')
+        for job in (fresh, alive, local):
+            self.assertEqual(statuses[job.pk], 'running')
+        self.assertEqual(Job.objects.get(pk=dead.pk).worker, '')
+
+    def test_dead_local_process(self):
+        job = self._running(f'{socket.gethostname()}:{2 ** 22 + 1}:worker')
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+
+
+@isolated
+class HeartbeatTest(TransactionTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(jobs._handlers, HANDLERS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_heartbeat_while_handler_runs(self):
+        """Обработчик без progress() не выглядит брошенным, пока работает"""
+        queued = enqueue('test_ok')
+        job = claim_next(worker_name('test'))
+        Job.objects.filter(pk=queued.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        job.refresh_from_db()
+        started = job.heartbeat_at
+
+        seen = []
+
+        def handler(payload, progress):
+            time.sleep(0.3)
+            seen.append(Job.objects.get(pk=queued.pk).heartbeat_at)
+            return {}
+
+        with mock.patch.object(jobs, 'HEARTBEAT_INTERVAL', 0.05), \
+                mock.patch.dict(jobs._handlers, {'test_ok': (handler, None)}):
+            self.assertTrue(run_job(job))
+        self.assertGreater(seen[0], started + timedelta(minutes=59))
+        self.assertEqual(Job.objects.get(pk=queued.pk).status, 'done')
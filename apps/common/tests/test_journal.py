@@ -0,0 +1,173 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.common.journal import validate_journal_cells
+from apps.common.models import JournalEntry
+from apps.common.testing import query_budget
+from apps.teacher.views import JOURNAL_MAX_WINDOW_DAYS
+
+from .fixtures import SEMESTER_START, create_school, isolated, reset_caches
+
+
+class JournalCellsMixin:
+    def setUp(self):
+        reset_caches()
+        self.school = school = create_school(groups=2, students_per_group=3)
+        self.assignment = school['assignments'][0]
+        self.students = [s for s in school['students'] if s.group_id == self.assignment.group_id]
+        self.stranger = next(s for s in school['students'] if s.group_id != self.assignment.group_id)
+        # Ближайший будущий день без урока (пн, ср, пт) — ячейка открыта
+        self.open_date = timezone.localdate() + timedelta(days=1)
+        while self.open_date.weekday() in (0, 2, 4):
+            self.open_date += timedelta(days=1)
+
+    def _cell(self, student=None, day=None, **fields):
+        cell = {
+            'student_id': (student or self.students[0]).pk,
+            'date': (day or self.open_date).isoformat(),
+            'grade': 2,
+            'attendance': True,
+        }
+        cell.update(fields)
+        return cell
+
+    def _errors(self, results):
+        return {r['index']: r['message'] for r in results if r['status'] == 'error'}
+
+
+@isolated
+class ValidateJournalCellsTest(JournalCellsMixin, TestCase):
+    def test_valid_cells(self):
+        entries, results = validate_journal_cells(self.assignment, [
+            self._cell(self.students[0]),
+            self._cell(self.students[1], grade='', attendance='false'),
+            self._cell(self.students[2], grade='0', attendance='True'),
+        ])
+        self.assertEqual([r['status'] for r in results], ['ok', 'ok', 'ok'])
+        self.assertEqual(
+            [(e.student_id, e.teacher_assignment_id, e.date, e.grade, e.attendance) for e in entries],
+            [
+                (self.students[0].pk, self.assignment.pk, self.open_date, 2, True),
+                (self.students[1].pk, self.assignment.pk, self.open_date, None, False),
+                (self.students[2].pk, self.assignment.pk, self.open_date, 0, True),
+            ],
+        )
+        self.assertTrue(all(e.pk is None for e in entries))
+
+    def test_invalid_cells(self):
+        entries, results = validate_journal_cells(self.assignment, [
+            'not a cell',
+            self._cell(self.stranger),
+            self._cell(student_id='abc'),
+            self._cell(date='2024-13-01'),
+            self._cell(grade=5),
+            self._cell(grade='x'),
+            self._cell(self.students[1]),
+        ])
+        self.assertEqual(self._errors(results), {
+            0: 'Маълумоти нодуруст',
+            1: 'Донишҷӯ дар ин гурӯҳ нест',
+            2: 'Донишҷӯ дар ин гурӯҳ нест',
+            3: 'Санаи нодуруст',
+            4: 'Баҳои нодуруст',
+            5: 'Баҳои нодуруст',
+        })
+        self.assertEqual([e.student_id for e in entries], [self.students[1].pk])
+
+    def test_locked_cells(self):
+        # Урок в понедельник давно закончился; во вторник урока нет — ячейка открыта
+        entries, results = validate_journal_cells(self.assignment, [
+            self._cell(day=SEMESTER_START),
+            self._cell(day=SEMESTER_START + timedelta(days=1)),
+        ])
+        self.assertEqual(self._errors(results), {0: 'Ячейка қулф шудааст (1 соат гузашт)!'})
+        self.assertEqual([e.date for e in entries], [SEMESTER_START + timedelta(days=1)])
+
+    def test_last_duplicate_wins(self):
+        entries, results = validate_journal_cells(self.assignment, [
+            self._cell(grade=1),
+            self._cell(grade=3),
+        ])
+        self.assertEqual([r['status'] for r in results], ['ok', 'ok'])
+        self.assertEqual([e.grade for e in entries], [3])
+
+    def test_inactive_students_rejected(self):
+        self.students[0].is_active = False
+        self.students[0].save()
+        entries, results = validate_journal_cells(self.assignment, [self._cell(self.students[0])])
+        self.assertEqual(entries, [])
+        self.assertEqual(self._errors(results), {0: 'Донишҷӯ дар ин гурӯҳ нест'})
+
+    def test_query_count_does_not_depend_on_cells(self):
+        cells = [self._cell(s, day=self.open_date + timedelta(days=7 * week))
+                 for s in self.students for week in range(4)]
+        # Студенты группы; индекс расписания (холодный) — один запрос
+        with self.assertNumQueries(2):
+            entries, _ = validate_journal_cells(self.assignment, cells)
+        self.assertEqual(len(entries), len(cells))
+
+
+@isolated
+class BatchUpdateViewTest(JournalCellsMixin, TestCase):
+    """teacher:batch_update поверх той же проверки ячеек"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.school['teacher'])
+
+    def _post(self, body):
+        url = reverse('teacher:batch_update', args=[self.assignment.pk])
+        return self.client.post(url, body, content_type='application/json')
+
+    def test_partial_save(self):
+        """Ошибка в одной ячейке не мешает сохранить остальные"""
+        cells = [self._cell(s, grade=n % 4) for n, s in enumerate(self.students)]
+        cells.append(self._cell(self.stranger))
+        # Запись, пересчет баллов и обработчики journal_entries_changed — без запросов на ячейку
+        with self.captureOnCommitCallbacks(execute=True), query_budget(23, max_similar=1):
+            response = self._post(json.dumps({'cells': cells}))
+        data = response.json()
+        self.assertEqual((data['status'], data['saved']), ('partial', len(self.students)))
+        self.assertEqual(data['results'][-1], {'index': len(self.students), 'status': 'error',
+                                               'message': 'Донишҷӯ дар ин гурӯҳ нест'})
+        self.assertEqual(JournalEntry.objects.filter(date=self.open_date).count(), len(self.students))
+
+    def test_bad_body(self):
+        for body in ('not json', json.dumps({'rows': []}), json.dumps({'cells': {}})):
+            with self.subTest(body=body):
+                self.assertEqual(self._post(body).status_code, 400)
+        self.assertFalse(JournalEntry.objects.exists())
+
+
+@isolated
+class JournalViewTest(JournalCellsMixin, TestCase):
+    """teacher:journal — диапазон дат ограничен семестром"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.school['teacher'])
+        self.url = reverse('teacher:journal', args=[self.assignment.pk])
+
+    def test_range_clamped_to_semester(self):
+        semester = self.assignment.semester
+        response = self.client.get(self.url, {'start': '0001-01-01', 'end': '9999-12-31'})
+        matrix = response.context['matrix']
+        self.assertEqual((matrix['start_date'], matrix['end_date']), (semester.start_date, semester.end_date))
+        self.assertFalse(response.context['has_older'])
+
+        response = self.client.get(self.url, {'end': '1990-01-01'})
+        matrix = response.context['matrix']
+        self.assertEqual((matrix['start_date'], matrix['end_date']), (semester.start_date, semester.start_date))
+
+    def test_window_is_capped(self):
+        semester = self.assignment.semester
+        semester.start_date -= timedelta(days=1000)
+        semester.save()
+        response = self.client.get(self.url, {'start': semester.start_date.isoformat()})
+        matrix = response.context['matrix']
+        self.assertEqual(matrix['start_date'], matrix['end_date'] - timedelta(days=JOURNAL_MAX_WINDOW_DAYS))
+        self.assertFalse(response.context['has_older'])
@@ -0,0 +1,40 @@
+from django.db import DEFAULT_DB_ALIAS, router
+from django.test import TransactionTestCase, override_settings
+
+from apps.common.dashboard import get_dashboard_summary
+from apps.common.live import get_live_snapshot
+from apps.common.models import Student
+from apps.common.profiles import get_student_profile
+from apps.common.routers import REPLICA_DB_ALIAS, primary_reads, reset_replica_reads, set_replica_reads
+from apps.common.timetable import get_timetable
+
+from .fixtures import create_school, isolated, reset_caches
+
+
+@isolated
+@override_settings(DATABASE_ROUTERS=['apps.common.routers.ReplicaRouter'])
+class SharedCacheReadsTest(TransactionTestCase):
+    """
+    Запрос читает из реплики, но значения общего кэша считаются по default.
+    Базы replica в тестах нет: чтение из нее упало бы с ConnectionDoesNotExist.
+    TransactionTestCase — внутри транзакции роутер и так выбирает default.
+    """
+
+    def setUp(self):
+        reset_caches()
+        self.school = create_school(groups=1, students_per_group=2)
+        token = set_replica_reads(True)
+        self.addCleanup(reset_replica_reads, token)
+
+    def test_primary_reads_block(self):
+        self.assertEqual(router.db_for_read(Student), REPLICA_DB_ALIAS)
+        with primary_reads():
+            self.assertEqual(router.db_for_read(Student), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_read(Student), REPLICA_DB_ALIAS)
+
+    def test_shared_caches_read_default(self):
+        student = self.school['students'][0]
+        self.assertEqual(get_dashboard_summary()['total_students'], 2)
+        self.assertIn('etag', get_live_snapshot())
+        self.assertEqual(get_student_profile(student.pk)['recent'], [])
+        self.assertTrue(get_timetable().has_assignment(self.school['assignments'][0].pk))
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.common.journal import upsert_journal_entries
+from apps.common.models import Comment, JournalEntry
+from apps.common.testing import assert_view_budget
+
+from .fixtures import SEMESTER_START, create_school, create_user, isolated, reset_caches
+
+
+DATATABLE_PARAMS = {
+    'draw': '3', 'start': '0', 'length': '10',
+    'columns[0][data]': 'student_id', 'columns[1][data]': 'full_name', 'columns[2][data]': 'group',
+    'order[0][column]': '1', 'order[0][dir]': 'asc',
+}
+
+
+@isolated
+class ViewQueryBudgetTest(TestCase):
+    """
+    Бюджеты запросов страниц, оптимизированных против N+1: число запросов
+    не зависит от количества студентов, групп и записей журнала. Кэш
+    очищается перед каждым тестом — меряется холодный запрос.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = create_school(groups=3, students_per_group=12)
+        cls.users = {role: create_user(role, role) for role in ('dean', 'admin', 'zamdekan')}
+        cls.users['teacher'] = cls.school['teacher']
+        cls.student = cls.school['students'][0]
+        cls.assignment = cls.school['assignments'][0]
+        entries = [
+            JournalEntry(student_id=s.pk, teacher_assignment_id=a.pk, date=SEMESTER_START + timedelta(days=day),
+                         grade=(s.pk + day) % 4, attendance=day != 4)
+            for a in cls.school['assignments']
+            for s in cls.school['students'] if s.group_id == a.group_id
+            for day in (0, 2, 4, 7)
+        ]
+        upsert_journal_entries(entries)
+        for author in (cls.users['zamdekan'], cls.users['teacher']):
+            Comment.objects.create(student=cls.student, author=author, text='Фаъол', comment_type='positive')
+
+    def setUp(self):
+        reset_caches()
+
+    def _check(self, role, budgets):
+        self.client.force_login(self.users[role])
+        for url, limit in budgets:
+            with self.subTest(url=url):
+                response = assert_view_budget(self.client, url, limit, max_similar=1)
+                self.assertEqual(response.status_code, 200)
+
+    def test_dean_pages(self):
+        self._check('dean', [
+            (reverse('dean:dashboard'), 8),
+            (reverse('dean:students'), 3),
+            (reverse('dean:student_detail', args=[self.student.pk]), 6),
+            (reverse('dean:groups'), 2),
+            (reverse('dean:teachers'), 2),
+            (reverse('dean:journals'), 2),
+            (reverse('dean:reports'), 2),
+        ])
+
+    def test_zamdekan_pages(self):
+        self._check('zamdekan', [
+            (reverse('zamdekan:index'), 8),
+            (reverse('zamdekan:students'), 2),
+            (reverse('zamdekan:student_detail', args=[self.student.pk]), 6),
+            (reverse('zamdekan:journals'), 2),
+        ])
+
+    def test_admin_pages(self):
+        self._check('admin', [
+            (reverse('admin_panel:dashboard'), 8),
+            (reverse('admin_panel:users'), 1),
+            (reverse('admin_panel:groups'), 1),
+            (reverse('admin_panel:students'), 0),
+            (reverse('admin_panel:subjects'), 1),
+            (reverse('admin_panel:jobs'), 1),
+        ])
+
+    def test_teacher_pages(self):
+        self._check('teacher', [
+            (reverse('teacher:dashboard'), 3),
+            (reverse('teacher:schedule'), 1),
+            (reverse('teacher:groups'), 1),
+            (f"{reverse('teacher:journal', args=[self.assignment.pk])}?start={SEMESTER_START}"
+             f"&end={SEMESTER_START + timedelta(days=13)}", 3),
+        ])
+
+    def test_datatables(self):
+        for role, url in (('dean', reverse('dean:datatable', args=['students'])),
+                          ('zamdekan', reverse('zamdekan:datatable', args=['students'])),
+                          ('admin', reverse('admin_panel:datatable', args=['all_students']))):
+            self.client.force_login(self.users[role])
+            with self.subTest(url=url):
+                # Пользователь (кэш пуст), COUNT и строки одним запросом с select_related
+                response = assert_view_budget(self.client, url, 3, max_similar=1, data=DATATABLE_PARAMS)
+                data = response.json()
+                self.assertEqual(data['draw'], 3)
+                self.assertEqual(data['recordsTotal'], 36)
+                self.assertEqual(len(data['data']), 10)
+                self.assertEqual(data['data'][0]['group'], self.school['groups'][0].name)
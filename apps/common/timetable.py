@@ -0,0 +1,178 @@
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .cache import bump_version, get_version
+from .models import Schedule
+from .routers import primary_reads
+
+
+TIMETABLE_VERSION = 'timetable'
+# Ячейка журнала закрывается через час после окончания урока
+LOCK_DELAY = timedelta(hours=1)
+# Как часто сверять версию индекса с общим кэшем (секунды)
+VERSION_CHECK_INTERVAL = 5
+
+
+@dataclass(frozen=True)
+class Lesson:
+    id: int
+    assignment_id: int
+    teacher_id: int
+    group_id: int
+    subject_id: int
+    room: str
+    weekday: int
+    start_time: time
+    end_time: time
+
+
+class _DayIndex:
+    """Уроки одного дня, отсортированные по началу (для bisect)"""
+
+    def __init__(self, lessons):
+        self.lessons = sorted(lessons, key=lambda lesson: (lesson.start_time, lesson.id))
+        self.starts = [lesson.start_time for lesson in self.lessons]
+
+    def running(self, at):
+        """Уроки, идущие в момент at: начались не позже at и еще не закончились"""
+        return [lesson for lesson in self.lessons[:bisect_right(self.starts, at)] if lesson.end_time >= at]
+
+    def after(self, at):
+        """Первый урок, начинающийся позже at"""
+        i = bisect_right(self.starts, at)
+        return self.lessons[i] if i < len(self.lessons) else None
+
+
+class TimetableIndex:
+    """
+    Расписание активных семестров в памяти процесса.
+
+    Для каждого дня недели уроки разложены по назначению, группе,
+    преподавателю и аудитории; ответы не обращаются к БД.
+    """
+
+    def __init__(self, lessons):
+        self.lessons = list(lessons)
+        days = defaultdict(list)
+        by_key = defaultdict(lambda: defaultdict(list))
+        for lesson in self.lessons:
+            days[lesson.weekday].append(lesson)
+            by_key[('assignment', lesson.assignment_id)][lesson.weekday].append(lesson)
+            by_key[('teacher', lesson.teacher_id)][lesson.weekday].append(lesson)
+            by_key[('group', lesson.group_id)][lesson.weekday].append(lesson)
+            if lesson.room:
+                by_key[('room', lesson.room)][lesson.weekday].append(lesson)
+        self.days = {weekday: _DayIndex(lessons) for weekday, lessons in days.items()}
+        self.by_key = {
+            key: {weekday: _DayIndex(lessons) for weekday, lessons in days.items()}
+            for key, days in by_key.items()
+        }
+
+    @classmethod
+    def load(cls, **filters):
+        schedules = Schedule.objects.filter(**filters).values_list(
+            'id', 'teacher_assignment_id', 'teacher_assignment__teacher_id',
+            'teacher_assignment__group_id', 'teacher_assignment__subject_id',
+            'room', 'weekday', 'start_time', 'end_time',
+        )
+        return cls(Lesson(*row) for row in schedules)
+
+    def _day(self, kind, key, weekday):
+        days = self.by_key.get((kind, key))
+        return days.get(weekday) if days else None
+
+    def has_assignment(self, assignment_id):
+        return ('assignment', assignment_id) in self.by_key
+
+    def weekdays(self, assignment_id):
+        """Дни недели, в которые у назначения есть уроки"""
+        return sorted(self.by_key.get(('assignment', assignment_id), {}))
+
+    def day_lessons(self, date):
+        """Все уроки расписания в дату date"""
+        day = self.days.get(date.weekday())
+        return list(day.lessons) if day else []
+
+    def lessons_on(self, kind, key, date):
+        """Уроки назначения/группы/преподавателя/аудитории в дату date"""
+        day = self._day(kind, key, date.weekday())
+        return list(day.lessons) if day else []
+
+    def is_locked(self, assignment_id, date, now=None):
+        """
+        Закрыта ли ячейка журнала за date: прошло больше LOCK_DELAY после
+        окончания последнего урока назначения в этот день.
+        Если урока в этот день нет, ячейка открыта.
+        """
+        day = self._day('assignment', assignment_id, date.weekday())
+        if not day:
+            return False
+        now = timezone.localtime(now)
+        lesson_end = max(lesson.end_time for lesson in day.lessons)
+        return now > timezone.make_aware(datetime.combine(date, lesson_end)) + LOCK_DELAY
+
+    def running_lessons(self, now=None, kind=None, key=None):
+        """Уроки, которые идут сейчас (все или только для группы/преподавателя/аудитории)"""
+        now = timezone.localtime(now)
+        day = self.days.get(now.weekday()) if kind is None else self._day(kind, key, now.weekday())
+        return day.running(now.time()) if day else []
+
+    def next_lesson(self, teacher_id, now=None):
+        """(дата, урок) ближайшего урока преподавателя в течение недели или None"""
+        now = timezone.localtime(now)
+        for offset in range(8):
+            date = now.date() + timedelta(days=offset)
+            day = self._day('teacher', teacher_id, date.weekday())
+            if not day:
+                continue
+            lesson = day.after(now.time()) if offset == 0 else day.lessons[0]
+            if lesson:
+                return date, lesson
+        return None
+
+
+_lock = threading.Lock()
+_state = {'index': None, 'version': None, 'checked': 0.0}
+
+
+def get_timetable():
+    """
+    Индекс расписания текущего процесса.
+
+    Перестраивается, когда меняется версия 'timetable' в общем кэше
+    (изменение Schedule, назначений или семестров в любом процессе);
+    версия проверяется не чаще раза в VERSION_CHECK_INTERVAL секунд.
+    Индекс строится по default, как и значения общего кэша.
+    """
+    now = timezone.now().timestamp()
+    index = _state['index']
+    if index is not None and now - _state['checked'] < VERSION_CHECK_INTERVAL:
+        return index
+
+    version = get_version(TIMETABLE_VERSION)
+    with _lock:
+        if _state['index'] is None or _state['version'] != version:
+            with primary_reads():
+                _state['index'] = TimetableIndex.load(teacher_assignment__semester__is_active=True)
+            _state['version'] = version
+        _state['checked'] = now
+        return _state['index']
+
+
+def get_assignment_timetable(assignment_id):
+    """Общий индекс или, для назначения неактивного семестра, индекс только его уроков"""
+    index = get_timetable()
+    if index.has_assignment(assignment_id):
+        return index
+    return TimetableIndex.load(teacher_assignment_id=assignment_id)
+
+
+def invalidate_timetable():
+    bump_version(TIMETABLE_VERSION)
+    # Этот процесс перестроит индекс при следующем обращении
+    _state['checked'] = 0.0
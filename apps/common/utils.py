@@ -1,102 +1,140 @@
+import time
 import openpyxl
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from django.db import IntegrityError
 from django.utils import timezone
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from io import BytesIO
 
-from django.template.loader import render_to_string
 from .models import JournalEntry, Student, CurrentLesson
+from .journal import upsert_journal_entries
+from .attendance import calculate_weekly_attendance_points  # noqa: F401
 
 
-def import_journal_from_excel(file_path, teacher_assignment):
-    """Импорт журнала из Excel"""
-    wb = openpyxl.load_workbook(file_path)
-    ws = wb.active
-    
-    results = {'success': 0, 'errors': []}
-    
-    for row in ws.iter_rows(min_row=2, values_only=True):
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+
+TRUE_VALUES = {'1', 'true', 'yes', '+', '✓', 'ҳа', 'да'}
+
+
+def _parse_journal_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
         try:
-            student_id, date_str, grade, attendance = row[:4]
-            
-            # Найти студента
-            student = Student.objects.get(student_id=student_id)
-            
-            # Преобразовать дату
-            if isinstance(date_str, str):
-                date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            else:
-                date = date_str
-            
-            # Создать или обновить запись
-            entry, created = JournalEntry.objects.update_or_create(
-                student=student,
-                teacher_assignment=teacher_assignment,
-                date=date,
-                defaults={
-                    'grade': int(grade) if grade else None,
-                    'attendance': bool(attendance),
-                }
-            )
-            results['success'] += 1
-        except Exception as e:
-            results['errors'].append(f"Row error: {str(e)}")
-    
-    return results
+            return datetime.strptime(value.strip(), '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    raise ValueError(f"санаи нодуруст: {value!r}")
 
 
-# -----------------------------
-#   НОВЫЙ PDF БЕЗ WEASYPRINT
-# -----------------------------
-def export_report_to_pdf(title, rows):
-    """Создание PDF отчета без WeasyPrint — 100% работает в Windows"""
-    buffer = BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
+def _parse_journal_grade(value):
+    if value is None or value == '':
+        return None
+    grade = int(value)
+    if grade not in (0, 1, 2, 3):
+        raise ValueError(f"баҳои нодуруст: {value!r}")
+    return grade
 
-    y = 800
-    pdf.setFont("Helvetica-Bold", 16)
-    pdf.drawString(50, y, title)
-    y -= 40
 
-    pdf.setFont("Helvetica", 12)
-    for row in rows:
-        pdf.drawString(50, y, str(row))
-        y -= 20
-        if y < 50:
-            pdf.showPage()
-            y = 800
+def _parse_journal_attendance(value):
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
 
-    pdf.save()
-    buffer.seek(0)
 
-    return HttpResponse(buffer, content_type="application/pdf")
+def import_journal_from_excel(file_path, teacher_assignment, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Потоковый импорт журнала из Excel.
 
+    Колонки: student_id, дата (YYYY-MM-DD), баҳо, ҳозиршавӣ; первая строка — заголовок.
+    Лист читается в режиме read-only, записи сохраняются пачками по chunk_size.
+    progress(rows, total) вызывается после каждой пачки (фоновые задачи).
 
-def calculate_weekly_attendance_points(student, teacher_assignment, week_start_date):
-    """Расчет баллов посещаемости за неделю"""
-    week_end = week_start_date + timedelta(days=7)
-    
-    entries = JournalEntry.objects.filter(
-        student=student,
-        teacher_assignment=teacher_assignment,
-        date__gte=week_start_date,
-        date__lt=week_end,
-        attendance=True
-    )
-    
-    days_attended = entries.count()
-    
-    if days_attended >= 3:
-        return 6.0
-    else:
-        return days_attended * 1.6
+    success — сколько записей (студент, дата) действительно записано;
+    повторы той же пары в файле считаются в duplicates.
+    """
+    started = time.monotonic()
+    results = {'success': 0, 'duplicates': 0, 'errors': [], 'error_count': 0, 'rows': 0}
+    seen = set()
+    written = set()
+
+    # student_id → pk, чтобы не искать студента на каждой строке
+    student_map = {str(sid): pk for sid, pk in Student.objects.values_list('student_id', 'id')}
+
+    def add_error(row_number, message):
+        results['error_count'] += 1
+        if len(results['errors']) < IMPORT_MAX_ERRORS:
+            results['errors'].append(f"Қатори {row_number}: {message}")
+
+    def flush(chunk):
+        try:
+            upsert_journal_entries(entry for _, entry in chunk.values())
+            written.update(chunk)
+        except IntegrityError:
+            # Пачка откатилась целиком: записать построчно, чтобы найти строки с ошибкой
+            for key, (row_number, entry) in chunk.items():
+                try:
+                    upsert_journal_entries([entry])
+                    written.add(key)
+                except IntegrityError as e:
+                    add_error(row_number, f"хатои базаи додаҳо: {e}")
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        total_rows = max((ws.max_row or 1) - 1, 0)
+        chunk = {}
+        for row_number, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+            student_id, date_value, grade, attendance = (tuple(row) + (None,) * 4)[:4]
+            if student_id is None and date_value is None:
+                continue
+            results['rows'] += 1
+
+            student_pk = student_map.get(str(student_id).strip())
+            if student_pk is None:
+                add_error(row_number, f"донишҷӯ ёфт нашуд: {student_id}")
+                continue
+            try:
+                entry_date = _parse_journal_date(date_value)
+                entry_grade = _parse_journal_grade(grade)
+            except (TypeError, ValueError) as e:
+                add_error(row_number, str(e))
+                continue
+
+            # Повтор (студент, дата) в файле — побеждает последняя строка
+            key = (student_pk, entry_date)
+            if key in seen:
+                results['duplicates'] += 1
+            seen.add(key)
+            chunk[key] = (row_number, JournalEntry(
+                student_id=student_pk,
+                teacher_assignment_id=teacher_assignment.id,
+                date=entry_date,
+                grade=entry_grade,
+                attendance=_parse_journal_attendance(attendance),
+            ))
+
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = {}
+                if progress:
+                    progress(results['rows'], total_rows)
+
+        if chunk:
+            flush(chunk)
+    finally:
+        wb.close()
+
+    results['success'] = len(written)
+    results['seconds'] = round(time.monotonic() - started, 2)
+    results['rows_per_second'] = round(results['rows'] / results['seconds']) if results['seconds'] else results['rows']
+    return results
 
 
 def get_live_attendance_data():
     """Данные Live Dashboard"""
-    now = timezone.now()
+    now = timezone.localtime()
     current_date = now.date()
     current_time = now.time()
     
@@ -119,6 +157,7 @@ def get_live_attendance_data():
     for lesson in current_lessons:
         ta = lesson.schedule.teacher_assignment
         data['current_lessons'].append({
+            'id': lesson.id,
             'group': ta.group.name,
             'subject': ta.subject.name,
             'teacher': ta.teacher.full_name,
@@ -7,13 +7,19 @@ urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('live/', views.live_dashboard, name='live_dashboard'),
     path('students/', views.students_list, name='students'),
+    path('students/export/', views.students_export, name='students_export'),
     path('students/<int:pk>/', views.student_detail, name='student_detail'),
     path('groups/', views.groups_list, name='groups'),
+    path('groups/<int:pk>/export/', views.group_export, name='group_export'),
     path('teachers/', views.teachers_list, name='teachers'),
     path('journals/', views.journals_list, name='journals'),
+    path('journals/<int:assignment_id>/export/', views.journal_export, name='journal_export'),
+    path('tables/<slug:name>/', views.datatable, name='datatable'),
     path('reports/', views.reports, name='reports'),
     path('reports/export-pdf/', views.export_pdf, name='export_pdf'),
+    path('jobs/<int:pk>/', views.job_status, name='job_status'),
     path('api/live-data/', views.live_data_api, name='live_data_api'),
+    path('api/live-stream/', views.live_stream, name='live_stream'),
     
     # Admin functions inside dean
     path('users/', views.users_management, name='users'),
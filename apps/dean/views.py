@@ -1,96 +1,115 @@
 from django.db.models import Q
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, Http404
 from django.contrib import messages
 from apps.common.models import *
 from apps.common.permissions import dean_required
-from apps.common.utils import get_live_attendance_data, get_top_students, get_debt_students, export_report_to_pdf
-from django.db.models import Count, Avg
+from apps.common.jobs import enqueue, latest_job, user_job
+from apps.common.reports import cached_report_file
+from apps.common.exports import JOURNAL_HEADER, ROSTER_HEADER, export_response, journal_rows, student_rows
+from apps.common.dashboard import get_dashboard_summary
+from apps.common.live import get_live_snapshot, live_data_etag, live_stream_response
+from apps.common.datatables import datatable_response
+from apps.common.pagination import keyset_page, ranked_page, render_page
+from apps.common.profiles import COMMENT_ORDERING, COMMENT_PAGE_SIZE, get_student_profile
+from apps.common.search import search_students
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.db.models import Count
+
+
+REPORT_KINDS = ('students', 'group', 'course', 'debtors')
+# Стабильные сортировки для постраничного вывода по курсору
+STUDENT_ORDERING = ['last_name', 'first_name', 'pk']
+JOURNAL_ORDERING = ['group__name', 'subject__name', 'pk']
+# Таблицы, доступные декану через DataTables (serverSide)
+DATATABLES = ('students', 'teachers', 'journals')
 
 
 @dean_required
 def dashboard(request):
     """Главная панель декана"""
-    total_students = Student.objects.filter(is_active=True).count()
-    total_groups = Group.objects.count()
-    total_teachers = User.objects.filter(role='teacher').count()
-    avg_gpa = Student.objects.filter(is_active=True).aggregate(Avg('gpa'))['gpa__avg'] or 0
-    
-    # Статистика посещаемости сегодня
-    today = timezone.now().date()
-    today_entries = JournalEntry.objects.filter(date=today)
-    today_present = today_entries.filter(attendance=True).count()
-    today_total = today_entries.count()
-    today_percentage = round((today_present / today_total * 100), 1) if today_total > 0 else 0
-    
-    context = {
-        'total_students': total_students,
-        'total_groups': total_groups,
-        'total_teachers': total_teachers,
-        'avg_gpa': round(avg_gpa, 2),
-        'today_percentage': today_percentage,
-        'top_students': get_top_students(10),
-        'debt_students': get_debt_students()[:10],
-    }
+    context = get_dashboard_summary()
     return render(request, 'dean/dashboard.html', context)
 
 
 @dean_required
 def live_dashboard(request):
     """Live Dashboard с автообновлением каждые 15 секунд"""
-    live_data = get_live_attendance_data()
-    return render(request, 'dean/live_dashboard.html', {'live_data': live_data})
+    live_data = get_live_snapshot()['data']
+    return render(request, 'dean/live_dashboard.html', {
+        'live_data': live_data,
+        'live_data_url': reverse('dean:live_data_api'),
+        'live_stream_url': reverse('dean:live_stream'),
+    })
 
 
 @dean_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=live_data_etag)
 def live_data_api(request):
-    """API для получения live данных (AJAX)"""
-    data = get_live_attendance_data()
-    return JsonResponse(data, safe=False)
+    """API для получения live данных (AJAX), 304 если данные не изменились"""
+    return JsonResponse(get_live_snapshot()['data'], safe=False)
 
 
 @dean_required
-def students_list(request):
-    """Список всех студентов с поиском и фильтрацией"""
+async def live_stream(request):
+    """Server-Sent Events: изменения live данных (только под ASGI)"""
+    return live_stream_response(request)
+
+
+def _filtered_students(request):
+    """Студенты с фильтрами списка (?search=, ?group=)"""
     students = Student.objects.filter(is_active=True).select_related('group', 'course')
     
-    # Поиск
-    search = request.GET.get('search', '')
-    if search:
-        students = students.filter(
-            Q(first_name__icontains=search) | 
-            Q(last_name__icontains=search) | 
-            Q(student_id__icontains=search)
-        )
+    # Поиск (индекс FTS5, сортировка по релевантности)
+    search = request.GET.get('search', '').strip()
+    students = search_students(students, search)
     
     # Фильтр по группе
     group_id = request.GET.get('group')
     if group_id:
         students = students.filter(group_id=group_id)
     
-    groups = Group.objects.all()
+    return students, search
+
+
+@dean_required
+def students_list(request):
+    """Список всех студентов с поиском и фильтрацией"""
+    students, search = _filtered_students(request)
+    if search:
+        page = ranked_page(students)
+    else:
+        page = keyset_page(request, students, STUDENT_ORDERING)
     
-    return render(request, 'dean/students.html', {
-        'students': students,
-        'groups': groups,
+    return render_page(request, 'dean/students.html', {
+        'page': page,
+        'groups': Group.objects.all(),
         'search': search
-    })
+    }, 'dean/partials/student_rows.html', 'dean/partials/students_table.html')
+
+
+@dean_required
+def students_export(request):
+    """Экспорт отфильтрованного списка студентов (?format=xlsx|csv)"""
+    students, _ = _filtered_students(request)
+    return export_response(request.GET.get('format'), 'students', ROSTER_HEADER, student_rows(students))
 
 
 @dean_required
 def student_detail(request, pk):
-    """Профиль студента"""
-    student = get_object_or_404(Student, pk=pk)
-    journal_entries = JournalEntry.objects.filter(student=student).select_related(
-        'teacher_assignment__subject', 'teacher_assignment__teacher'
-    ).order_by('-date')[:20]
-    comments = Comment.objects.filter(student=student).select_related('author').order_by('-created_at')
+    """Профиль студента: сводка по предметам из кэша, комментарии постранично"""
+    student = get_object_or_404(Student.objects.select_related('group'), pk=pk)
+    comments = Comment.objects.filter(student=student).select_related('author')
+    page = keyset_page(request, comments, COMMENT_ORDERING, size=COMMENT_PAGE_SIZE)
     
-    return render(request, 'dean/student_detail.html', {
+    return render_page(request, 'dean/student_detail.html', {
         'student': student,
-        'journal_entries': journal_entries,
-        'comments': comments
-    })
+        'profile': get_student_profile(student.pk),
+        'page': page,
+    }, 'dean/partials/comment_rows.html')
 
 
 @dean_required
@@ -99,14 +118,24 @@ def groups_list(request):
     groups = Group.objects.all().select_related('course').annotate(
         student_count=Count('students')
     )
-    return render(request, 'dean/groups.html', {'groups': groups})
+    page = keyset_page(request, groups, ['name', 'pk'])
+    return render_page(request, 'dean/groups.html', {'page': page}, 'dean/partials/group_rows.html')
+
+
+@dean_required
+def group_export(request, pk):
+    """Экспорт списка группы (?format=xlsx|csv)"""
+    group = get_object_or_404(Group, pk=pk)
+    students = Student.objects.filter(group=group, is_active=True)
+    return export_response(request.GET.get('format'), f'group-{group.name}', ROSTER_HEADER, student_rows(students))
 
 
 @dean_required
 def teachers_list(request):
     """Список учителей"""
     teachers = User.objects.filter(role='teacher')
-    return render(request, 'dean/teachers.html', {'teachers': teachers})
+    page = keyset_page(request, teachers, ['full_name', 'pk'])
+    return render_page(request, 'dean/teachers.html', {'page': page}, 'dean/partials/teacher_rows.html')
 
 
 @dean_required
@@ -115,33 +144,83 @@ def journals_list(request):
     assignments = TeacherAssignment.objects.all().select_related(
         'teacher', 'group', 'subject', 'semester'
     )
-    return render(request, 'dean/journals.html', {'assignments': assignments})
+    page = keyset_page(request, assignments, JOURNAL_ORDERING)
+    return render_page(request, 'dean/journals.html', {'page': page}, 'dean/partials/journal_rows.html')
+
+
+@dean_required
+def datatable(request, name):
+    """Данные таблицы для DataTables: страница, сортировка, фильтры"""
+    return datatable_response(request, name, DATATABLES)
+
+
+@dean_required
+def journal_export(request, assignment_id):
+    """Экспорт журнала назначения в формате импорта (?format=xlsx|csv)"""
+    assignment = get_object_or_404(TeacherAssignment.objects.select_related('group', 'subject'), id=assignment_id)
+    filename = f'journal-{assignment.group.name}-{assignment.subject.code}'
+    return export_response(request.GET.get('format'), filename, JOURNAL_HEADER, journal_rows(assignment))
 
 
 @dean_required
 def reports(request):
     """Отчеты"""
-    return render(request, 'dean/reports.html')
+    return render(request, 'dean/reports.html', {
+        'groups': Group.objects.all(),
+        'courses': Course.objects.all(),
+    })
 
 
 @dean_required
 def export_pdf(request):
-    """Экспорт отчета в PDF"""
-    students = Student.objects.filter(is_active=True)
-    context = {'students': students, 'title': 'Рӯйхати донишҷӯён'}
-    pdf = export_report_to_pdf("report.html", context)
-
+    """
+    Экспорт отчета в PDF (?report=students|group|course|debtors).
+    Готовый PDF отдается сразу. Иначе GET показывает состояние задачи
+    построения (или кнопку), а POST ставит задачу в очередь; страница
+    опрашивает задачу и дает ссылку на этот же адрес.
+    """
+    kind = request.GET.get('report', 'students')
+    if kind not in REPORT_KINDS:
+        raise Http404
+    try:
+        group_id = int(request.GET['group']) if kind == 'group' else None
+        course_id = int(request.GET['course']) if kind == 'course' else None
+    except (KeyError, ValueError):
+        raise Http404
+    if group_id:
+        get_object_or_404(Group, pk=group_id)
+    if course_id:
+        get_object_or_404(Course, pk=course_id)
+    
+    payload = {'kind': kind, 'group_id': group_id, 'course_id': course_id, 'url': request.get_full_path()}
+    if request.method == 'POST':
+        enqueue('report_pdf', payload, user=request.user, unique=True)
+        return redirect(request.get_full_path())
     
-    response = HttpResponse(pdf, content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="report.pdf"'
-    return response
+    path = cached_report_file(kind, group_id=group_id, course_id=course_id)
+    if path is None:
+        job = latest_job('report_pdf', payload, request.user)
+        if job and job.status == 'done':
+            # Построен для прежней версии данных — нужен новый
+            job = None
+        return render(request, 'dean/report_job.html', {'job': job, 'status_view': 'dean:job_status'})
+    
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{kind}.pdf',
+                        content_type='application/pdf')
+
+
+@dean_required
+def job_status(request, pk):
+    """Состояние фоновой задачи (htmx-опрос)"""
+    return render(request, 'partials/job_status.html', {'job': user_job(request, pk), 'status_view': 'dean:job_status'})
 
 
 @dean_required
 def users_management(request):
     """Управление пользователями (админ функция внутри декана)"""
     users = User.objects.all()
-    return render(request, 'dean/users.html', {'users': users})
+    page = keyset_page(request, users, ['username', 'pk'])
+    return render_page(request, 'dean/users.html', {'page': page}, 'dean/partials/user_rows.html')
 
 
 @dean_required
@@ -8,6 +8,8 @@ urlpatterns = [
     path('schedule/', views.my_schedule, name='schedule'),
     path('groups/', views.my_groups, name='groups'),
     path('journal/<int:assignment_id>/', views.journal, name='journal'),
+    path('journal/<int:assignment_id>/export/', views.journal_export, name='journal_export'),
     path('journal/<int:assignment_id>/update/', views.update_grade, name='update_grade'),
+    path('journal/<int:assignment_id>/batch-update/', views.batch_update, name='batch_update'),
     path('student/<int:pk>/comment/', views.add_comment, name='add_comment'),
 ]
@@ -1,12 +1,26 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.http import JsonResponse
-from datetime import datetime
+from django.views.decorators.http import require_POST
+import json
+from datetime import datetime, timedelta
 from apps.common.models import *
 from apps.common.permissions import teacher_required
+from apps.common.journal import build_journal_matrix, upsert_journal_entries, validate_journal_cells
+from apps.common.exports import JOURNAL_HEADER, export_response, journal_rows
+from apps.common.timetable import get_timetable
 from django.utils import timezone
 
 
+# Ширина окна журнала по умолчанию и шаг догрузки старых колонок
+JOURNAL_WINDOW_DAYS = 30
+# Самое широкое окно журнала за один запрос (дни)
+JOURNAL_MAX_WINDOW_DAYS = 366
+
+# Максимум ячеек в одном batch_update
+BATCH_MAX_CELLS = 2000
+
+
 @teacher_required
 def dashboard(request):
     """Панель учителя"""
@@ -19,9 +33,17 @@ def dashboard(request):
         teacher_assignment__teacher=request.user
     ).select_related('teacher_assignment__group', 'teacher_assignment__subject')
     
+    # Ближайший урок — из индекса расписания, без запроса к Schedule
+    next_lesson = get_timetable().next_lesson(request.user.id)
+    if next_lesson:
+        date, lesson = next_lesson
+        assignments = {a.id: a for a in my_assignments}
+        next_lesson = {'date': date, 'lesson': lesson, 'assignment': assignments.get(lesson.assignment_id)}
+    
     return render(request, 'teacher/dashboard.html', {
         'assignments': my_assignments,
-        'schedules': my_schedules
+        'schedules': my_schedules,
+        'next_lesson': next_lesson,
     })
 
 
@@ -49,44 +71,59 @@ def my_groups(request):
     return render(request, 'teacher/groups.html', {'assignments': assignments})
 
 
+def _parse_date(value, default):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return default
+
+
 @teacher_required
 def journal(request, assignment_id):
-    """Журнал группы"""
+    """Журнал группы (матрица студенты × даты, диапазон через ?start=&end=)"""
     assignment = get_object_or_404(
-        TeacherAssignment,
+        TeacherAssignment.objects.select_related('group', 'subject', 'semester'),
         id=assignment_id,
         teacher=request.user
     )
     
-    students = Student.objects.filter(
-        group=assignment.group,
-        is_active=True
-    ).order_by('last_name', 'first_name')
-    
-    # Получить записи журнала за последние 30 дней
-    from datetime import timedelta
-    today = timezone.now().date()
-    start_date = today - timedelta(days=30)
-    
-    entries = JournalEntry.objects.filter(
-        teacher_assignment=assignment,
-        date__gte=start_date
-    ).select_related('student')
+    # Диапазон — только внутри семестра и не шире JOURNAL_MAX_WINDOW_DAYS:
+    # ?end=9999-12-31 не должен перебирать миллионы дней
+    semester = assignment.semester
+    today = timezone.localdate()
+    end_date = _parse_date(request.GET.get('end'), today)
+    end_date = min(max(end_date, semester.start_date), semester.end_date)
+    start_date = _parse_date(request.GET.get('start'), end_date - timedelta(days=JOURNAL_WINDOW_DAYS))
+    start_date = max(start_date, semester.start_date, end_date - timedelta(days=JOURNAL_MAX_WINDOW_DAYS))
+    if start_date > end_date:
+        start_date = end_date
     
-    # Организовать по студентам и датам
-    journal_data = {}
-    for student in students:
-        student_entries = entries.filter(student=student).order_by('-date')
-        journal_data[student.id] = {
-            'student': student,
-            'entries': student_entries
-        }
-    
-    return render(request, 'teacher/journal.html', {
+    matrix = build_journal_matrix(assignment, start_date, end_date)
+    older_start = max(start_date - timedelta(days=JOURNAL_WINDOW_DAYS), semester.start_date,
+                      end_date - timedelta(days=JOURNAL_MAX_WINDOW_DAYS))
+    context = {
         'assignment': assignment,
-        'journal_data': journal_data,
-        'students': students
-    })
+        'matrix': matrix,
+        'older_start': older_start,
+        'has_older': older_start < start_date,
+    }
+    
+    # htmx: вернуть только таблицу (догрузка старых колонок / смена диапазона)
+    if request.htmx:
+        return render(request, 'teacher/partials/journal_matrix.html', context)
+    return render(request, 'teacher/journal.html', context)
+
+
+@teacher_required
+def journal_export(request, assignment_id):
+    """Экспорт журнала в формате импорта (?format=xlsx|csv)"""
+    assignment = get_object_or_404(
+        TeacherAssignment.objects.select_related('group', 'subject'),
+        id=assignment_id,
+        teacher=request.user
+    )
+    filename = f'journal-{assignment.group.name}-{assignment.subject.code}'
+    return export_response(request.GET.get('format'), filename, JOURNAL_HEADER, journal_rows(assignment))
 
 
 @teacher_required
@@ -99,36 +136,16 @@ def update_grade(request, assignment_id):
             teacher=request.user
         )
         
-        student_id = request.POST.get('student_id')
-        date_str = request.POST.get('date')
-        grade = request.POST.get('grade')
-        attendance = request.POST.get('attendance') == 'true'
-        
-        student = Student.objects.get(id=student_id)
-        date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        
-        # Проверить блокировку
-        schedule = Schedule.objects.filter(
-            teacher_assignment=assignment,
-            weekday=date.weekday()
-        ).first()
+        entries, results = validate_journal_cells(assignment, [{
+            'student_id': request.POST.get('student_id'),
+            'date': request.POST.get('date'),
+            'grade': request.POST.get('grade'),
+            'attendance': request.POST.get('attendance'),
+        }])
+        if not entries:
+            return JsonResponse({'status': 'error', 'message': results[0]['message']})
         
-        if schedule and schedule.is_locked():
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Ячейка қулф шудааст (1 соат гузашт)!'
-            })
-        
-        # Создать или обновить запись
-        entry, created = JournalEntry.objects.update_or_create(
-            student=student,
-            teacher_assignment=assignment,
-            date=date,
-            defaults={
-                'grade': int(grade) if grade else None,
-                'attendance': attendance
-            }
-        )
+        upsert_journal_entries(entries)
         
         messages.success(request, 'Баҳо навсозӣ шуд!')
         return JsonResponse({'status': 'success'})
@@ -136,6 +153,41 @@ def update_grade(request, assignment_id):
     return JsonResponse({'status': 'error'})
 
 
+@teacher_required
+@require_POST
+def batch_update(request, assignment_id):
+    """
+    Сохранить пачку ячеек журнала одним запросом.
+
+    Тело — JSON {"cells": [{"student_id", "date", "grade", "attendance"}, ...]}.
+    Проверки выполняются один раз на всю пачку, запись — одной транзакцией.
+    """
+    assignment = get_object_or_404(
+        TeacherAssignment,
+        id=assignment_id,
+        teacher=request.user
+    )
+    
+    try:
+        cells = json.loads(request.body)['cells']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'status': 'error', 'message': 'Маълумоти нодуруст'}, status=400)
+    if not isinstance(cells, list) or len(cells) > BATCH_MAX_CELLS:
+        return JsonResponse({'status': 'error', 'message': f'Ҳадди аксар {BATCH_MAX_CELLS} ячейка'}, status=400)
+    
+    entries, results = validate_journal_cells(assignment, cells)
+    saved = upsert_journal_entries(entries)
+    
+    failed = sum(1 for r in results if r['status'] == 'error')
+    if not failed:
+        status = 'success'
+    elif saved:
+        status = 'partial'
+    else:
+        status = 'error'
+    return JsonResponse({'status': status, 'saved': saved, 'results': results})
+
+
 @teacher_required
 def add_comment(request, pk):
     """Добавить комментарий студенту"""
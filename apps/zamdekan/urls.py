@@ -6,8 +6,11 @@ app_name = 'zamdekan'
 urlpatterns = [
     path('', views.dashboard, name='index'),
     path('live/', views.live_dashboard, name='live_dashboard'),
+    path('api/live-data/', views.live_data_api, name='live_data_api'),
+    path('api/live-stream/', views.live_stream, name='live_stream'),
     path('students/', views.students_list, name='students'),
     path('students/<int:pk>/', views.student_detail, name='student_detail'),
     path('students/<int:pk>/comment/', views.add_comment, name='add_comment'),
     path('journals/', views.journals_list, name='journals'),
+    path('tables/<slug:name>/', views.datatable, name='datatable'),
 ]
@@ -3,29 +3,55 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from apps.common.models import *
 from apps.common.permissions import zamdekan_required
-from apps.common.utils import get_live_attendance_data, get_top_students
+from apps.common.dashboard import get_dashboard_summary
+from apps.common.live import get_live_snapshot, live_data_etag, live_stream_response
+from apps.common.datatables import datatable_response
+from apps.common.pagination import keyset_page, ranked_page, render_page
+from apps.common.profiles import COMMENT_ORDERING, COMMENT_PAGE_SIZE, get_student_profile
+from apps.common.search import search_students
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.db.models import Count
 
 
+STUDENT_ORDERING = ['last_name', 'first_name', 'pk']
+JOURNAL_ORDERING = ['group__name', 'subject__name', 'pk']
+# Таблицы, доступные замдекану через DataTables (serverSide)
+DATATABLES = ('students', 'journals')
+
+
 @zamdekan_required
 def dashboard(request):
     """Панель замдекана (только просмотр)"""
-    total_students = Student.objects.filter(is_active=True).count()
-    total_groups = Group.objects.count()
-    
-    context = {
-        'total_students': total_students,
-        'total_groups': total_groups,
-        'top_students': get_top_students(10),
-    }
+    context = get_dashboard_summary()
     return render(request, 'zamdekan/dashboard.html', context)
 
 
 @zamdekan_required
 def live_dashboard(request):
     """Live Dashboard (только просмотр)"""
-    live_data = get_live_attendance_data()
-    return render(request, 'zamdekan/live_dashboard.html', {'live_data': live_data})
+    live_data = get_live_snapshot()['data']
+    return render(request, 'zamdekan/live_dashboard.html', {
+        'live_data': live_data,
+        'live_data_url': reverse('zamdekan:live_data_api'),
+        'live_stream_url': reverse('zamdekan:live_stream'),
+    })
+
+
+@zamdekan_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=live_data_etag)
+def live_data_api(request):
+    """API live данных (общий снимок с деканом)"""
+    return JsonResponse(get_live_snapshot()['data'], safe=False)
+
+
+@zamdekan_required
+async def live_stream(request):
+    """Server-Sent Events: изменения live данных (только под ASGI)"""
+    return live_stream_response(request)
 
 
 @zamdekan_required
@@ -33,31 +59,28 @@ def students_list(request):
     """Список студентов (только просмотр)"""
     students = Student.objects.filter(is_active=True).select_related('group', 'course')
     
-    search = request.GET.get('search', '')
+    search = request.GET.get('search', '').strip()
     if search:
-        students = students.filter(
-            Q(first_name__icontains=search) | 
-            Q(last_name__icontains=search) | 
-            Q(student_id__icontains=search)
-        )
+        page = ranked_page(search_students(students, search))
+    else:
+        page = keyset_page(request, students, STUDENT_ORDERING)
     
-    return render(request, 'zamdekan/students.html', {'students': students, 'search': search})
+    return render_page(request, 'zamdekan/students.html', {'page': page, 'search': search},
+                       'zamdekan/partials/student_rows.html', 'zamdekan/partials/students_table.html')
 
 
 @zamdekan_required
 def student_detail(request, pk):
-    """Профиль студента (только просмотр + комментарии)"""
-    student = get_object_or_404(Student, pk=pk)
-    journal_entries = JournalEntry.objects.filter(student=student).select_related(
-        'teacher_assignment__subject', 'teacher_assignment__teacher'
-    ).order_by('-date')[:20]
-    comments = Comment.objects.filter(student=student).select_related('author').order_by('-created_at')
+    """Профиль студента (только просмотр + комментарии), сводка из кэша"""
+    student = get_object_or_404(Student.objects.select_related('group'), pk=pk)
+    comments = Comment.objects.filter(student=student).select_related('author')
+    page = keyset_page(request, comments, COMMENT_ORDERING, size=COMMENT_PAGE_SIZE)
     
-    return render(request, 'zamdekan/student_detail.html', {
+    return render_page(request, 'zamdekan/student_detail.html', {
         'student': student,
-        'journal_entries': journal_entries,
-        'comments': comments
-    })
+        'profile': get_student_profile(student.pk),
+        'page': page,
+    }, 'dean/partials/comment_rows.html')
 
 
 @zamdekan_required
@@ -87,4 +110,11 @@ def journals_list(request):
     assignments = TeacherAssignment.objects.all().select_related(
         'teacher', 'group', 'subject', 'semester'
     )
-    return render(request, 'zamdekan/journals.html', {'assignments': assignments})
+    page = keyset_page(request, assignments, JOURNAL_ORDERING)
+    return render_page(request, 'zamdekan/journals.html', {'page': page}, 'zamdekan/partials/journal_rows.html')
+
+
+@zamdekan_required
+def datatable(request, name):
+    """Данные таблицы для DataTables: страница, сортировка, фильтры"""
+    return datatable_response(request, name, DATATABLES)
@@ -0,0 +1,11 @@
+/** Классы Tailwind берутся из шаблонов; результат — static/css/tailwind.css */
+module.exports = {
+  content: [
+    './templates/**/*.html',
+    './apps/**/templates/**/*.html',
+  ],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+};
@@ -39,10 +39,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'apps.common.middleware.QueryProfileMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'apps.common.middleware.SessionRefreshMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.common.middleware.ReplicaReadMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
@@ -74,9 +78,82 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Тестовая БД — файл, а не общая память: потоки в тестах конкурентной
+        # записи блокируют друг друга так же, как процессы сервера
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# CRM_DB_MODE=production — SQLite для нескольких процессов сервера:
+# WAL (чтение не ждет записи), ожидание блокировки вместо ошибки,
+# постоянные соединения. Те же OPTIONS проверяет тест конкурентной записи.
+PRODUCTION_DB_OPTIONS = {
+    'init_command': ';'.join([
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA busy_timeout=10000',
+        'PRAGMA mmap_size=268435456',
+        'PRAGMA cache_size=-65536',
+        'PRAGMA temp_store=MEMORY',
+    ]),
+    # Блокировка записи берется в начале транзакции: иначе транзакция
+    # «чтение, потом запись» получает "database is locked" без ожидания
+    'transaction_mode': 'IMMEDIATE',
+}
+if os.environ.get('CRM_DB_MODE') == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': PRODUCTION_DB_OPTIONS,
+    })
+
+# CRM_REPLICA_PATH — копия БД только для чтения (обновляет refresh_replica).
+# Замдекан и страницы отчетов читают из нее, запись всегда идет в default.
+if os.environ.get('CRM_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['CRM_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['apps.common.routers.ReplicaRouter']
+
+# CRM_PROFILE_REQUESTS=1 — замер SQL и времени каждого запроса
+# (сводка: /admin-panel/perf/, медленные запросы — в лог apps.common.profiling)
+REQUEST_PROFILING = os.environ.get('CRM_PROFILE_REQUESTS') == '1'
+SLOW_REQUEST_MS = 500
+
+# Сколько секунд после записи браузер читает только из default
+# (должно быть больше интервала refresh_replica)
+REPLICA_PIN_SECONDS = 120
+
+# Cache (общий для всех процессов сервера, без внешнего брокера)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CRM_CACHE_DIR', BASE_DIR / 'cache'),
+        'TIMEOUT': 300,
+    }
+}
+
+# Live Dashboard: время жизни общего снимка (секунды)
+LIVE_CACHE_TIMEOUT = 15
+
+# Панели декана/замдекана/админа: время жизни снимка показателей (секунды)
+DASHBOARD_CACHE_TIMEOUT = 60
+
+# Профиль студента (сводка по предметам): сбрасывается при записи в журнал
+# и комментариях, время жизни — страховка от записей в обход сигналов (секунды)
+STUDENT_PROFILE_CACHE_TIMEOUT = 3600
+
+# Фоновые задачи (apps/common/jobs.py, воркер — manage.py run_jobs).
+# Загрузки, результаты экспорта и кэш PDF-отчетов лежат в JOB_FILES_DIR
+# (не в MEDIA: не раздаются напрямую, только через представления с проверкой роли)
+JOB_FILES_DIR = os.environ.get('CRM_JOB_DIR', BASE_DIR / 'jobfiles')
+# Лимит одновременных задач по видам поверх значений из register(): {'excel_import': 2}
+JOB_CONCURRENCY = {}
+# Выполнять задачи сразу в запросе (разработка без воркера)
+JOBS_RUN_INLINE = os.environ.get('CRM_JOBS_INLINE') == '1'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,6 +178,19 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# collectstatic: хэш в имени файла, gzip/brotli-копии; WhiteNoise отдает их
+# с Cache-Control на год (immutable). В DEBUG файлы берутся прямо из static
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+WHITENOISE_USE_FINDERS = DEBUG
+WHITENOISE_AUTOREFRESH = DEBUG
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -116,6 +206,18 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dean/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# Пользователь сессии берется из кэша (сбрасывается при записи User).
+# Простой ModelBackend не нужен: CachedModelBackend — его подкласс, а второй
+# бэкенд проверял бы пароль при неудачном входе повторно
+AUTHENTICATION_BACKENDS = [
+    'apps.common.backends.CachedModelBackend',
+]
+AUTH_USER_CACHE_TIMEOUT = 300
+
 # Session settings
+# Сессия читается из кэша; запись — только при изменении или когда до
+# истечения осталось меньше SESSION_REFRESH_THRESHOLD (SessionRefreshMiddleware)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 SESSION_COOKIE_AGE = 86400  # 24 hours
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_THRESHOLD = SESSION_COOKIE_AGE // 2